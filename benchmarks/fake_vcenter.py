@@ -0,0 +1,293 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+'''
+Stand-in for the endpoints of a vCenter server that vmsgen reads: the vAPI
+metamodel and authentication metadata Component services, served over
+JSON-RPC, and the /rest navigation ?~method=OPTIONS responses. The data comes
+from a metamodel directory saved with --metamodel-components or written by
+benchmarks.synthetic_metamodel. Latency, jitter and failing requests can be
+injected to exercise the connection pooling, concurrency and retries of vmsgen.
+
+    python -m benchmarks.fake_vcenter --synthetic-scale 1 --latency 0.05 --error-rate 0.02
+    python vmsgen.py -m http://127.0.0.1:8080/api -rn http://127.0.0.1:8080/rest -o output
+'''
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic_metamodel import SyntheticMetamodelGenerator, SyntheticMetamodelOptions
+from lib.offline_metamodel import AUTHENTICATION_DIR, MAP_FIELDS, REST_NAVIGATION_CAPTURE_FILE
+
+API_PATH = '/api'
+REST_PATH = '/rest'
+METAMODEL_COMPONENT_SERVICE = 'com.vmware.vapi.metadata.metamodel.component'
+AUTHENTICATION_COMPONENT_SERVICE = 'com.vmware.vapi.metadata.authentication.component'
+# vAPI structure names of the values of the metamodel fields. The clients convert
+# structures by their binding type, so the names only serve as documentation.
+FIELD_STRUCTURE_NAMES = {
+    'info': 'component_info',
+    'packages': 'package_info',
+    'structures': 'structure_info',
+    'enumerations': 'enumeration_info',
+    'services': 'service_info',
+    'operations': 'operation_info',
+    'constants': 'constant_info',
+    'fields': 'field_info',
+    'params': 'field_info',
+    'output': 'operation_result_info',
+    'errors': 'error_info',
+    'values': 'enumeration_value_info',
+    'metadata': 'element_map',
+    'elements': 'element_value',
+    'type': 'type',
+    'element_type': 'type',
+    'map_key_type': 'type',
+    'map_value_type': 'type',
+    'generic_instantiation': 'generic_instantiation',
+    'user_defined_type': 'user_defined_type',
+    'value': 'constant_value',
+    'primitive_value': 'primitive_value'}
+
+
+def to_data_value(value, structure_prefix, field_name=None):
+    """
+    Encodes a structure dumped by dictionary_processing.objectTodict as a vAPI
+    JSON-RPC data value. Json objects under one of the MAP_FIELDS are maps,
+    which vAPI encodes as lists of key/value structures.
+    """
+    if isinstance(value, list):
+        return [to_data_value(element, structure_prefix, field_name) for element in value]
+    if not isinstance(value, dict):
+        return value
+    if field_name in MAP_FIELDS:
+        return [{'STRUCTURE': {'map-entry': {
+            'key': key,
+            'value': to_structure_value(element, structure_prefix, field_name)}}}
+            for key, element in sorted(value.items())]
+    return to_structure_value(value, structure_prefix, field_name)
+
+
+def to_structure_value(value, structure_prefix, field_name):
+    if not isinstance(value, dict):
+        return to_data_value(value, structure_prefix, field_name)
+    fields = {key: to_data_value(element, structure_prefix, key)
+              for key, element in value.items() if not key.startswith('_')}
+    structure_name = structure_prefix + FIELD_STRUCTURE_NAMES.get(field_name, field_name or 'component_data')
+    return {'STRUCTURE': {structure_name: fields}}
+
+
+def get_error_value(error_name):
+    return {'ERROR': {'com.vmware.vapi.std.errors.' + error_name: {'messages': [], 'data': None}}}
+
+
+class ComponentStore:
+    """
+    The dumped components of one Component service, encoded on first use.
+    """
+
+    def __init__(self, metamodel_dir, structure_prefix):
+        self.metamodel_dir = metamodel_dir
+        self.structure_prefix = structure_prefix
+        self.component_values = {}
+        self.lock = threading.Lock()
+        self.components = []
+        if os.path.isdir(metamodel_dir):
+            self.components = sorted(file_name[:-len('.json')] for file_name in os.listdir(metamodel_dir)
+                                     if file_name.endswith('.json') and file_name != REST_NAVIGATION_CAPTURE_FILE)
+
+    def get(self, component_id):
+        if component_id not in self.components:
+            return None
+        with self.lock:
+            if component_id not in self.component_values:
+                with open(os.path.join(self.metamodel_dir, component_id + '.json')) as component_file:
+                    self.component_values[component_id] = to_data_value(
+                        json.load(component_file), self.structure_prefix)
+            return self.component_values[component_id]
+
+    def invoke(self, operation_id, operation_input):
+        """
+        Returns the result of a JSON-RPC invocation, either an output or an error
+        """
+        if operation_id == 'list':
+            return {'output': self.components}
+        if operation_id not in ('get', 'fingerprint'):
+            return {'error': get_error_value('operation_not_found')}
+        component_value = self.get(operation_input.get('component_id'))
+        if component_value is None:
+            return {'error': get_error_value('not_found')}
+        if operation_id == 'fingerprint':
+            return {'output': list(component_value['STRUCTURE'].values())[0].get('fingerprint')}
+        return {'output': component_value}
+
+
+class FakeVcenterServer:
+    """
+    Serves the metamodel directory on 127.0.0.1. Every request is delayed by
+    latency +/- jitter seconds and answered with error_status instead with a
+    probability of error_rate. start() returns once the server accepts requests.
+    """
+
+    def __init__(self, metamodel_dir, port=0, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 seed=None):
+        self.metamodel_dir = metamodel_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.component_stores = {
+            METAMODEL_COMPONENT_SERVICE: ComponentStore(
+                metamodel_dir, 'com.vmware.vapi.metadata.metamodel.'),
+            AUTHENTICATION_COMPONENT_SERVICE: ComponentStore(
+                os.path.join(metamodel_dir, AUTHENTICATION_DIR), 'com.vmware.vapi.metadata.authentication.')}
+        self.request_count = 0
+        self.injected_error_count = 0
+        self.http_server = ThreadingHTTPServer(('127.0.0.1', port), FakeVcenterRequestHandler)
+        self.http_server.daemon_threads = True
+        self.http_server.fake_vcenter = self
+        self.url = 'http://127.0.0.1:' + str(self.http_server.server_address[1])
+        self.service_operations_dict = self.__load_rest_navigation()
+        self.thread = None
+
+    def __load_rest_navigation(self):
+        capture_file = os.path.join(self.metamodel_dir, REST_NAVIGATION_CAPTURE_FILE)
+        if not os.path.exists(capture_file):
+            return {}
+        with open(capture_file) as capture:
+            capture_json = capture.read()
+        # The links are absolute, they point to this server instead of the recorded one
+        recorded_url = json.loads(capture_json)['rest_navigation_url']
+        return json.loads(capture_json.replace(json.dumps(recorded_url)[1:-1],
+                                               self.get_rest_navigation_url()))['service_operations']
+
+    def get_metadata_url(self):
+        return self.url + API_PATH
+
+    def get_rest_navigation_url(self):
+        return self.url + REST_PATH
+
+    def start(self):
+        self.thread = threading.Thread(target=self.http_server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def simulate_network(self):
+        """
+        Sleeps for the configured latency. Returns whether the request should fail.
+        """
+        with self.random_lock:
+            self.request_count += 1
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            fail = self.random.random() < self.error_rate
+            if fail:
+                self.injected_error_count += 1
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+
+class FakeVcenterRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        fake_vcenter = self.server.fake_vcenter
+        if fake_vcenter.simulate_network():
+            return self.send_json(fake_vcenter.error_status, {'type': 'com.vmware.vapi.std.errors.service_unavailable'})
+        path, _, query = self.path.partition('?')
+        if not path.startswith(REST_PATH) or query != '~method=OPTIONS':
+            return self.send_json(404, {'type': 'com.vmware.vapi.std.errors.not_found'})
+        service_operations = fake_vcenter.service_operations_dict.get(path[len(REST_PATH):])
+        if service_operations is None:
+            return self.send_json(404, {'type': 'com.vmware.vapi.std.errors.not_found'})
+        self.send_json(200, {'value': service_operations})
+
+    def do_POST(self):
+        fake_vcenter = self.server.fake_vcenter
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if fake_vcenter.simulate_network():
+            return self.send_json(fake_vcenter.error_status, {})
+        if self.path.partition('?')[0] != API_PATH:
+            return self.send_json(404, {})
+        params = request.get('params', {})
+        component_store = fake_vcenter.component_stores.get(params.get('serviceId'))
+        if component_store is None:
+            result = {'error': get_error_value('operation_not_found')}
+        else:
+            operation_input = params.get('input', {}).get('STRUCTURE', {}).get('operation-input', {})
+            result = component_store.invoke(params.get('operationId'), operation_input)
+        self.send_json(200, {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result})
+
+    def send_json(self, status, json_data):
+        body = json.dumps(json_data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serves a saved or synthetic metamodel like a vCenter server.')
+    parser.add_argument('--metamodel-dir', help='Metamodel directory saved with --metamodel-components.')
+    parser.add_argument('--synthetic-scale', type=int,
+                        help='Serves a synthetic metamodel of this scale instead of --metamodel-dir.')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay of every response in seconds.')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='The delay varies uniformly by up to this many seconds.')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of the requests answered with --error-status.')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+    if (args.metamodel_dir is None) == (args.synthetic_scale is None):
+        parser.error('exactly one of --metamodel-dir and --synthetic-scale is required')
+
+    metamodel_dir = args.metamodel_dir
+    if args.synthetic_scale is not None:
+        metamodel_dir = tempfile.mkdtemp(prefix='fake-vcenter-')
+        SyntheticMetamodelGenerator(SyntheticMetamodelOptions(scale=args.synthetic_scale)).write(metamodel_dir)
+    server = FakeVcenterServer(metamodel_dir, args.port, args.latency, args.jitter, args.error_rate,
+                               args.error_status, args.seed)
+    print('Serving ' + metamodel_dir + ': metadata-url ' + server.get_metadata_url() +
+          ', rest-navigation-url ' + server.get_rest_navigation_url())
+    try:
+        server.http_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.http_server.server_close()
+        print('Served ' + str(server.request_count) + ' requests, ' +
+              str(server.injected_error_count) + ' injected errors')
+        if args.synthetic_scale is not None:
+            shutil.rmtree(metamodel_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+'''
+End-to-end benchmark of the generator on a synthetic metamodel. Every
+specification version is generated in a fresh process, so that the reported
+peak memory belongs to that run alone.
+
+    python -m benchmarks.run_benchmark --scale 2 --report benchmark.json
+'''
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import timeit
+from concurrent import futures
+
+import six
+
+from benchmarks.synthetic_metamodel import SyntheticMetamodelGenerator, SyntheticMetamodelOptions
+from lib import dictionary_processing as dict_processing
+from lib import offline_metamodel
+from lib import profiling
+from lib import spec_generation
+from lib import utils
+from lib.file_output_handler import FileOutputHandler
+from lib.metamodel_cache import CachingComponentService
+from lib.spec_generation import SpecGenerationContext
+
+
+def get_peak_rss_kb(who=resource.RUSAGE_SELF):
+    peak_rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == 'darwin':
+        return peak_rss // 1024
+    return peak_rss
+
+
+def count_operations(package_spec_dict):
+    return sum(len(path_methods)
+               for path_dict, _ in package_spec_dict.values()
+               for path_methods in path_dict.values())
+
+
+def run_generation(metamodel_dir, output_dir, spec, process_workers=0):
+    """
+    Runs the vmsgen pipeline offline on metamodel_dir and returns the
+    measurements of the run.
+    """
+    enumeration_dict = {}
+    structure_dict = {}
+    service_dict = {}
+    service_urls_map = {}
+    phase_recorder = profiling.PhaseRecorder()
+    rest_navigation_handler = offline_metamodel.load_rest_navigation_handler(metamodel_dir)
+    rest_navigation_url = rest_navigation_handler.get_rest_navigation_url()
+    component_svc = CachingComponentService(offline_metamodel.OfflineComponentService(metamodel_dir))
+
+    with phase_recorder.phase('metamodel fetch'):
+        dict_processing.populate_dicts(
+            component_svc,
+            enumeration_dict,
+            structure_dict,
+            service_dict,
+            service_urls_map,
+            rest_navigation_url,
+            False)
+        http_error_map = utils.HttpErrorMap(component_svc)
+    with phase_recorder.phase('service url classification'):
+        package_dict_api, package_dict, package_dict_deprecated, _ = \
+            dict_processing.add_service_urls_using_metamodel(
+                service_urls_map, service_dict, rest_navigation_handler, [])
+        utils.combine_dicts_with_list_values(package_dict, package_dict_deprecated)
+
+    generation_context = SpecGenerationContext(
+        structure_dict,
+        enumeration_dict,
+        service_dict,
+        service_urls_map,
+        http_error_map,
+        rest_navigation_handler,
+        False,
+        spec)
+    with phase_recorder.phase('package generation', len(package_dict) + len(package_dict_api)):
+        rest_package_spec_dict, api_package_spec_dict = spec_generation.generate_package_specs(
+            generation_context, package_dict, package_dict_api, process_workers)
+    operations = count_operations(rest_package_spec_dict) + count_operations(api_package_spec_dict)
+
+    with phase_recorder.phase('post-processing'):
+        file_handler = FileOutputHandler(rest_package_spec_dict,
+                                         api_package_spec_dict,
+                                         output_dir,
+                                         False,
+                                         spec)
+    with phase_recorder.phase('file write'):
+        file_handler.output_files()
+        phase_recorder.add_bytes(sum(os.path.getsize(file_name)
+                                     for file_name in file_handler.output_file_dict.values()))
+
+    report = phase_recorder.get_report()
+    return {
+        'spec': spec,
+        'packages': len(set(package_dict) | set(package_dict_api)),
+        'operations': operations,
+        'seconds': report['total_seconds'],
+        'operations_per_second': operations / report['total_seconds'],
+        'peak_rss_kb': get_peak_rss_kb(),
+        # Largest of the --process-workers processes, if any
+        'peak_worker_rss_kb': get_peak_rss_kb(resource.RUSAGE_CHILDREN),
+        'phases': report['phases']}
+
+
+def run_isolated_generation(metamodel_dir, output_dir, spec, process_workers=0):
+    # Generation prints every package it processes, the benchmark only reports totals.
+    # The descriptor is redirected, so that the --process-workers processes inherit it.
+    sys.stdout.flush()
+    stdout_fd = os.dup(1)
+    with open(os.devnull, 'w') as devnull:
+        os.dup2(devnull.fileno(), 1)
+    try:
+        return run_generation(metamodel_dir, output_dir, spec, process_workers)
+    finally:
+        sys.stdout.flush()
+        os.dup2(stdout_fd, 1)
+        os.close(stdout_fd)
+
+
+def run_benchmark(options, specs, work_dir, process_workers=0):
+    """
+    Generates the synthetic metamodel described by options into work_dir and
+    runs the generation of every spec in its own process.
+    Returns one result dictionary per spec.
+    """
+    metamodel_dir = os.path.join(work_dir, 'metamodel')
+    metamodel_operations = SyntheticMetamodelGenerator(options).write(metamodel_dir)
+    results = []
+    for spec in specs:
+        output_dir = os.path.join(work_dir, 'output' + spec)
+        # spawn, so no memory of this process or of earlier runs is inherited
+        with futures.ProcessPoolExecutor(max_workers=1,
+                                         mp_context=multiprocessing.get_context('spawn')) as executor:
+            result = executor.submit(run_isolated_generation, metamodel_dir, output_dir, spec,
+                                     process_workers).result()
+        result['metamodel_operations'] = metamodel_operations
+        results.append(result)
+    return results
+
+
+def print_results(results):
+    print('spec  packages  operations   seconds    ops/sec  peak RSS (MB)')
+    for result in results:
+        print('%4s  %8d  %10d  %8.2f  %9.1f  %13.1f' % (
+            result['spec'],
+            result['packages'],
+            result['operations'],
+            result['seconds'],
+            result['operations_per_second'],
+            result['peak_rss_kb'] / 1024.0))
+        for name, phase in sorted(six.iteritems(result['phases'])):
+            print('      %-28s %8.2f' % (name, phase['seconds']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the generator on a synthetic metamodel.')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='Multiplies the number of generated packages.')
+    parser.add_argument('--packages', type=int, default=40,
+                        help='Number of packages at scale 1.')
+    parser.add_argument('--services-per-package', type=int, default=12)
+    parser.add_argument('--operations-per-service', type=int, default=5)
+    parser.add_argument('--structures-per-package', type=int, default=25)
+    parser.add_argument('--nesting-depth', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--specs', nargs='+', choices=['2', '3'], default=['2', '3'],
+                        help='Specification versions to benchmark.')
+    parser.add_argument('--process-workers', type=int, default=0,
+                        help='Generates packages in that many worker processes, as vmsgen --process-workers.')
+    parser.add_argument('--work-dir', help='Keeps the metamodel and the generated files in this directory.')
+    parser.add_argument('--report', help='Writes the results as json to this file.')
+    args = parser.parse_args()
+
+    options = SyntheticMetamodelOptions(packages=args.packages,
+                                        services_per_package=args.services_per_package,
+                                        operations_per_service=args.operations_per_service,
+                                        structures_per_package=args.structures_per_package,
+                                        nesting_depth=args.nesting_depth,
+                                        scale=args.scale,
+                                        seed=args.seed)
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='vmsgen-benchmark-')
+    try:
+        start = timeit.default_timer()
+        results = run_benchmark(options, args.specs, work_dir, args.process_workers)
+        print_results(results)
+        print('Benchmark completed in ' + str(timeit.default_timer() - start) + ' seconds')
+        if args.report is not None:
+            utils.write_json_data_to_file(args.report, results)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+'''
+Generates synthetic metamodel dumps, in the format written by vmsgen with
+--metamodel-components, which vmsgen and the benchmarks can read through
+--offline-metamodel-dir.
+'''
+
+import os
+import random
+
+from lib import utils
+from lib.offline_metamodel import REST_NAVIGATION_CAPTURE_FILE, write_component_dump
+
+REST_NAVIGATION_URL = 'https://bench/rest'
+ERRORS_PACKAGE = 'com.vmware.vapi.std.errors'
+# vapi errors and the http status codes the /api endpoints report for them
+ERROR_CODES = {
+    'com.vmware.vapi.std.errors.error': '500',
+    'com.vmware.vapi.std.errors.invalid_argument': '400',
+    'com.vmware.vapi.std.errors.not_found': '404',
+    'com.vmware.vapi.std.errors.unauthenticated': '401',
+    'com.vmware.vapi.std.errors.unauthorized': '403',
+    'com.vmware.vapi.std.errors.service_unavailable': '503'}
+BUILTIN_TYPES = ['STRING', 'LONG', 'BOOLEAN', 'DOUBLE', 'DATE_TIME', 'URI', 'SECRET', 'ID']
+# How the services of a package are exposed, assigned round robin
+SERVICE_KINDS = ['api', 'rest_request_mapping', 'rest_navigation', 'api_and_rest_navigation']
+
+
+class SyntheticMetamodelOptions:
+    """
+    Shape of a synthetic metamodel. The defaults are in the range of a current
+    vCenter, scale multiplies the number of packages.
+    """
+
+    def __init__(self,
+                 packages=40,
+                 services_per_package=12,
+                 operations_per_service=5,
+                 structures_per_package=25,
+                 enumerations_per_package=6,
+                 fields_per_structure=8,
+                 nesting_depth=3,
+                 scale=1,
+                 seed=0):
+        self.packages = packages * scale
+        self.services_per_package = services_per_package
+        self.operations_per_service = operations_per_service
+        self.structures_per_package = structures_per_package
+        self.enumerations_per_package = enumerations_per_package
+        self.fields_per_structure = fields_per_structure
+        self.nesting_depth = nesting_depth
+        self.seed = seed
+
+
+def builtin_type(builtin):
+    return {'category': 'BUILTIN', 'builtin_type': builtin, 'user_defined_type': None, 'generic_instantiation': None}
+
+
+def user_defined_type(resource_type, resource_id):
+    return {'category': 'USER_DEFINED',
+            'builtin_type': None,
+            'user_defined_type': {'resource_type': resource_type, 'resource_id': resource_id},
+            'generic_instantiation': None}
+
+
+def structure_type(structure_id):
+    return user_defined_type('com.vmware.vapi.structure', structure_id)
+
+
+def enumeration_type(enumeration_id):
+    return user_defined_type('com.vmware.vapi.enumeration', enumeration_id)
+
+
+def generic_type(generic, element_type=None, map_key_type=None, map_value_type=None):
+    return {'category': 'GENERIC',
+            'builtin_type': None,
+            'user_defined_type': None,
+            'generic_instantiation': {'generic_type': generic,
+                                      'element_type': element_type,
+                                      'map_key_type': map_key_type,
+                                      'map_value_type': map_value_type}}
+
+
+def string_element(value):
+    return {'type': 'STRING', 'string_value': value, 'list_value': None}
+
+
+def field(name, field_type, metadata=None):
+    return {'name': name,
+            'documentation': 'The ' + name.replace('_', ' ') + ' of the resource.',
+            'metadata': metadata or {},
+            'type': field_type}
+
+
+class SyntheticMetamodelGenerator:
+    """
+    Builds components in the shape of dictionary_processing.objectTodict dumps of
+    ComponentData, together with the rest navigation responses of the services
+    which are only exposed through rest navigation.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.random = random.Random(options.seed)
+        self.service_operations_dict = {}
+
+    def write(self, metamodel_dir):
+        """
+        Writes one json file per component and the rest navigation capture.
+        Returns the number of generated operations.
+        """
+        if not os.path.exists(metamodel_dir):
+            os.makedirs(metamodel_dir)
+        components = {'com.vmware.vapi': self.get_errors_component()}
+        for index in range(self.options.packages):
+            package = 'bench' + str(index)
+            components['com.vmware.' + package] = self.get_component(package)
+        for component, component_dump in components.items():
+            write_component_dump(metamodel_dir, component, component_dump)
+        utils.write_json_data_to_file(os.path.join(metamodel_dir, REST_NAVIGATION_CAPTURE_FILE), {
+            'rest_navigation_url': REST_NAVIGATION_URL,
+            'service_operations': self.service_operations_dict})
+        return self.options.packages * self.options.services_per_package * self.options.operations_per_service
+
+    def get_errors_component(self):
+        structures = {}
+        for error, code in sorted(ERROR_CODES.items()):
+            structures[error] = {
+                'name': error,
+                'documentation': 'The ' + error.split('.')[-1].replace('_', ' ') + ' error.',
+                'metadata': {'Response': {'elements': {'code': string_element(code)}}},
+                'enumerations': {},
+                'fields': [field('messages', generic_type('LIST', builtin_type('STRING'))),
+                           field('data', generic_type('OPTIONAL', builtin_type('DYNAMIC_STRUCTURE')))]}
+        return self.get_component_dump('com.vmware.vapi', {
+            ERRORS_PACKAGE: self.get_package_dump(ERRORS_PACKAGE, structures, {}, {})})
+
+    def get_component(self, package):
+        package_id = 'com.vmware.' + package
+        enumerations = {}
+        for index in range(self.options.enumerations_per_package):
+            enumeration_id = package_id + '.state' + str(index)
+            enumerations[enumeration_id] = {
+                'name': enumeration_id,
+                'documentation': 'State of a resource.',
+                'metadata': {},
+                'values': [{'value': 'STATE_' + str(value), 'documentation': '', 'metadata': {}}
+                           for value in range(self.random.randint(2, 8))]}
+
+        structure_ids = [package_id + '.info' + str(index) for index in range(self.options.structures_per_package)]
+        structures = {}
+        for index, structure_id in enumerate(structure_ids):
+            structures[structure_id] = self.get_structure(structure_id, index, structure_ids, list(enumerations))
+
+        services = {}
+        for index in range(self.options.services_per_package):
+            service_kind = SERVICE_KINDS[index % len(SERVICE_KINDS)]
+            service_id = package_id + '.service' + str(index)
+            services[service_id] = self.get_service(package, service_id, service_kind, structure_ids)
+        return self.get_component_dump(package_id, {
+            package_id: self.get_package_dump(package_id, structures, enumerations, services)})
+
+    def get_structure(self, structure_id, index, structure_ids, enumeration_ids):
+        """
+        Structures reference the ones after them up to nesting_depth levels deep,
+        every fifth structure references itself, e.g. as a tree of children.
+        """
+        fields = []
+        for field_index in range(self.options.fields_per_structure):
+            name = 'field' + str(field_index)
+            nested_index = index + 1 + field_index % 3
+            can_nest = index % self.options.nesting_depth != self.options.nesting_depth - 1
+            kind = field_index % 6
+            if kind == 0 or (kind == 4 and not can_nest):
+                field_type = builtin_type(BUILTIN_TYPES[(index + field_index) % len(BUILTIN_TYPES)])
+            elif kind == 1 and enumeration_ids:
+                field_type = enumeration_type(enumeration_ids[(index + field_index) % len(enumeration_ids)])
+            elif kind == 2:
+                field_type = generic_type('OPTIONAL', builtin_type('STRING'))
+            elif kind == 3:
+                field_type = generic_type('MAP', map_key_type=builtin_type('ID'),
+                                          map_value_type=builtin_type('LONG'))
+            elif kind == 4 and nested_index < len(structure_ids):
+                field_type = generic_type('LIST', structure_type(structure_ids[nested_index]))
+            elif kind == 5 and index % 5 == 0:
+                field_type = generic_type('OPTIONAL', structure_type(structure_id))
+            else:
+                field_type = generic_type('SET', builtin_type('STRING'))
+            fields.append(field(name, field_type))
+        return {'name': structure_id,
+                'documentation': 'Information about a ' + structure_id.split('.')[-1] + '.',
+                'metadata': {},
+                'enumerations': {},
+                'fields': fields}
+
+    def get_service(self, package, service_id, service_kind, structure_ids):
+        service_name = service_id.split('.')[-1]
+        api_path = '/' + package + '/' + service_name
+        operations = {}
+        service_operations = []
+        for index in range(self.options.operations_per_service):
+            structure_id = structure_ids[self.random.randrange(len(structure_ids))]
+            method, operation_id, params, output = self.get_operation_signature(index, structure_id)
+            metadata = {}
+            url = api_path + ('/{id}' if method in ('GET', 'PATCH', 'DELETE') and index > 0 else '')
+            if service_kind in ('api', 'api_and_rest_navigation'):
+                metadata[method] = {'elements': {'path': string_element(url)}}
+            if service_kind == 'rest_request_mapping':
+                metadata['RequestMapping'] = {'elements': {
+                    'value': string_element(url),
+                    'method': string_element(method)}}
+            if service_kind in ('rest_navigation', 'api_and_rest_navigation'):
+                href = REST_NAVIGATION_URL + '/' + service_id.replace('.', '/')
+                if '{id}' in url:
+                    href += '/id:{id}'
+                service_operations.append({
+                    'service': service_id,
+                    'name': operation_id,
+                    'links': [{'href': href, 'method': method}]})
+            operations[operation_id] = {
+                'name': operation_id,
+                'documentation': 'Performs ' + operation_id + ' on ' + service_name + '.',
+                'metadata': metadata,
+                'params': params,
+                'output': {'documentation': 'The result.', 'metadata': {}, 'type': output},
+                'errors': [{'structure_id': error, 'documentation': 'If the operation fails.'}
+                           for error in sorted(ERROR_CODES)[:3]]}
+        if service_operations:
+            self.service_operations_dict['/' + service_id.replace('.', '/')] = service_operations
+        return {'name': service_id,
+                'documentation': 'Manages ' + service_name + ' resources.',
+                'metadata': {},
+                'operations': operations,
+                'structures': {},
+                'enumerations': {},
+                'constants': {}}
+
+    def get_operation_signature(self, index, structure_id):
+        id_param = field('id', builtin_type('ID'),
+                         {'PathVariable': {'elements': {'value': string_element('id')}}})
+        if index == 0:
+            return 'GET', 'list', [], generic_type('LIST', structure_type(structure_id))
+        if index == 1:
+            return 'GET', 'get', [id_param], structure_type(structure_id)
+        if index == 2:
+            return 'POST', 'create', [field('spec', structure_type(structure_id), {'Body': {'elements': {}}})], \
+                builtin_type('ID')
+        if index == 3:
+            return 'PATCH', 'update', [id_param, field('spec', structure_type(structure_id),
+                                                       {'Body': {'elements': {}}})], builtin_type('VOID')
+        if index == 4:
+            return 'DELETE', 'delete', [id_param], builtin_type('VOID')
+        return 'POST', 'action' + str(index), [field('value', builtin_type('STRING'), {'Body': {'elements': {}}})], \
+            builtin_type('VOID')
+
+    def get_package_dump(self, package_id, structures, enumerations, services):
+        return {'name': package_id,
+                'documentation': 'The ' + package_id + ' package.',
+                'metadata': {},
+                'structures': structures,
+                'enumerations': enumerations,
+                'services': services}
+
+    def get_component_dump(self, component_id, packages):
+        return {'info': {'name': component_id,
+                         'documentation': 'The ' + component_id + ' component.',
+                         'metadata': {},
+                         'packages': packages},
+                'fingerprint': str(self.options.seed) + '-' + component_id}
@@ -29,7 +29,8 @@ class ApiMetadataProcessor(MetadataProcessor):
             http_error_map,
             show_unreleased_apis,
             spec,
-            auth_navigator=None):
+            auth_navigator=None,
+            type_resolution_memo=None):
 
         print('processing package ' + package_name + os.linesep)
         type_dict = {}
@@ -66,11 +67,8 @@ class ApiMetadataProcessor(MetadataProcessor):
                         enum_dict,
                         operation_id,
                         http_error_map,
-                        show_unreleased_apis)
-                    if auth_navigator is not None:
-                        scheme_set = auth_navigator.find_schemes_set(operation_id, service_name, package_name)
-                        if scheme_set is not None and len(scheme_set) != 0:
-                            swagg.decorate_path_with_security(path, scheme_set)
+                        show_unreleased_apis,
+                        type_resolution_memo)
                 if spec == '3':
                     path = openapi.get_path(
                         operation_info,
@@ -82,8 +80,11 @@ class ApiMetadataProcessor(MetadataProcessor):
                         enum_dict,
                         operation_id,
                         http_error_map,
-                        show_unreleased_apis)
+                        show_unreleased_apis,
+                        type_resolution_memo)
 
+                if auth_navigator is not None:
+                    self.decorate_path_with_security(path, operation_id, service_name, package_name, auth_navigator)
                 path_list.append(path)
             continue
 
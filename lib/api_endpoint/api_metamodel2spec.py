@@ -17,7 +17,8 @@ class ApiMetamodel2Spec():
             enum_dict,
             operation_id,
             error_map,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         pass
 
     def handle_request_mapping(
@@ -32,7 +33,8 @@ class ApiMetamodel2Spec():
             structure_svc,
             enum_svc,
             show_unreleased_apis,
-            spec):
+            spec,
+            type_resolution_memo=None):
         if method_type in ('post', 'put', 'patch'):
             return self.process_put_post_patch_request(
                 url,
@@ -44,7 +46,8 @@ class ApiMetamodel2Spec():
                 structure_svc,
                 enum_svc,
                 show_unreleased_apis,
-                spec)
+                spec,
+                type_resolution_memo)
         if method_type == 'get':
             return self.process_get_request(
                 url,
@@ -53,7 +56,8 @@ class ApiMetamodel2Spec():
                 structure_svc,
                 enum_svc,
                 show_unreleased_apis,
-                spec)
+                spec,
+                type_resolution_memo)
         if method_type == 'delete':
             return self.process_delete_request(
                 url,
@@ -62,7 +66,8 @@ class ApiMetamodel2Spec():
                 structure_svc,
                 enum_svc,
                 show_unreleased_apis,
-                spec)
+                spec,
+                type_resolution_memo)
 
     def process_put_post_patch_request(
             self,
@@ -75,7 +80,8 @@ class ApiMetamodel2Spec():
             structure_svc,
             enum_svc,
             show_unreleased_apis,
-            spec):
+            spec,
+            type_resolution_memo=None):
         """
         Handles http post/put/patch request.
         todo: handle query, formData and header parameters
@@ -86,7 +92,8 @@ class ApiMetamodel2Spec():
         par_array = []
         for field_info in path_param_list:
             parx = spec.convert_field_info_to_swagger_parameter(
-                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             par_array.append(parx)
 
         # Body
@@ -102,7 +109,8 @@ class ApiMetamodel2Spec():
                 type_dict,
                 structure_svc,
                 enum_svc,
-                show_unreleased_apis)
+                show_unreleased_apis,
+                type_resolution_memo)
             if parx is not None:
                 if isinstance(parx, list):
                     par_array.extend(parx)
@@ -114,7 +122,8 @@ class ApiMetamodel2Spec():
             other_param_list)
         for query_param in query_param_list:
             parx = spec.convert_field_info_to_swagger_parameter(
-                'query', query_param, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                'query', query_param, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             par_array.append(parx)
 
         # process query parameters
@@ -123,7 +132,8 @@ class ApiMetamodel2Spec():
             # handling of all the query parameters; filter as well as non
             # filter
             flattened_params = spec.flatten_query_param_spec(
-                field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             if flattened_params is not None:
                 par_array = par_array + flattened_params
 
@@ -137,14 +147,16 @@ class ApiMetamodel2Spec():
             structure_svc,
             enum_svc,
             show_unreleased_apis,
-            spec):
+            spec,
+            type_resolution_memo=None):
         param_array = []
         path_param_list, other_params_list, new_url = utils.extract_path_parameters(
             params, url)
 
         for field_info in path_param_list:
             parameter_obj = spec.convert_field_info_to_swagger_parameter(
-                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             param_array.append(parameter_obj)
 
         query_param_list, other_params_list = utils.extract_query_parameters(
@@ -152,7 +164,8 @@ class ApiMetamodel2Spec():
         # Query
         for query_param in query_param_list:
             parameter_obj = spec.convert_field_info_to_swagger_parameter(
-                'query', query_param, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                'query', query_param, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             param_array.append(parameter_obj)
 
         # process query parameters
@@ -161,7 +174,8 @@ class ApiMetamodel2Spec():
             # handling of all the query parameters; filter as well as non
             # filter
             flattened_params = spec.flatten_query_param_spec(
-                field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             if flattened_params is not None:
                 param_array = param_array + flattened_params
         return param_array, new_url
@@ -174,17 +188,20 @@ class ApiMetamodel2Spec():
             structure_svc,
             enum_svc,
             show_unreleased_apis,
-            spec):
+            spec,
+            type_resolution_memo=None):
         path_param_list, other_params, new_url = utils.extract_path_parameters(
             params, url)
         param_array = []
         for field_info in path_param_list:
             parx = spec.convert_field_info_to_swagger_parameter(
-                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             param_array.append(parx)
         for field_info in other_params:
             parx = spec.convert_field_info_to_swagger_parameter(
-                'query', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                'query', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             param_array.append(parx)
         return param_array, new_url
 
@@ -7,8 +7,8 @@ from lib.type_handler_common import TypeHandlerCommon
 
 class ApiTypeHandler(TypeHandlerCommon):
 
-    def __init__(self, show_unreleased_apis):
-        TypeHandlerCommon.__init__(self, show_unreleased_apis)
+    def __init__(self, show_unreleased_apis, type_resolution_memo=None):
+        TypeHandlerCommon.__init__(self, show_unreleased_apis, type_resolution_memo)
 
     def visit_generic(
             self,
@@ -100,29 +100,14 @@ class ApiTypeHandler(TypeHandlerCommon):
             enum_svc,
             ref_path):
         camel_cased_type_name = utils.get_str_camel_case(type_name, *utils.CAMELCASE_SEPARATOR_LIST)
-        if camel_cased_type_name in type_dict or utils.is_type_builtin(type_name):
-            return
-        if resource_type == 'com.vmware.vapi.structure':
-            structure_info = self.get_structure_info(type_name, structure_svc)
-            if structure_info is not None:
-                # Mark it as visited to handle recursive definitions. (Type A
-                # referring to Type A in one of the fields).
-                type_dict[camel_cased_type_name] = {}
-                self.process_structure_info(
-                    camel_cased_type_name,
-                    structure_info,
-                    type_dict,
-                    structure_svc,
-                    enum_svc,
-                    ref_path)
-        else:
-            enum_info = self.get_enum_info(type_name, enum_svc)
-            if enum_info is not None:
-                # Mark it as visited to handle recursive definitions. (Type A
-                # referring to Type A in one of the fields).
-                type_dict[camel_cased_type_name] = {}
-                self.process_enum_info(
-                    camel_cased_type_name, enum_info, type_dict)
+        self.resolve_type(
+            resource_type,
+            type_name,
+            camel_cased_type_name,
+            type_dict,
+            structure_svc,
+            enum_svc,
+            ref_path)
 
     def visit_user_defined(
             self,
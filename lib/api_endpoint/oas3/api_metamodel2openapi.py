@@ -22,16 +22,20 @@ class ApiMetamodel2Openapi(ApiMetamodel2Spec):
             enum_dict,
             operation_id,
             http_error_map,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         documentation = operation_info.documentation
         op_metadata = operation_info.metadata
+        method_info = op_metadata[http_method]
+        content_type = method_info.elements["consumes"].string_value if "consumes" in method_info.elements else None
         params = operation_info.params
         errors = operation_info.errors
         output = operation_info.output
         http_method = http_method.lower()
         par_array, url = self.handle_request_mapping(url, http_method, service_name,
-                                                     operation_id, params, type_dict,
-                                                     structure_dict, enum_dict, show_unreleased_apis, api_open_ph)
+                                                     operation_id, params, content_type, type_dict,
+                                                     structure_dict, enum_dict, show_unreleased_apis, api_open_ph,
+                                                     type_resolution_memo)
         response_map = api_open_rh.populate_response_map(
             output,
             errors,
@@ -42,7 +46,8 @@ class ApiMetamodel2Openapi(ApiMetamodel2Spec):
             service_name,
             operation_id,
             op_metadata,
-            show_unreleased_apis)
+            show_unreleased_apis,
+            type_resolution_memo)
 
         path_obj = utils.build_path(
             service_name,
@@ -16,13 +16,14 @@ class ApiOpenapiParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Converts metamodel fieldinfo to swagger parameter.
         """
         parameter_obj = {}
         ref_path = "#/components/schemas/"
-        tpHandler = ApiTypeHandler(show_unreleased_apis)
+        tpHandler = ApiTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             input_parameter_obj.type,
             parameter_obj,
@@ -65,7 +66,8 @@ class ApiOpenapiParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Creates a  json object wrapper around request body parameters. parameter names are used as keys and the
         parameters as values.
@@ -84,7 +86,7 @@ class ApiOpenapiParaHandler():
         properties_obj = {}
         required = []
         ref_path = "#/components/schemas/"
-        tpHandler = ApiTypeHandler(show_unreleased_apis)
+        tpHandler = ApiTypeHandler(show_unreleased_apis, type_resolution_memo)
         for param in body_param_list:
             parameter_obj = {}
             tpHandler.visit_type_category(
@@ -119,7 +121,8 @@ class ApiOpenapiParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Flattens query parameters specs.
         1. Create a query parameter for every field in spec.
@@ -156,7 +159,7 @@ class ApiOpenapiParaHandler():
         prop_array = []
         parameter_obj = {}
         ref_path = "#/components/schemas/"
-        tpHandler = ApiTypeHandler(show_unreleased_apis)
+        tpHandler = ApiTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             query_param_info.type,
             parameter_obj,
@@ -21,7 +21,8 @@ class ApiOpenapiRespHandler():
             service_id,
             operation_id,
             op_metadata,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
 
         response_map = {}
         ref_path = "#/components/schemas/"
@@ -33,7 +34,7 @@ class ApiOpenapiRespHandler():
             }
         }
         schema = {}
-        tpHandler = ApiTypeHandler(show_unreleased_apis)
+        tpHandler = ApiTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             output.type,
             schema,
@@ -1,7 +1,7 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
-from lib import utils, authentication_metadata_processing
+from lib import utils
 from lib.api_endpoint.api_metamodel2spec import ApiMetamodel2Spec
 from .api_swagger_parameter_handler import ApiSwaggerParaHandler
 from .api_swagger_response_handler import ApiSwaggerRespHandler
@@ -22,7 +22,8 @@ class ApiMetamodel2Swagger(ApiMetamodel2Spec):
             enum_dict,
             operation_id,
             http_error_map,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         documentation = operation_info.documentation
         op_metadata = operation_info.metadata
         method_info = op_metadata[http_method]
@@ -34,7 +35,8 @@ class ApiMetamodel2Swagger(ApiMetamodel2Spec):
         http_method = http_method.lower()
         par_array, url = self.handle_request_mapping(url, http_method, service_name,
                                                      operation_id, params, content_type, type_dict,
-                                                     structure_dict, enum_dict, show_unreleased_apis, api_swagg_ph)
+                                                     structure_dict, enum_dict, show_unreleased_apis, api_swagg_ph,
+                                                     type_resolution_memo)
         response_map = api_swagg_rh.populate_response_map(
             output,
             errors,
@@ -45,7 +47,8 @@ class ApiMetamodel2Swagger(ApiMetamodel2Spec):
             service_name,
             operation_id,
             op_metadata,
-            show_unreleased_apis)
+            show_unreleased_apis,
+            type_resolution_memo)
 
         consumes = None
         if content_type == 'FORM_URLENCODED':
@@ -80,12 +83,3 @@ class ApiMetamodel2Swagger(ApiMetamodel2Spec):
         if path_obj['operationId'].endswith('$task'):
             path_obj['path'] = utils.add_query_param(
                 path_obj['path'], 'vmw-task=true')
-
-    def decorate_path_with_security(self, path_obj, scheme_set):
-        security_schemes = []
-        if authentication_metadata_processing.session_id_scheme in scheme_set:
-            security_schemes.append({"session_id": []})
-        if authentication_metadata_processing.basic_auth_scheme in scheme_set:
-            security_schemes.append({"basic_auth": []})
-        if security_schemes:
-            path_obj["security"] = security_schemes
@@ -15,13 +15,14 @@ class ApiSwaggerParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Converts metamodel fieldinfo to swagger parameter.
         """
         parameter_obj = {}
         ref_path = "#/definitions/"
-        tpHandler = ApiTypeHandler(show_unreleased_apis)
+        tpHandler = ApiTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             input_parameter_obj.type,
             parameter_obj,
@@ -58,7 +59,8 @@ class ApiSwaggerParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Creates a  json object wrapper around request body parameters. parameter names are used as keys and the
         parameters as values.
@@ -75,7 +77,7 @@ class ApiSwaggerParaHandler():
         properties_obj = {}
         required = []
         ref_path = "#/definitions/"
-        tpHandler = ApiTypeHandler(show_unreleased_apis)
+        tpHandler = ApiTypeHandler(show_unreleased_apis, type_resolution_memo)
         for param in body_param_list:
             parameter_obj = {}
             tpHandler.visit_type_category(
@@ -135,7 +137,8 @@ class ApiSwaggerParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Flattens query parameters specs.
         1. Create a query parameter for every field in spec.
@@ -172,7 +175,7 @@ class ApiSwaggerParaHandler():
         prop_array = []
         parameter_obj = {}
         ref_path = "#/definitions/"
-        tpHandler = ApiTypeHandler(show_unreleased_apis)
+        tpHandler = ApiTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             query_param_info.type,
             parameter_obj,
@@ -21,13 +21,14 @@ class ApiSwaggerRespHandler():
             service_id,
             operation_id,
             op_metadata,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
 
         response_map = {}
         ref_path = "#/definitions/"
         success_response = {'description': output.documentation}
         schema = {}
-        tpHandler = ApiTypeHandler(show_unreleased_apis)
+        tpHandler = ApiTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             output.type,
             schema,
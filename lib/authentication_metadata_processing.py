@@ -1,18 +1,34 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
+import os
+from concurrent import futures
+
 import six
 
+from lib import dictionary_processing
+from lib import offline_metamodel
+
 # Supproted authentication metadata schemes
 no_authentication_scheme = 'com.vmware.vapi.std.security.no_authentication'
 session_id_scheme = 'com.vmware.vapi.std.security.session_id'
 basic_auth_scheme = 'com.vmware.vapi.std.security.user_pass'
+# Names of the security schemes the supported authentication schemes are described by, in the order
+# they are listed in an operation's security requirements
+security_scheme_names = ((session_id_scheme, 'session_id'), (basic_auth_scheme, 'basic_auth'))
 
-def get_authentication_dict(auth_component_svc):
+def get_authentication_dict(auth_component_svc, generate_metamodel=False, max_workers=1, thread_initializer=None):
     auth_dict = {}
     auth_components = auth_component_svc.list()
-    for auth_component in auth_components:
-        auth_component_data = auth_component_svc.get(auth_component)
+    # Fetched concurrently, merged in the order of the component list as populate_dicts does
+    with futures.ThreadPoolExecutor(max_workers=max(1, max_workers), initializer=thread_initializer) as executor:
+        auth_component_data_list = list(executor.map(auth_component_svc.get, auth_components))
+    for auth_component, auth_component_data in zip(auth_components, auth_component_data_list):
+        if generate_metamodel:
+            authentication_dir = os.path.join('metamodel', 'authentication')
+            os.makedirs(authentication_dir, exist_ok=True)
+            offline_metamodel.write_component_dump(
+                authentication_dir, auth_component, dictionary_processing.objectTodict(auth_component_data))
         for package_name, package_info in six.iteritems(auth_component_data.info.packages):
             if package_name not in auth_dict:
                 auth_dict[package_name] = AuthenticationComponentBuilder.build_package_level_component(package_info)
@@ -25,42 +41,75 @@ def get_authentication_dict(auth_component_svc):
 
 
 class AuthenticationDictNavigator:
+    """
+    Answers which authentication schemes apply to an operation. The package,
+    service and operation levels of auth_dict are flattened once into indexes
+    holding the scheme set of every component. The most specific component
+    found decides, an empty scheme set means the operation needs no authentication.
+    """
 
     def __init__(self, auth_dict):
         self.auth_dict = auth_dict
+        # Maps package name to its scheme set
+        self.package_schemes_dict = {}
+        # Maps service id to the scheme set of the service
+        self.service_schemes_dict = {}
+        # Maps (service id, operation id) to the scheme set of the operation
+        self.operation_schemes_dict = {}
+        # Memo of the lookups of services missing from the metadata, which fall back to a prefix
+        self.fallback_schemes_dict = {}
+        # Maps every distinct scheme set to the names of its security schemes
+        self.security_scheme_names_dict = {}
+        for package_name, package_component in six.iteritems(auth_dict):
+            self.package_schemes_dict[package_name] = package_component.get_schemes_set()
+            for service_name, service_component in six.iteritems(package_component.get_subcomponents_dict()):
+                self.service_schemes_dict[service_name] = service_component.get_schemes_set()
+                for operation_id, operation_component in six.iteritems(
+                        service_component.get_subcomponents_dict()):
+                    self.operation_schemes_dict[(service_name, operation_id)] = operation_component.get_schemes_set()
 
     def find_schemes_set(self, operation_id, service_name, package):
-        component = self.__preorder_depth_first_search_component(service_name, package)
-        if component is not None:
-            operation_component = component.get_subcomponents_dict().get(operation_id)
-            if operation_component is not None:
-                return operation_component.get_schemes_set()
-            else:
-                return component.get_schemes_set()
+        """
+        Returns the scheme set of the operation, else of its service, else of the
+        closest enclosing package or service, or None if none of them has
+        authentication metadata.
+        Service ids are unique across packages, so package is not needed for the
+        lookup, it is kept for the callers.
+        """
+        scheme_set = self.operation_schemes_dict.get((service_name, operation_id))
+        if scheme_set is not None:
+            return scheme_set
+        if service_name not in self.fallback_schemes_dict:
+            self.fallback_schemes_dict[service_name] = self.__find_enclosing_schemes_set(service_name)
+        return self.fallback_schemes_dict[service_name]
+
+    def get_security_requirements(self, operation_id, service_name, package):
+        """
+        Returns the security requirements of the operation, in the format of both
+        the swagger and the openapi operation objects, or None if it has none.
+        Most operations share the scheme set of their service, which is resolved once.
+        """
+        scheme_set = self.find_schemes_set(operation_id, service_name, package)
+        if not scheme_set:
+            return None
+        scheme_set_key = frozenset(scheme_set)
+        scheme_names = self.security_scheme_names_dict.get(scheme_set_key)
+        if scheme_names is None:
+            scheme_names = tuple(scheme_name for scheme, scheme_name in security_scheme_names if scheme in scheme_set)
+            self.security_scheme_names_dict[scheme_set_key] = scheme_names
+        if not scheme_names:
+            return None
+        # Every operation gets its own copy, the path dictionaries are modified by the post-processing
+        return [{scheme_name: []} for scheme_name in scheme_names]
 
-        service_name = ".".join(service_name.split('.')[:-1])
+    def __find_enclosing_schemes_set(self, service_name):
+        # The service itself, then every shorter dotted prefix naming a service or a package
         while service_name:
-            component = self.__preorder_depth_first_search_component(service_name, package)
-            if component is not None:
-                return component.get_schemes_set()
-            else:
-                service_name = ".".join(service_name.split('.')[:-1])
-
-        return None
-
-
-    def __preorder_depth_first_search_component(self, service_name, package):
-        if service_name in self.auth_dict:
-            return self.auth_dict[service_name]
-        else:
-            for package_name, package_component in six.iteritems(self.auth_dict):
-                if package not in package_name:
-                    continue
-
-                component = package_component.recursive_search_for_component(service_name)
-                if component is not None:
-                    return component
-
+            if service_name in self.service_schemes_dict:
+                return self.service_schemes_dict[service_name]
+            if service_name in self.package_schemes_dict:
+                return self.package_schemes_dict[service_name]
+            service_name = ".".join(service_name.split('.')[:-1])
         return None
 
 
@@ -126,4 +175,7 @@ class AuthenticationComponent:
             return self.subcomponents_dict[component_name]
         else:
             for _, subcomponent in six.iteritems(self.subcomponents_dict):
-                return subcomponent.recursive_search_for_component(component_name)
+                component = subcomponent.recursive_search_for_component(component_name)
+                if component is not None:
+                    return component
+            return None
@@ -0,0 +1,94 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import contextlib
+import gzip
+import hashlib
+import lzma
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# File name suffix of every supported compression
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'xz': '.xz'}
+CHUNK_SIZE = 1024 * 1024
+
+
+class HashingWriter:
+    """
+    Passes the bytes written by a compressor on to a file, counting and hashing them.
+    """
+
+    def __init__(self, file_obj):
+        self.file_obj = file_obj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.file_obj.write(data)
+
+    def flush(self):
+        self.file_obj.flush()
+
+    def describe(self, file_name):
+        return {'file': os.path.basename(file_name), 'size': self.size, 'sha256': self.sha256.hexdigest()}
+
+
+def open_compressor(compression, writer):
+    if compression == 'gzip':
+        # No file name and time stamp in the header, the same file compresses to the same bytes
+        return gzip.GzipFile(filename='', mode='wb', fileobj=writer, mtime=0)
+    return lzma.LZMAFile(writer, 'wb', preset=6)
+
+
+def compress_file(file_name, compressions):
+    """
+    Writes a compressed sibling of file_name for every compression, e.g.
+    vcenter.json.gz. The file is read once, in chunks, and every chunk is fed to
+    all the compressors. The siblings are written to temporary files first, so
+    a web server never serves a partially written one.
+    :return: the size and sha256 of the file and of its compressed siblings
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    outputs = []
+    with contextlib.ExitStack() as temp_files:
+        with contextlib.ExitStack() as open_files:
+            for compression in compressions:
+                compressed_file_name = file_name + COMPRESSION_SUFFIXES[compression]
+                temp_file_name = compressed_file_name + '.tmp'
+                # Leave no partially written or unused temporary files behind, every callback
+                # runs even if an earlier one fails
+                temp_files.callback(remove_file, temp_file_name)
+                writer = HashingWriter(open_files.enter_context(open(temp_file_name, 'wb')))
+                compressor = open_compressor(compression, writer)
+                open_files.callback(compressor.close)
+                outputs.append((compression, compressed_file_name, temp_file_name, writer, compressor))
+            with open(file_name, 'rb') as input_file:
+                for chunk in iter(lambda: input_file.read(CHUNK_SIZE), b''):
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    for output in outputs:
+                        output[4].write(chunk)
+
+        artifact = {'size': size, 'sha256': sha256.hexdigest()}
+        for compression, compressed_file_name, temp_file_name, writer, _ in outputs:
+            os.replace(temp_file_name, compressed_file_name)
+            artifact[compression] = writer.describe(compressed_file_name)
+        return artifact
+
+
+def remove_file(file_name):
+    if os.path.exists(file_name):
+        os.remove(file_name)
+
+
+def compress_files(file_names, compressions, max_workers=None):
+    """
+    Compresses the files in parallel, zlib and lzma release the GIL while compressing.
+    :return: maps the base name of every file to its size, sha256 and compressed siblings
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        artifacts = executor.map(lambda file_name: compress_file(file_name, compressions), file_names)
+        return {os.path.basename(file_name): artifact for file_name, artifact in zip(file_names, artifacts)}
@@ -2,9 +2,11 @@
 # SPDX-License-Identifier: MIT
 
 import os
+from concurrent import futures
 
 from lib import utils
 from lib import blacklist_utils
+from lib import offline_metamodel
 
 
 class ServiceType:
@@ -19,16 +21,19 @@ def populate_dicts(
         service_dict,
         service_urls_map,
         base_url,
-        generate_metamodel):
+        generate_metamodel,
+        max_workers=1,
+        thread_initializer=None):
     components = component_svc.list()
-    for component in components:
-        component_data = component_svc.get(component)
+    # Components are fetched concurrently, but merged in the order of the component list,
+    # so definitions present in several components always resolve the same way
+    with futures.ThreadPoolExecutor(max_workers=max(1, max_workers), initializer=thread_initializer) as executor:
+        component_data_list = list(executor.map(component_svc.get, components))
+    for component, component_data in zip(components, component_data_list):
         if generate_metamodel:
-            if not os.path.exists('metamodel'):
-                os.mkdir('metamodel')
-            utils.write_json_data_to_file(
-                'metamodel/' + component + '.json',
-                objectTodict(component_data))
+            # The authentication metadata may be dumped into it concurrently
+            os.makedirs('metamodel', exist_ok=True)
+            offline_metamodel.write_component_dump('metamodel', component, objectTodict(component_data))
         component_packages = component_data.info.packages
         for package in component_packages:
             package_info = component_packages.get(package)
@@ -78,22 +83,22 @@ def get_service_url_from_service_id(base_url, service_id):
     return base_url + '/' + replaced_string.replace('_', '-')
 
 
-def get_service_urls_from_rest_navigation(rest_navigation_url, verify):
+def get_service_urls_from_rest_navigation(rest_navigation_url, verify, session):
     component_services_urls = get_component_services_urls(
-        rest_navigation_url, verify)
-    return get_all_services_urls(component_services_urls, verify)
+        rest_navigation_url, verify, session)
+    return get_all_services_urls(component_services_urls, verify, session)
 
 
-def get_component_services_urls(cloudvm_url, verify):
-    components_url = utils.get_json(cloudvm_url, verify)['components']['href']
-    components = utils.get_json(components_url, verify)
+def get_component_services_urls(cloudvm_url, verify, session):
+    components_url = utils.get_json(cloudvm_url, verify, session)['components']['href']
+    components = utils.get_json(components_url, verify, session)
     return [component['services']['href'] for component in components]
 
 
-def get_all_services_urls(components_urls, verify):
+def get_all_services_urls(components_urls, verify, session):
     service_url_dict = {}
     for url in components_urls:
-        services = utils.get_json(url, verify)
+        services = utils.get_json(url, verify, session)
         for service in services:
             service_url_dict[service['href']] = service['name']
     return service_url_dict
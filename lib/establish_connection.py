@@ -2,16 +2,18 @@
 # SPDX-License-Identifier: MIT
 
 import argparse
-import os
 from vmware.vapi.stdlib.client.factories import StubConfigurationFactory
 from com.vmware.vapi.metadata import metamodel_client
 from com.vmware.vapi.metadata import authentication_client
 
+from lib.generator import GeneratorConfig
 
-def get_input_params():
+
+def get_generator_config(argv=None):
     """
-    Gets input parameters from command line
-    :return:
+    Gets the options of the generation from the command line
+    :param argv: the arguments, by default sys.argv
+    :return: a validated GeneratorConfig
     """
     parser = argparse.ArgumentParser(
         description='Generate swagger.json files for apis on vcenter')
@@ -97,7 +99,137 @@ def get_input_params():
         default=[],
         dest='auto_rest_services',
         help='list of services described with auto rest')
-    args = parser.parse_args()
+    parser.add_argument(
+        '-cd',
+        '--cache-dir',
+        required=False,
+        default=None,
+        dest='cache_dir',
+        help='Directory for metamodel snapshots. Components whose fingerprint did not change '
+        'since the previous run are loaded from it instead of being fetched again')
+    parser.add_argument(
+        '-off',
+        '--offline-metamodel-dir',
+        required=False,
+        default=None,
+        dest='offline_metamodel_dir',
+        help='Generate the specifications offline from a metamodel directory saved with '
+        '--metamodel-components instead of connecting to vCenter')
+    parser.add_argument(
+        '-fw',
+        '--fetch-workers',
+        type=int,
+        default=8,
+        dest='fetch_workers',
+        help='Maximum number of concurrent requests used to fetch the metadata')
+    parser.add_argument(
+        '-pw',
+        '--process-workers',
+        type=int,
+        default=0,
+        dest='process_workers',
+        help='Generate the packages in this many worker processes instead of threads')
+    parser.add_argument(
+        '-co',
+        '--compact-output',
+        required=False,
+        nargs='?',
+        const=True,
+        default=False,
+        dest='compact_output',
+        help='Write the specification files without indentation')
+    parser.add_argument(
+        '-inc',
+        '--incremental',
+        required=False,
+        nargs='?',
+        const=True,
+        default=False,
+        dest='incremental',
+        help='Only generate the packages whose metadata changed since the last run into the output directory')
+    parser.add_argument(
+        '-pr',
+        '--profile-report',
+        required=False,
+        default=None,
+        dest='profile_report',
+        help='Write the wall time, call count and bytes of every generation phase to this json file')
+    parser.add_argument(
+        '-cp',
+        '--cprofile-output',
+        required=False,
+        default=None,
+        dest='cprofile_output',
+        help='Profile the main thread of the run with cProfile and write the statistics to this file in pstats format; '
+             'the threads fetching the metamodel and generating the packages are not profiled')
+    parser.add_argument(
+        '-rec',
+        '--record-archive',
+        required=False,
+        default=None,
+        dest='record_archive',
+        help='Record every response of the metadata services and rest navigation into this archive')
+    parser.add_argument(
+        '-rep',
+        '--replay-archive',
+        required=False,
+        default=None,
+        dest='replay_archive',
+        help='Serve every request from an archive saved with --record-archive instead of connecting to vCenter')
+    parser.add_argument(
+        '-pus',
+        '--prune-unused-schemas',
+        required=False,
+        nargs='?',
+        const=True,
+        default=False,
+        dest='prune_unused_schemas',
+        help='Leave out the schemas which no path or request body of the specification file refers to')
+    parser.add_argument(
+        '-sc',
+        '--shared-components',
+        required=False,
+        nargs='?',
+        const=True,
+        default=False,
+        dest='shared_components',
+        help='Write the schemas which several specification files define identically once, into components.json')
+    parser.add_argument(
+        '-z',
+        '--compress',
+        required=False,
+        nargs='?',
+        const='gzip',
+        default=None,
+        dest='compress',
+        help='Also write compressed copies of the specification files: gzip (default), xz or gzip,xz')
+    parser.add_argument(
+        '-sbt',
+        '--shard-by-tag',
+        required=False,
+        nargs='?',
+        const=True,
+        default=False,
+        dest='shard_by_tag',
+        help='Also write a fragment of every specification file per tag, and an index of the fragments')
+    parser.add_argument(
+        '-srv',
+        '--serve',
+        required=False,
+        nargs='?',
+        const='127.0.0.1:8000',
+        default=None,
+        dest='serve',
+        help='Keep running and serve the specification files over HTTP at host:port (default 127.0.0.1:8000) '
+        'instead of writing them. They are generated again when the metamodel changes')
+    parser.add_argument(
+        '-ri',
+        '--refresh-interval',
+        type=int,
+        default=300,
+        dest='refresh_interval',
+        help='Seconds between the checks of --serve for metamodel changes')
+    args = parser.parse_args(argv)
     metadata_url = args.metadata_url
     rest_navigation_url = args.rest_navigation_url
     vcip = args.vcip
@@ -107,55 +239,40 @@ def get_input_params():
         if rest_navigation_url is None:
             rest_navigation_url = 'https://%s/rest' % vcip
 
-    if metadata_url is None or rest_navigation_url is None:
-        raise ValueError(
-            'metadataUrl and restNavigationUrl are required parameters')
-    metadata_url = metadata_url.rstrip('/')
-    rest_navigation_url = rest_navigation_url.rstrip('/')
-    output_dir = args.output
-    if args.host is not None:
-        global API_SERVER_HOST
-        API_SERVER_HOST = args.host
-    if output_dir is None:
-        output_dir = os.getcwd()
-    verify = not args.insecure
-
-    global GENERATE_UNIQUE_OP_IDS
-    GENERATE_UNIQUE_OP_IDS = args.unique_operation_ids
-
-    global TAG_SEPARATOR
-    TAG_SEPARATOR = args.tag_separator
-
-    global show_unreleased_apis
-    show_unreleased_apis = args.show_unreleased_apis
-
-    global GENERATE_METAMODEL
-    GENERATE_METAMODEL = args.metamodel_components
-
-    global SPECIFICATION
-    if args.oas not in ['2', '3']:
-        raise Exception(" Input Valid Specification ")
-    SPECIFICATION = args.oas
-
-    global DEPRECATE_REST
-    DEPRECATE_REST = args.deprecate_rest
-
-    fetch_auth_metadata = args.fetch_auth_metadata
-
-    auto_rest_services = args.auto_rest_services
+    compressions = ()
+    if args.compress is not None:
+        compressions = tuple(args.compress.split(','))
 
-    return metadata_url,\
-           rest_navigation_url,\
-           output_dir,\
-           verify,\
-           show_unreleased_apis,\
-           GENERATE_METAMODEL,\
-           SPECIFICATION,\
-           GENERATE_UNIQUE_OP_IDS,\
-           TAG_SEPARATOR,\
-           DEPRECATE_REST,\
-           fetch_auth_metadata,\
-           auto_rest_services
+    config = GeneratorConfig(metadata_url=metadata_url,
+                             rest_navigation_url=rest_navigation_url,
+                             output_dir=args.output,
+                             verify=not args.insecure,
+                             show_unreleased_apis=args.show_unreleased_apis,
+                             generate_metamodel=args.metamodel_components,
+                             spec=args.oas,
+                             unique_operation_ids=args.unique_operation_ids,
+                             tag_separator=args.tag_separator,
+                             deprecate_rest=args.deprecate_rest,
+                             fetch_auth_metadata=args.fetch_auth_metadata,
+                             auto_rest_services=args.auto_rest_services,
+                             cache_dir=args.cache_dir,
+                             offline_metamodel_dir=args.offline_metamodel_dir,
+                             fetch_workers=args.fetch_workers,
+                             process_workers=args.process_workers,
+                             compact_output=args.compact_output,
+                             incremental=args.incremental,
+                             profile_report=args.profile_report,
+                             cprofile_output=args.cprofile_output,
+                             record_archive=args.record_archive,
+                             replay_archive=args.replay_archive,
+                             prune_unused_schemas=args.prune_unused_schemas,
+                             shared_components=args.shared_components,
+                             compressions=compressions,
+                             shard_by_tag=args.shard_by_tag,
+                             serve=args.serve,
+                             refresh_interval=args.refresh_interval)
+    config.validate()
+    return config
 
 
 def get_component_service(connector):
@@ -1,12 +1,17 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
+import json
 import os
 
 import six
 
+from lib import compressed_output
 from lib import utils
 from lib.openapi_final_path_processing import OpenapiPathProcessing
+from lib.path_processing import OperationIdRegistry
+from lib.reference_index import ReferenceIndex
+from lib.shared_components import SHARED_COMPONENTS_FILE, SharedComponentsExtractor
 from lib.swagger_final_path_processing import SwaggerPathProcessing
 
 
@@ -18,12 +23,46 @@ class FileOutputHandler:
                  output_dir,
                  gen_unique_op_id,
                  spec,
-                 split_api_rest=False):
+                 split_api_rest=False,
+                 compact=False,
+                 unchanged_packages=(),
+                 reserved_operation_ids=(),
+                 index_references=False,
+                 prune_unused_schemas=False,
+                 shared_components=False,
+                 compressions=(),
+                 shard_by_tag=False):
         self.rest_package_spec_dict = rest_package_spec_dict
         self.api_package_spec_dict = api_package_spec_dict
         self.output_dir = output_dir
         self.gen_unique_op_id = gen_unique_op_id
         self.split_api_rest = split_api_rest
+        self.compact = compact
+        # Packages left out of this run because their files are up to date
+        self.unchanged_packages = unchanged_packages
+        # Maps each package to the file it was written to
+        self.output_file_dict = {}
+        self.spec = spec
+        self.index_references = index_references or prune_unused_schemas or shared_components or shard_by_tag
+        self.prune_unused_schemas = prune_unused_schemas
+        # Maps each written document to the number of pruned models and the bytes they took
+        self.pruned_schema_dict = {}
+        # Schemas defined identically by several documents are written once, into shared_components_file
+        self.shared_components = shared_components
+        self.shared_components_extractor = None
+        self.shared_components_file = None
+        # Compressed siblings, e.g. vcenter.json.gz, are written for every compression
+        self.compressions = compressions
+        # Maps the base name of every file listed in api.json to its size, hash and compressed siblings
+        self.artifact_dict = {}
+        # Maps each written document to its tag index file, followed by its tag fragments
+        self.shard_by_tag = shard_by_tag
+        self.shard_file_dict = {}
+        # Maps the packages to the ReferenceIndex of their documents, if index_references
+        self.rest_reference_index_dict = {}
+        self.api_reference_index_dict = {}
+        # Maps each written document, like output_file_dict, to its ReferenceIndex
+        self.reference_index_dict = {}
 
         if spec == '2':
             self.processor = SwaggerPathProcessing()
@@ -32,42 +71,109 @@ class FileOutputHandler:
 
         for package, path_type_tuple in six.iteritems(self.rest_package_spec_dict):
             self.__preprocess_dict(path_type_tuple[0], path_type_tuple[1])
+            if self.index_references:
+                self.rest_reference_index_dict[package] = self.__index_references(*path_type_tuple)
         for package, path_type_tuple in six.iteritems(self.api_package_spec_dict):
             self.__preprocess_dict(path_type_tuple[0], path_type_tuple[1], True)
+            if self.index_references:
+                self.api_reference_index_dict[package] = self.__index_references(*path_type_tuple)
+
+        # Operation ids are unique across all documents, also when /rest and /api
+        # documents are merged. reserved_operation_ids are the ids of the
+        # unchanged packages of an incremental run.
+        self.operation_id_registry = OperationIdRegistry(reserved_operation_ids)
+        if self.gen_unique_op_id:
+            self.__create_unique_op_ids()
 
     def __preprocess_dict(self, path_dict, type_dict, add_camel_case=False):
         processor = self.processor
-        processor.remove_com_vmware_from_dict(path_dict, 0, [], add_camel_case)
-        if self.gen_unique_op_id:
-            processor.create_unique_op_ids(path_dict)
+        processor.remove_com_vmware_from_dict(path_dict, 0, add_camel_case)
         #processor.remove_query_params(path_dict)
-        processor.remove_com_vmware_from_dict(type_dict, 0, [], add_camel_case)
+        processor.remove_com_vmware_from_dict(type_dict, 0, add_camel_case)
+
+    def __index_references(self, path_dict, type_dict):
+        reference_index = ReferenceIndex(self.spec)
+        reference_index.add_path_dict(path_dict)
+        reference_index.add_type_dict(type_dict)
+        return reference_index
+
+    def __create_unique_op_ids(self):
+        # Sorted, so the suffixes do not depend on the order the packages were generated in
+        for package in sorted(set(self.rest_package_spec_dict) | set(self.api_package_spec_dict)):
+            for package_spec_dict in (self.rest_package_spec_dict, self.api_package_spec_dict):
+                if package in package_spec_dict:
+                    self.processor.create_unique_op_ids(
+                        package_spec_dict[package][0], self.operation_id_registry, package)
+
+    def get_renamed_operation_ids(self):
+        return self.operation_id_registry.renamed_operation_ids
+
+    def get_package_operation_ids(self):
+        return self.operation_id_registry.package_operation_ids
+
+    def __get_documents(self):
+        """
+        Returns the documents to output, as (output name, package, path dict, type dict, file prefix)
+        """
+        if self.split_api_rest:
+            documents = self.__get_split_documents()
+        else:
+            documents = self.__get_merged_documents()
+        if self.prune_unused_schemas:
+            for output_name, _, _, type_dict, _ in documents:
+                self.pruned_schema_dict[output_name] = self.processor.prune_unused_schemas(
+                    type_dict, self.reference_index_dict[output_name], self.compact)
+        if self.shared_components:
+            self.shared_components_extractor = SharedComponentsExtractor(
+                self.spec, self.compact, self.processor.schema_json_level)
+            self.shared_components_extractor.extract({
+                output_name: (type_dict, self.reference_index_dict[output_name])
+                for output_name, _, _, type_dict, _ in documents})
+        return documents
+
+    def __output_specs(self, documents):
+        if self.shared_components_extractor is not None:
+            self.shared_components_file = self.shared_components_extractor.write(self.output_dir)
+        for output_name, package_name, path_dict, type_dict, file_prefix in documents:
+            if self.shard_by_tag:
+                self.shard_file_dict[output_name] = self.processor.output_tag_shards(
+                    path_dict, type_dict, self.reference_index_dict[output_name], self.output_dir, package_name,
+                    file_prefix, self.compact)
+            self.output_file_dict[output_name] = self.__output_spec(package_name, path_dict, type_dict, file_prefix)
 
     def __output_spec(self, package_name, path_dict, type_dict, file_prefix=''):
-        self.processor.process_output(
+        return self.processor.process_output(
             path_dict,
             type_dict,
             self.output_dir,
             package_name,
             self.gen_unique_op_id,
-            file_prefix)
+            file_prefix,
+            self.compact)
 
-    def __produce_merged(self):
+    def __get_merged_documents(self):
         merger = SpecificationDictsMerger(self.rest_package_spec_dict.copy(),
-                                          self.api_package_spec_dict.copy())
+                                          self.api_package_spec_dict.copy(),
+                                          self.rest_reference_index_dict.copy(),
+                                          self.api_reference_index_dict)
         merged_dict = merger.merge_api_rest_dicts()
-        for package, path_type_tuple in six.iteritems(merged_dict):
-            self.__output_spec(package, path_type_tuple[0], path_type_tuple[1])
+        self.reference_index_dict = merger.rest_reference_index_dict
+        return [(package, package, path_type_tuple[0], path_type_tuple[1], '')
+                for package, path_type_tuple in six.iteritems(merged_dict)]
 
-    def __produce_split(self):
+    def __get_split_documents(self):
+        for package, reference_index in six.iteritems(self.rest_reference_index_dict):
+            self.reference_index_dict["rest_" + package] = reference_index
+        for package, reference_index in six.iteritems(self.api_reference_index_dict):
+            self.reference_index_dict["api_" + package] = reference_index
+        documents = []
         for package, path_type_tuple in six.iteritems(self.rest_package_spec_dict):
-            self.__output_spec(package, path_type_tuple[0], path_type_tuple[1], "rest")
+            documents.append(("rest_" + package, package, path_type_tuple[0], path_type_tuple[1], "rest"))
         for package, path_type_tuple in six.iteritems(self.api_package_spec_dict):
-            self.__output_spec(package, path_type_tuple[0], path_type_tuple[1], "api")
+            documents.append(("api_" + package, package, path_type_tuple[0], path_type_tuple[1], "api"))
+        return documents
 
-    def __produce_api_json(self):
-        # api.json contains list of packages which is used by UI to dynamically
-        # populate dropdown.
+    def __get_api_files_list(self):
         api_files_list = []
         for name in list(self.rest_package_spec_dict.keys()):
             if self.split_api_rest:
@@ -79,30 +185,92 @@ class FileOutputHandler:
                 api_files_list.append("api_" + name)
             else:
                 api_files_list.append(name)
-        api_files_list = list(set(api_files_list))
+        api_files_list.extend(self.unchanged_packages)
+        return list(set(api_files_list))
 
-        api_files = {'files': api_files_list}
+    def __produce_api_json(self):
+        # api.json contains list of packages which is used by UI to dynamically
+        # populate dropdown.
+        api_files = {'files': self.__get_api_files_list()}
+        previous_api_files = self.__load_previous_api_json()
+        if self.shard_by_tag:
+            # The explorer loads the fragments of the tags it shows, instead of whole files
+            shard_index_dict = self.__get_unchanged_entries(previous_api_files.get('shards', {}),
+                                                            self.output_file_dict.keys(), False)
+            for output_name, file_names in six.iteritems(self.shard_file_dict):
+                shard_index_dict[output_name] = os.path.basename(file_names[0])
+            api_files['shards'] = utils.SortedJsonSection(shard_index_dict)
+        if self.compressions:
+            # Lets a web server serve the precompressed files and clients validate their caches
+            self.artifact_dict = dict(self.__get_unchanged_entries(previous_api_files.get('artifacts', {}),
+                                                                   self.artifact_dict.keys(), True),
+                                      **self.artifact_dict)
+            api_files['artifacts'] = utils.SortedJsonSection(self.artifact_dict)
         utils.write_json_data_to_file(
             self.output_dir +
             os.path.sep +
             'api.json',
             api_files)
 
+    def __compress_files(self):
+        file_names = list(self.output_file_dict.values())
+        if self.shared_components_file is not None:
+            file_names.append(self.shared_components_file)
+        for shard_file_names in self.shard_file_dict.values():
+            file_names.extend(shard_file_names)
+        self.artifact_dict = compressed_output.compress_files(file_names, self.compressions)
+
+    def __load_previous_api_json(self):
+        # The files left out of an incremental run are described by the api.json of an earlier one
+        if not self.unchanged_packages:
+            return {}
+        try:
+            with open(os.path.join(self.output_dir, 'api.json')) as api_json_file:
+                return json.load(api_json_file)
+        except (IOError, ValueError):
+            return {}
+
+    def __get_unchanged_entries(self, entry_dict, written_keys, key_is_file):
+        written_keys = set(written_keys)
+        return {key: entry for key, entry in six.iteritems(entry_dict)
+                if key not in written_keys and
+                os.path.exists(os.path.join(self.output_dir, key if key_is_file else entry))}
+
     def output_files(self):
-        if self.split_api_rest:
-            self.__produce_split()
-        else:
-            self.__produce_merged()
+        self.__output_specs(self.__get_documents())
+        if self.compressions:
+            self.__compress_files()
         self.__produce_api_json()
 
+    def get_documents(self):
+        """
+        Post-processes the documents like output_files, but returns them instead
+        of writing them. Shards and compressed copies are not produced. Either
+        this or output_files is called, once.
+        :return: maps the file names, including api.json, to the specification dictionaries
+        """
+        file_dict = {}
+        for _, package_name, path_dict, type_dict, file_prefix in self.__get_documents():
+            file_dict[self.processor.get_output_file_name(package_name, file_prefix)] = \
+                self.processor.get_spec_template(path_dict, type_dict, package_name)
+        if self.shared_components_extractor is not None:
+            file_dict[SHARED_COMPONENTS_FILE] = self.shared_components_extractor.get_spec_template()
+        file_dict['api.json'] = {'files': sorted(self.__get_api_files_list())}
+        return file_dict
+
 
 class SpecificationDictsMerger:
 
     def __init__(self,
                  rest_package_spec_dict,
-                 api_package_spec_dict):
+                 api_package_spec_dict,
+                 rest_reference_index_dict=None,
+                 api_reference_index_dict=None):
         self.rest_package_spec_dict = rest_package_spec_dict
         self.api_package_spec_dict = api_package_spec_dict
+        # The reference indexes of the packages, if any, are merged with their documents
+        self.rest_reference_index_dict = rest_reference_index_dict or {}
+        self.api_reference_index_dict = api_reference_index_dict or {}
 
     def merge_api_rest_dicts(self):
         for package, path_type_tuple in six.iteritems(self.api_package_spec_dict):
@@ -110,8 +278,12 @@ class SpecificationDictsMerger:
                 # Transitive dependency between function calls
                 self.__merge_type_dicts(self.rest_package_spec_dict[package][1], path_type_tuple[1])
                 self.__merge_path_dicts(self.rest_package_spec_dict[package][0], path_type_tuple[0])
+                if package in self.api_reference_index_dict:
+                    self.rest_reference_index_dict[package].merge(self.api_reference_index_dict[package])
             else:
                 self.rest_package_spec_dict[package] = path_type_tuple
+                if package in self.api_reference_index_dict:
+                    self.rest_reference_index_dict[package] = self.api_reference_index_dict[package]
         return self.rest_package_spec_dict
 
     def __merge_path_dicts(self, path_dict_extended, path_dict_added):
@@ -120,9 +292,9 @@ class SpecificationDictsMerger:
 
     def __merge_type_dicts(self, type_dict_extended, type_dict_added):
         # Since /api definitions are CamelCased, no collisions are expected
+        request_bodies = type_dict_extended.get('requestBodies')
         type_dict_extended.update(type_dict_added)
-
-    def __update_rest_references(self, new_ref, old_ref, package):
-        path_dict, type_dict = self.rest_package_spec_dict[package]
-        utils.recursive_ref_update(path_dict, old_ref, new_ref)
-        utils.recursive_ref_update(type_dict, old_ref, new_ref)
+        if request_bodies is not None and 'requestBodies' in type_dict_added:
+            # The request bodies of both documents are kept
+            request_bodies.update(type_dict_added['requestBodies'])
+            type_dict_extended['requestBodies'] = request_bodies
@@ -0,0 +1,617 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+'''
+In-process entry point of the generator. A Generator keeps its connections,
+metadata caches and the loaded metamodel, so a long-lived process can generate
+many times without fetching the metamodel again:
+
+    generator = Generator(GeneratorConfig(offline_metamodel_dir='metamodel', spec='3'))
+    result = generator.generate()
+    path_dict, type_dict = result.api_package_spec_dict['vcenter']
+
+Nothing is stored in module globals, several generators may live side by side.
+'''
+from __future__ import print_function
+
+import os
+import threading
+import timeit
+from concurrent import futures
+
+import six
+
+from lib import authentication_metadata_processing
+from lib import dictionary_processing as dict_processing
+from lib import http_archive
+from lib import incremental_generation
+from lib import offline_metamodel
+from lib import profiling
+from lib import spec_generation
+from lib import utils
+from lib.authentication_metadata_processing import AuthenticationDictNavigator
+from lib.file_output_handler import FileOutputHandler
+from lib.metamodel_cache import CachingComponentService, MetamodelSnapshotCache
+from lib.rest_endpoint.rest_deprecation_handler import RestDeprecationHandler
+from lib.rest_endpoint.rest_metadata_processor import RestMetadataProcessor
+from lib.rest_endpoint.rest_navigation_handler import RestNavigationHandler
+from lib.spec_generation import SpecGenerationContext
+from lib.type_handler_common import TypeResolutionMemo
+
+COMPRESSIONS = ('gzip', 'xz')
+
+
+class GeneratorConfig:
+    """
+    Options of the generation, one attribute per vmsgen command line option.
+    See establish_connection.get_generator_config for their descriptions.
+    """
+
+    def __init__(self,
+                 metadata_url=None,
+                 rest_navigation_url=None,
+                 output_dir=None,
+                 verify=True,
+                 show_unreleased_apis=False,
+                 generate_metamodel=False,
+                 spec='3',
+                 unique_operation_ids=False,
+                 tag_separator='/',
+                 deprecate_rest=False,
+                 fetch_auth_metadata=False,
+                 auto_rest_services=(),
+                 cache_dir=None,
+                 offline_metamodel_dir=None,
+                 fetch_workers=8,
+                 process_workers=0,
+                 compact_output=False,
+                 incremental=False,
+                 profile_report=None,
+                 cprofile_output=None,
+                 record_archive=None,
+                 replay_archive=None,
+                 prune_unused_schemas=False,
+                 shared_components=False,
+                 compressions=(),
+                 shard_by_tag=False,
+                 serve=None,
+                 refresh_interval=300):
+        self.metadata_url = metadata_url
+        self.rest_navigation_url = rest_navigation_url
+        self.output_dir = output_dir
+        self.verify = verify
+        self.show_unreleased_apis = show_unreleased_apis
+        self.generate_metamodel = generate_metamodel
+        self.spec = spec
+        self.unique_operation_ids = unique_operation_ids
+        self.tag_separator = tag_separator
+        self.deprecate_rest = deprecate_rest
+        self.fetch_auth_metadata = fetch_auth_metadata
+        self.auto_rest_services = auto_rest_services
+        self.cache_dir = cache_dir
+        self.offline_metamodel_dir = offline_metamodel_dir
+        self.fetch_workers = fetch_workers
+        self.process_workers = process_workers
+        self.compact_output = compact_output
+        self.incremental = incremental
+        self.profile_report = profile_report
+        self.cprofile_output = cprofile_output
+        self.record_archive = record_archive
+        self.replay_archive = replay_archive
+        self.prune_unused_schemas = prune_unused_schemas
+        self.shared_components = shared_components
+        self.compressions = tuple(compressions)
+        self.shard_by_tag = shard_by_tag
+        # host:port the documents are served at from memory, instead of being written
+        self.serve = serve
+        self.refresh_interval = refresh_interval
+
+    def validate(self):
+        """
+        Checks the combination of options and normalizes the urls and the output directory
+        """
+        if self.record_archive is not None and self.replay_archive is not None:
+            raise ValueError('record-archive and replay-archive cannot be used together')
+        if (self.record_archive is not None or self.replay_archive is not None) and \
+                self.offline_metamodel_dir is not None:
+            raise ValueError('record-archive and replay-archive cannot be used with offline-metamodel-dir')
+        # The urls a replayed run connects to are stored in the archive
+        if self.offline_metamodel_dir is None and self.replay_archive is None and \
+                (self.metadata_url is None or self.rest_navigation_url is None):
+            raise ValueError(
+                'metadataUrl and restNavigationUrl are required parameters')
+        if self.metadata_url is not None:
+            self.metadata_url = self.metadata_url.rstrip('/')
+        if self.rest_navigation_url is not None:
+            self.rest_navigation_url = self.rest_navigation_url.rstrip('/')
+        if self.output_dir is None:
+            self.output_dir = os.getcwd()
+        if self.spec not in ['2', '3']:
+            raise Exception(" Input Valid Specification ")
+        if self.fetch_workers < 1:
+            raise ValueError('fetch-workers must be a positive number')
+        if self.process_workers < 0:
+            raise ValueError('process-workers must not be negative')
+        # The shared schemas of the packages left out of an incremental run are not known
+        if self.shared_components and self.incremental:
+            raise ValueError('shared-components cannot be used with incremental')
+        if not all(compression in COMPRESSIONS for compression in self.compressions):
+            raise ValueError('compress must be gzip, xz or gzip,xz')
+        if self.serve is not None:
+            # The served documents are only kept in memory
+            if self.incremental or self.compressions or self.shard_by_tag:
+                raise ValueError('serve cannot be used with incremental, compress or shard-by-tag')
+            host, _, port = self.serve.rpartition(':')
+            if not host or not port.isdigit():
+                raise ValueError('serve must be given as host:port')
+            if self.refresh_interval <= 0:
+                raise ValueError('refresh-interval must be a positive number')
+
+    def get_serve_address(self):
+        host, _, port = self.serve.rpartition(':')
+        return host, int(port)
+
+    def get_generation_options(self):
+        """
+        The options which change the content of the generated files, for the incremental fingerprints
+        """
+        return {
+            'spec': self.spec,
+            'show_unreleased_apis': bool(self.show_unreleased_apis),
+            'unique_operation_ids': bool(self.unique_operation_ids),
+            'deprecate_rest': bool(self.deprecate_rest),
+            'compact_output': bool(self.compact_output),
+            'prune_unused_schemas': bool(self.prune_unused_schemas),
+            'compressions': list(self.compressions),
+            'shard_by_tag': bool(self.shard_by_tag)}
+
+
+class Metamodel:
+    """
+    The metamodel, rest navigation and authentication metadata of the source,
+    classified into packages. Generations only read it, so it is shared by all
+    generations until the Generator loads a newer one.
+    """
+
+    def __init__(self, fingerprint, rest_navigation_handler):
+        # Digest over the fingerprints of all metamodel components
+        self.fingerprint = fingerprint
+        self.rest_navigation_handler = rest_navigation_handler
+        # Maps enumeration id to enumeration info
+        self.enumeration_dict = {}
+        # Maps structure_id to structure_info
+        self.structure_dict = {}
+        # Maps service_id to service_info
+        self.service_dict = {}
+        # Maps service url to service id
+        self.service_urls_map = {}
+        self.http_error_map = None
+        self.auth_navigator = None
+        # Map the /api and the /rest packages to their service urls
+        self.package_dict_api = {}
+        self.package_dict = {}
+        # Information about the deprecated /rest to /api mappings
+        self.replacement_dict = {}
+        self.deprecation_handler = None
+        # Schemas of the types resolved by the generations of this metamodel
+        self.type_resolution_memo = TypeResolutionMemo()
+
+    def get_generation_context(self, config):
+        return SpecGenerationContext(
+            self.structure_dict,
+            self.enumeration_dict,
+            self.service_dict,
+            self.service_urls_map,
+            self.http_error_map,
+            self.rest_navigation_handler,
+            config.show_unreleased_apis,
+            config.spec,
+            self.auth_navigator,
+            self.deprecation_handler,
+            self.type_resolution_memo)
+
+
+class GenerationResult:
+    """
+    The path and type dictionaries of the generated packages, before the
+    post-processing of FileOutputHandler
+    """
+
+    def __init__(self, metamodel, rest_package_spec_dict, api_package_spec_dict):
+        self.metamodel = metamodel
+        # Map every package to its (path_dict, type_dict) tuple
+        self.rest_package_spec_dict = rest_package_spec_dict
+        self.api_package_spec_dict = api_package_spec_dict
+
+    def get_packages(self):
+        return set(self.rest_package_spec_dict) | set(self.api_package_spec_dict)
+
+
+class Generator:
+    """
+    Generates the specifications of one source, a vCenter or a metamodel
+    directory. The connections and the metadata caches are created on first use
+    and kept, the metamodel is loaded once and replaced only by refresh.
+    """
+
+    def __init__(self, config, phase_recorder=None):
+        config.validate()
+        self.config = config
+        self.phase_recorder = phase_recorder or profiling.PhaseRecorder()
+        self.metadata_source = None
+        self.archive = None
+        self.http_session = None
+        # Session of the vAPI connector the metadata services are called through
+        self.metadata_session = None
+        self.snapshot_cache = None
+        # Metadata Component services of the source, without the caching wrapper
+        self.component_source = None
+        self.auth_component_source = None
+        self.rest_navigation_cache_file = None
+        self.metamodel = None
+        self.connected = False
+        self.closed = False
+        self.lock = threading.Lock()
+        # Held by refresh from the fingerprint check to the swap, so concurrent
+        # refreshes load a changed metamodel only once
+        self.refresh_lock = threading.Lock()
+
+    def connect(self):
+        """
+        Opens the http session, the archive and the metadata services. Called by
+        the first generation, later calls do nothing.
+        """
+        with self.lock:
+            if self.closed:
+                raise ValueError('The generator is closed')
+            if self.connected:
+                return
+            self.__connect()
+            self.connected = True
+
+    def __connect(self):
+        config = self.config
+        # Rest navigation is probed by up to fetch_workers threads, each of them keeps a connection
+        self.http_session = utils.create_http_session(pool_size=config.fetch_workers)
+        self.http_session.hooks['response'].append(self.phase_recorder.response_hook)
+        if config.replay_archive is not None:
+            self.archive = http_archive.HttpArchiveReader(config.replay_archive)
+            if config.metadata_url is None:
+                config.metadata_url = self.archive.get_metadata_url()
+            if config.rest_navigation_url is None:
+                config.rest_navigation_url = self.archive.get_rest_navigation_url()
+        elif config.record_archive is not None:
+            self.archive = http_archive.HttpArchiveWriter(config.record_archive, config.metadata_url,
+                                                          config.rest_navigation_url)
+        if self.archive is not None:
+            # Both the rest navigation requests and the metadata service calls go through the archive
+            self.archive.mount(self.http_session)
+        if config.offline_metamodel_dir is not None:
+            print('Loading metamodel from ' + config.offline_metamodel_dir)
+            self.metadata_source = config.offline_metamodel_dir
+            self.component_source = offline_metamodel.OfflineComponentService(config.offline_metamodel_dir)
+            if config.fetch_auth_metadata:
+                self.auth_component_source = offline_metamodel.OfflineComponentService(
+                    os.path.join(config.offline_metamodel_dir, offline_metamodel.AUTHENTICATION_DIR))
+            return
+
+        # The vAPI runtime is only needed to connect to vCenter
+        from lib import establish_connection as connection
+        from vmware.vapi.core import ApplicationContext
+        from vmware.vapi.lib.constants import SHOW_UNRELEASED_APIS
+        from vmware.vapi.lib.connect import get_requests_connector
+
+        self.metadata_source = config.metadata_url
+        print('Trying to connect ' + config.metadata_url)
+        # The metamodel and authentication metadata fetches use up to fetch_workers connections each
+        self.metadata_session = utils.create_http_session(
+            pool_size=config.fetch_workers * (2 if config.fetch_auth_metadata else 1))
+        self.metadata_session.verify = False
+        self.metadata_session.hooks['response'].append(self.phase_recorder.response_hook)
+        if self.archive is not None:
+            self.archive.mount(self.metadata_session)
+        connector = get_requests_connector(self.metadata_session, url=config.metadata_url)
+
+        if config.show_unreleased_apis:
+            connector.set_application_context(
+                ApplicationContext({SHOW_UNRELEASED_APIS: "True"}))
+        print('Connected to ' + config.metadata_url)
+        if config.cache_dir is not None:
+            self.snapshot_cache = MetamodelSnapshotCache(
+                config.cache_dir,
+                config.metadata_url + '|show_unreleased=' + str(bool(config.show_unreleased_apis)))
+        self.component_source = connection.get_component_service(connector)
+        if config.fetch_auth_metadata:
+            self.auth_component_source = connection.get_authentication_component_service(connector)
+
+    def get_source_fingerprint(self):
+        """
+        Asks the source for the fingerprints of its components, without loading them.
+        Differs from the fingerprint of the loaded metamodel once the source changed.
+        """
+        self.connect()
+        return CachingComponentService(self.component_source).get_components_fingerprint()
+
+    def get_metamodel(self):
+        """
+        Returns the loaded metamodel, loading it on first use
+        """
+        self.connect()
+        with self.lock:
+            if self.metamodel is None:
+                self.metamodel = self.load_metamodel()
+            return self.metamodel
+
+    def refresh(self, force=False):
+        """
+        Loads the metamodel again if the source changed since it was loaded, or if
+        force. Generations running meanwhile keep the metamodel they started with,
+        and new ones get it until the newer one is loaded.
+        :return: whether a new metamodel was loaded
+        """
+        with self.refresh_lock:
+            metamodel = self.get_metamodel()
+            if not force and self.get_source_fingerprint() == metamodel.fingerprint:
+                return False
+            metamodel = self.load_metamodel()
+            with self.lock:
+                self.metamodel = metamodel
+            return True
+
+    def load_metamodel(self):
+        """
+        Fetches the metamodel, the authentication metadata and the rest navigation
+        of the source into a new Metamodel
+        """
+        config = self.config
+        phase_recorder = self.phase_recorder
+        # The caching services of an earlier load hold the components it fetched
+        component_svc = CachingComponentService(self.component_source, self.snapshot_cache)
+        auth_component_svc = None
+        if self.auth_component_source is not None:
+            # Cached next to the metamodel components, under its own namespace
+            auth_component_svc = CachingComponentService(
+                self.auth_component_source, self.snapshot_cache, 'authentication')
+        rest_navigation_url = config.rest_navigation_url
+        if config.offline_metamodel_dir is not None:
+            # Rest navigation links are absolute, so the url they were captured with is kept
+            rest_navigation_handler = offline_metamodel.load_rest_navigation_handler(
+                config.offline_metamodel_dir, rest_navigation_url)
+            rest_navigation_url = rest_navigation_handler.get_rest_navigation_url()
+        else:
+            rest_navigation_handler = RestNavigationHandler(rest_navigation_url, session=self.http_session)
+        metamodel = Metamodel(component_svc.get_components_fingerprint(), rest_navigation_handler)
+
+        def fetch_authentication_dict():
+            with phase_recorder.phase('authentication metadata fetch'):
+                return authentication_metadata_processing.get_authentication_dict(
+                    auth_component_svc, config.generate_metamodel, config.fetch_workers,
+                    phase_recorder.get_thread_initializer())
+
+        auth_executor = None
+        if auth_component_svc is not None:
+            # The authentication metadata is fetched in the background, while the metamodel is fetched
+            auth_executor = futures.ThreadPoolExecutor(max_workers=1)
+            auth_dict_future = auth_executor.submit(fetch_authentication_dict)
+
+        with phase_recorder.phase('metamodel fetch'):
+            dict_processing.populate_dicts(
+                component_svc,
+                metamodel.enumeration_dict,
+                metamodel.structure_dict,
+                metamodel.service_dict,
+                metamodel.service_urls_map,
+                rest_navigation_url,
+                config.generate_metamodel,
+                config.fetch_workers,
+                phase_recorder.get_thread_initializer())
+            metamodel.http_error_map = utils.HttpErrorMap(component_svc)
+
+        if auth_executor is not None:
+            # Initialize the authentication data navigator
+            metamodel.auth_navigator = AuthenticationDictNavigator(auth_dict_future.result())
+            auth_executor.shutdown()
+        if self.snapshot_cache is not None:
+            print('Loaded ' + str(component_svc.cache_hits) + ' metamodel components from ' + config.cache_dir +
+                  ', fetched ' + str(component_svc.cache_misses))
+            if auth_component_svc is not None:
+                print('Loaded ' + str(auth_component_svc.cache_hits) + ' authentication metadata components from ' +
+                      config.cache_dir + ', fetched ' + str(auth_component_svc.cache_misses))
+
+        with phase_recorder.phase('rest navigation'):
+            if self.snapshot_cache is not None:
+                self.rest_navigation_cache_file = self.snapshot_cache.get_rest_navigation_file_name(
+                    rest_navigation_url, metamodel.fingerprint)
+                print('Loaded ' + str(rest_navigation_handler.load_saved_responses(self.rest_navigation_cache_file)) +
+                      ' rest navigation responses from ' + config.cache_dir)
+            # Every service without @RequestMapping annotations is looked up in rest navigation,
+            # both to detect /rest counterparts and to generate the /rest paths
+            rest = RestMetadataProcessor()
+            rest_navigation_handler.prefetch(
+                [service_url for service_url, service in six.iteritems(metamodel.service_urls_map)
+                 if not rest.contains_rm_annotation(metamodel.service_dict[service])],
+                config.fetch_workers,
+                phase_recorder.get_thread_initializer())
+
+        with phase_recorder.phase('service url classification'):
+            # package_dict_api holds list of all service urls which come under /api
+            # package_dict_deprecated holds a list of all service urls which come under /rest, but are
+            # deprecated with /api
+            # replacement_dict contains information about the deprecated /rest to /api mappings
+            metamodel.package_dict_api, metamodel.package_dict, package_dict_deprecated, \
+                metamodel.replacement_dict = dict_processing.add_service_urls_using_metamodel(
+                    metamodel.service_urls_map, metamodel.service_dict, rest_navigation_handler,
+                    config.auto_rest_services, config.deprecate_rest)
+
+            utils.combine_dicts_with_list_values(metamodel.package_dict, package_dict_deprecated)
+        if config.deprecate_rest:
+            metamodel.deprecation_handler = RestDeprecationHandler(metamodel.replacement_dict)
+
+        return metamodel
+
+    def generate(self, packages=None, metamodel=None):
+        """
+        Generates the path and type dictionaries of the packages, by default of
+        all packages of the loaded metamodel
+        """
+        if metamodel is None:
+            metamodel = self.get_metamodel()
+        package_dict = metamodel.package_dict
+        package_dict_api = metamodel.package_dict_api
+        if packages is not None:
+            package_dict = {package: service_urls for package, service_urls in six.iteritems(package_dict)
+                            if package in packages}
+            package_dict_api = {package: service_urls for package, service_urls in six.iteritems(package_dict_api)
+                                if package in packages}
+        with self.phase_recorder.phase('package generation', len(package_dict) + len(package_dict_api)):
+            rest_package_spec_dict, api_package_spec_dict = spec_generation.generate_package_specs(
+                metamodel.get_generation_context(self.config), package_dict, package_dict_api,
+                self.config.process_workers, self.phase_recorder)
+        return GenerationResult(metamodel, rest_package_spec_dict, api_package_spec_dict)
+
+    def get_file_output_handler(self, result, unchanged_packages=(), reserved_operation_ids=()):
+        """
+        Post-processes the generated dictionaries for output, they are changed in place
+        """
+        config = self.config
+        with self.phase_recorder.phase('post-processing'):
+            return FileOutputHandler(result.rest_package_spec_dict,
+                                     result.api_package_spec_dict,
+                                     config.output_dir,
+                                     config.unique_operation_ids,
+                                     config.spec,
+                                     compact=config.compact_output,
+                                     unchanged_packages=unchanged_packages,
+                                     reserved_operation_ids=reserved_operation_ids,
+                                     prune_unused_schemas=config.prune_unused_schemas,
+                                     shared_components=config.shared_components,
+                                     compressions=config.compressions,
+                                     shard_by_tag=config.shard_by_tag)
+
+    def write(self, result, unchanged_packages=(), reserved_operation_ids=()):
+        """
+        Writes the generated packages into the output directory
+        :return: the FileOutputHandler which wrote them
+        """
+        file_handler = self.get_file_output_handler(result, unchanged_packages, reserved_operation_ids)
+        for renamed_operation_id in file_handler.get_renamed_operation_ids():
+            print('Renamed colliding operation id {operationId} of {method} {path} in package {package} '
+                  'to {renamedTo}'.format(**renamed_operation_id))
+        phase_recorder = self.phase_recorder
+        with phase_recorder.phase('file write', len(result.get_packages())):
+            file_handler.output_files()
+            phase_recorder.add_bytes(sum(os.path.getsize(file_name)
+                                         for file_name in file_handler.output_file_dict.values()))
+            if file_handler.shared_components_file is not None:
+                phase_recorder.add_bytes(os.path.getsize(file_handler.shared_components_file))
+            phase_recorder.add_bytes(sum(os.path.getsize(file_name)
+                                         for file_names in file_handler.shard_file_dict.values()
+                                         for file_name in file_names))
+        for package, (pruned_count, pruned_bytes) in sorted(file_handler.pruned_schema_dict.items()):
+            print('Pruned ' + str(pruned_count) + ' unused schemas (' + str(pruned_bytes) + ' bytes) from ' + package)
+        if file_handler.shared_components_extractor is not None:
+            extractor = file_handler.shared_components_extractor
+            print('Moved ' + str(extractor.moved_count) + ' schemas (' + str(extractor.moved_bytes) + ' bytes) into ' +
+                  str(len(extractor.shared_type_dict)) + ' shared schemas (' +
+                  str(os.path.getsize(file_handler.shared_components_file)) + ' bytes) in ' +
+                  file_handler.shared_components_file)
+        return file_handler
+
+    def run(self):
+        """
+        Generates and writes all packages, what vmsgen does for its command line.
+        The generator is closed afterwards and the profiles are written, even if
+        the generation fails.
+        """
+        config = self.config
+        start = timeit.default_timer()
+        profiler = None
+        if config.cprofile_output is not None:
+            profiler = profiling.start_profiler()
+        try:
+            file_handler = self.__generate_and_write()
+        finally:
+            self.close()
+            if profiler is not None:
+                profiling.stop_profiler(profiler, config.cprofile_output)
+            if config.profile_report is not None:
+                self.phase_recorder.write_report(config.profile_report)
+                print('Wrote phase timings to ' + config.profile_report)
+
+        stop = timeit.default_timer()
+        print('Generated swagger files at ' + config.output_dir + ' for ' +
+              self.metadata_source + ' in ' + str(stop - start) + ' seconds')
+        return file_handler
+
+    def __generate_and_write(self):
+        config = self.config
+        metamodel = self.get_metamodel()
+
+        unchanged_packages = set()
+        packages = None
+        if config.incremental:
+            # Packages whose inputs did not change since the last run into output_dir are not generated again
+            generation_options = config.get_generation_options()
+            generation_options['error_api_map'] = metamodel.http_error_map.error_api_map
+            generation_options['error_rest_map'] = metamodel.http_error_map.error_rest_map
+            with self.phase_recorder.phase('incremental fingerprinting'):
+                package_fingerprint_dict = incremental_generation.get_package_fingerprints(
+                    metamodel.package_dict,
+                    metamodel.package_dict_api,
+                    metamodel.service_urls_map,
+                    incremental_generation.ServiceFingerprints(
+                        metamodel.structure_dict, metamodel.enumeration_dict, metamodel.service_dict),
+                    metamodel.rest_navigation_handler,
+                    metamodel.replacement_dict,
+                    metamodel.auth_navigator,
+                    generation_options)
+            generation_manifest = incremental_generation.GenerationManifest(config.output_dir)
+            unchanged_packages = generation_manifest.get_unchanged_packages(package_fingerprint_dict)
+            packages = (set(metamodel.package_dict) | set(metamodel.package_dict_api)) - unchanged_packages
+            print('Skipping ' + str(len(unchanged_packages)) + ' unchanged packages')
+
+        result = self.generate(packages, metamodel)
+
+        reserved_operation_ids = ()
+        if config.incremental and config.unique_operation_ids:
+            # The documents which are not written again keep their operation ids
+            reserved_operation_ids = generation_manifest.get_operation_ids(unchanged_packages)
+        file_handler = self.write(result, unchanged_packages, reserved_operation_ids)
+        if config.incremental:
+            generation_manifest.save(package_fingerprint_dict, file_handler.output_file_dict,
+                                     file_handler.get_package_operation_ids())
+
+        if self.rest_navigation_cache_file is not None:
+            metamodel.rest_navigation_handler.save(self.rest_navigation_cache_file)
+
+        if config.generate_metamodel:
+            # Saved next to the metamodel components, so the run can be repeated offline
+            metamodel.rest_navigation_handler.save(
+                os.path.join('metamodel', offline_metamodel.REST_NAVIGATION_CAPTURE_FILE))
+        return file_handler
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes the archive and the http sessions, the generator cannot be used afterwards
+        """
+        with self.lock:
+            self.connected = False
+            self.closed = True
+            if self.archive is not None:
+                if self.config.record_archive is not None:
+                    print('Recorded ' + str(self.archive.close()) + ' responses to ' + self.config.record_archive)
+                else:
+                    self.archive.close()
+                self.archive = None
+            if self.http_session is not None:
+                self.http_session.close()
+                self.http_session = None
+            if self.metadata_session is not None:
+                self.metadata_session.close()
+                self.metadata_session = None
@@ -0,0 +1,187 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import io
+import json
+import os
+import threading
+import zipfile
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Bump whenever the layout of the archive changes
+ARCHIVE_FORMAT_VERSION = '2'
+ARCHIVE_INDEX = 'index.json'
+# Response headers kept in the archive, the others depend on the server and the time of the request
+RECORDED_HEADERS = ('Content-Type',)
+
+
+def get_request_key(method, url, body):
+    """
+    Identifies a request independently of the run which issued it. The id and
+    the operation id in the application context of vAPI JSON-RPC requests differ
+    between runs, so they are left out. The rest of the context, e.g. whether
+    unreleased APIs are shown, selects the response and stays in the key.
+    """
+    key = method + ' ' + url
+    if not body:
+        return key
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    try:
+        json_body = json.loads(body.decode('utf-8'))
+    except ValueError:
+        json_body = None
+    if isinstance(json_body, dict) and 'jsonrpc' in json_body:
+        json_body.pop('id', None)
+        params = json_body.get('params')
+        ctx = params.get('ctx') if isinstance(params, dict) else None
+        if isinstance(ctx, dict) and isinstance(ctx.get('appCtx'), dict):
+            ctx['appCtx'].pop('opId', None)
+        body = json.dumps(json_body, sort_keys=True).encode('utf-8')
+    return key + ' ' + hashlib.sha256(body).hexdigest()
+
+
+def get_jsonrpc_id(body):
+    if not body:
+        return None
+    try:
+        json_body = json.loads(body if isinstance(body, str) else body.decode('utf-8'))
+    except ValueError:
+        return None
+    if isinstance(json_body, dict) and 'jsonrpc' in json_body:
+        return json_body.get('id')
+    return None
+
+
+class HttpArchiveWriter:
+    """
+    Records the responses to every request sent through the mounted sessions into
+    a single zip archive: one entry per response body and an index mapping the
+    requests to them. Only the first response to a repeated request is kept.
+    The archive is written to a temporary file and moved in place by close().
+    """
+
+    def __init__(self, file_name, metadata_url, rest_navigation_url):
+        self.file_name = file_name
+        self.temp_file_name = file_name + '.' + str(os.getpid()) + '.tmp'
+        self.zip_file = zipfile.ZipFile(self.temp_file_name, 'w', zipfile.ZIP_DEFLATED)
+        self.index = {
+            'version': ARCHIVE_FORMAT_VERSION,
+            'metadata_url': metadata_url,
+            'rest_navigation_url': rest_navigation_url,
+            'entries': {}}
+        self.lock = threading.Lock()
+
+    def mount(self, session):
+        for prefix, adapter in list(session.adapters.items()):
+            session.mount(prefix, RecordingAdapter(self, adapter))
+
+    def record(self, request, response):
+        key = get_request_key(request.method, request.url, request.body)
+        with self.lock:
+            entries = self.index['entries']
+            if key in entries:
+                return
+            entry_name = 'responses/%06d' % len(entries)
+            self.zip_file.writestr(entry_name, response.content)
+            entries[key] = {
+                'status': response.status_code,
+                'reason': response.reason,
+                'headers': {header: response.headers[header]
+                            for header in RECORDED_HEADERS if header in response.headers},
+                'body': entry_name}
+
+    def close(self):
+        with self.lock:
+            self.zip_file.writestr(ARCHIVE_INDEX, json.dumps(self.index, indent=4, sort_keys=True))
+            self.zip_file.close()
+            os.replace(self.temp_file_name, self.file_name)
+        return len(self.index['entries'])
+
+
+class HttpArchiveReader:
+    """
+    Serves the responses recorded by HttpArchiveWriter to the mounted sessions,
+    without any network access. A request which was not recorded fails with a
+    ConnectionError, like a request to an unreachable server.
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.zip_file = zipfile.ZipFile(file_name)
+        self.index = json.loads(self.zip_file.read(ARCHIVE_INDEX).decode('utf-8'))
+        if self.index.get('version') != ARCHIVE_FORMAT_VERSION:
+            raise ValueError('Unsupported http archive version in ' + file_name)
+        self.lock = threading.Lock()
+
+    def get_metadata_url(self):
+        return self.index['metadata_url']
+
+    def get_rest_navigation_url(self):
+        return self.index['rest_navigation_url']
+
+    def mount(self, session):
+        adapter = ReplayAdapter(self)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+    def replay(self, request):
+        entry = self.index['entries'].get(get_request_key(request.method, request.url, request.body))
+        if entry is None:
+            raise requests.ConnectionError('No response recorded for %s %s in %s' % (
+                request.method, request.url, self.file_name), request=request)
+        with self.lock:
+            body = self.zip_file.read(entry['body'])
+        # The vAPI client matches responses to requests by their JSON-RPC id
+        jsonrpc_id = get_jsonrpc_id(request.body)
+        if jsonrpc_id is not None:
+            json_body = json.loads(body.decode('utf-8'))
+            json_body['id'] = jsonrpc_id
+            body = json.dumps(json_body).encode('utf-8')
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry['reason']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.headers['Content-Length'] = str(len(body))
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+    def close(self):
+        self.zip_file.close()
+
+
+class RecordingAdapter(BaseAdapter):
+
+    def __init__(self, http_archive, adapter):
+        super(RecordingAdapter, self).__init__()
+        self.http_archive = http_archive
+        self.adapter = adapter
+
+    def send(self, request, **kwargs):
+        response = self.adapter.send(request, **kwargs)
+        self.http_archive.record(request, response)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+
+    def __init__(self, http_archive):
+        super(ReplayAdapter, self).__init__()
+        self.http_archive = http_archive
+
+    def send(self, request, **kwargs):
+        return self.http_archive.replay(request)
+
+    def close(self):
+        pass
@@ -0,0 +1,218 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import json
+import os
+
+import six
+
+from lib import utils
+from lib.dictionary_processing import objectTodict
+
+# Written next to api.json, maps every generated package to the fingerprint of its inputs
+MANIFEST_FILE = 'generation_manifest.json'
+# Bump whenever the generated output changes for the same metamodel,
+# so that every package is generated again after an upgrade
+MANIFEST_FORMAT_VERSION = '1'
+# Metamodel fields holding the id of a referenced structure or enumeration
+TYPE_REFERENCE_FIELDS = ('resource_id', 'structure_id')
+
+
+def get_digest(json_data):
+    return hashlib.sha256(json.dumps(json_data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def to_fingerprint_dict(obj):
+    """
+    Json view of a metamodel object without the private attributes of the vAPI
+    structures, which do not affect the generated specifications.
+    """
+    return remove_private_fields(objectTodict(obj))
+
+
+def remove_private_fields(value):
+    if isinstance(value, dict):
+        return {key: remove_private_fields(element) for key, element in six.iteritems(value)
+                if not (isinstance(key, str) and key.startswith('_'))}
+    if isinstance(value, list):
+        return [remove_private_fields(element) for element in value]
+    return value
+
+
+class ServiceFingerprints:
+    """
+    Computes a fingerprint for every service, covering its operations and every
+    structure and enumeration it references, directly or through other types.
+    """
+
+    def __init__(self, structure_dict, enum_dict, service_dict):
+        self.structure_dict = structure_dict
+        self.enum_dict = enum_dict
+        self.service_dict = service_dict
+        self.type_dict = {}
+        self.service_fingerprint_dict = {}
+
+    def get_service_fingerprint(self, service):
+        if service not in self.service_fingerprint_dict:
+            service_info = self.service_dict.get(service)
+            if service_info is None:
+                self.service_fingerprint_dict[service] = None
+            else:
+                service_json = to_fingerprint_dict(service_info)
+                referenced_types = self.__get_referenced_types(service_json)
+                self.service_fingerprint_dict[service] = get_digest(
+                    [service_json] + [[type_id, self.__get_type(type_id)[0]] for type_id in referenced_types])
+        return self.service_fingerprint_dict[service]
+
+    def __get_type(self, type_id):
+        """
+        Returns the digest of a structure or enumeration and the ids of the types it references
+        """
+        if type_id not in self.type_dict:
+            type_info = self.structure_dict.get(type_id, self.enum_dict.get(type_id))
+            type_json = to_fingerprint_dict(type_info)
+            self.type_dict[type_id] = (get_digest(type_json), self.__find_type_references(type_json))
+        return self.type_dict[type_id]
+
+    def __get_referenced_types(self, service_json):
+        # Follows the type references until no new type is found, types may reference each other
+        referenced_types = set()
+        pending_types = self.__find_type_references(service_json)
+        while pending_types:
+            type_id = pending_types.pop()
+            if type_id in referenced_types:
+                continue
+            referenced_types.add(type_id)
+            pending_types.extend(self.__get_type(type_id)[1])
+        return sorted(referenced_types)
+
+    def __find_type_references(self, json_data):
+        type_references = []
+        if isinstance(json_data, dict):
+            for key, value in six.iteritems(json_data):
+                if key in TYPE_REFERENCE_FIELDS and isinstance(value, str):
+                    type_references.append(value)
+                else:
+                    type_references.extend(self.__find_type_references(value))
+        elif isinstance(json_data, list):
+            for value in json_data:
+                type_references.extend(self.__find_type_references(value))
+        return type_references
+
+
+def get_package_fingerprints(package_dict,
+                             package_dict_api,
+                             service_urls_map,
+                             service_fingerprints,
+                             rest_navigation_handler,
+                             replacement_dict,
+                             auth_navigator,
+                             options):
+    """
+    Computes the fingerprint of every output package from everything its
+    generation reads: the services behind its /rest and /api paths, the rest
+    navigation responses, /rest replacements, authentication schemes and the
+    generator options.
+    """
+    package_fingerprint_dict = {}
+    for package in set(package_dict.keys()) | set(package_dict_api.keys()):
+        package_inputs = [MANIFEST_FORMAT_VERSION, options]
+        service_urls = sorted(package_dict.get(package, []) + package_dict_api.get(package, []))
+        for service_url in service_urls:
+            service, service_end_point = service_urls_map[service_url]
+            services = [service]
+            service_operations = None
+            if service_end_point != '/api':
+                # /rest paths are generated from every service returned by rest navigation
+                service_operations = rest_navigation_handler.get_service_operations(service_url)
+                services += sorted(set(service_operation['service']
+                                       for service_operation in service_operations or []))
+            package_inputs.append([service_url,
+                                   service_end_point,
+                                   service_operations,
+                                   [get_service_inputs(service_name,
+                                                       package,
+                                                       service_fingerprints,
+                                                       replacement_dict,
+                                                       auth_navigator) for service_name in services]])
+        package_fingerprint_dict[package] = get_digest(package_inputs)
+    return package_fingerprint_dict
+
+
+def get_service_inputs(service, package, service_fingerprints, replacement_dict, auth_navigator):
+    service_inputs = [service, service_fingerprints.get_service_fingerprint(service), replacement_dict.get(service)]
+    service_info = service_fingerprints.service_dict.get(service)
+    if auth_navigator is not None and service_info is not None:
+        for operation_id in sorted(service_info.operations.keys()):
+            scheme_set = auth_navigator.find_schemes_set(operation_id, service, package)
+            service_inputs.append(sorted(scheme_set) if scheme_set is not None else None)
+    return service_inputs
+
+
+class GenerationManifest:
+    """
+    Fingerprints of the packages generated into an output directory by the
+    previous run, used to generate only the packages whose inputs changed.
+    """
+
+    def __init__(self, output_dir):
+        self.file_name = os.path.join(output_dir, MANIFEST_FILE)
+        self.package_dict = {}
+        if os.path.exists(self.file_name):
+            try:
+                with open(self.file_name) as manifest_file:
+                    manifest = json.load(manifest_file)
+                if manifest.get('version') == MANIFEST_FORMAT_VERSION:
+                    self.package_dict = manifest['packages']
+            except Exception as ex:
+                utils.eprint('Ignoring unreadable generation manifest %s' % self.file_name)
+                utils.eprint(ex)
+
+    def get_unchanged_packages(self, package_fingerprint_dict):
+        unchanged_packages = set()
+        output_dir = os.path.dirname(self.file_name)
+        for package, fingerprint in six.iteritems(package_fingerprint_dict):
+            package_entry = self.package_dict.get(package)
+            if package_entry is None or package_entry['fingerprint'] != fingerprint:
+                continue
+            # A package file deleted since the last run is generated again
+            if os.path.exists(os.path.join(output_dir, package_entry['file'])):
+                unchanged_packages.add(package)
+        return unchanged_packages
+
+    def get_operation_ids(self, packages):
+        """
+        Returns the unique operation ids given to the operations of packages by
+        the previous run, which generated ids with --unique-operation-ids.
+        """
+        operation_ids = set()
+        for package in packages:
+            operation_ids.update(self.package_dict.get(package, {}).get('operation_ids', ()))
+        return operation_ids
+
+    def save(self, package_fingerprint_dict, output_file_dict, package_operation_ids=None):
+        """
+        Records the fingerprints of all current packages. output_file_dict maps the
+        packages generated by this run to their files, package_operation_ids to
+        their unique operation ids, if any. The files and operation ids of
+        unchanged packages are taken over from the previous manifest.
+        """
+        package_operation_ids = package_operation_ids or {}
+        package_dict = {}
+        for package, fingerprint in six.iteritems(package_fingerprint_dict):
+            if package in output_file_dict:
+                file_name = os.path.basename(output_file_dict[package])
+                operation_ids = package_operation_ids.get(package)
+            elif package in self.package_dict:
+                file_name = self.package_dict[package]['file']
+                operation_ids = self.package_dict[package].get('operation_ids')
+            else:
+                continue
+            package_dict[package] = {'fingerprint': fingerprint, 'file': file_name}
+            if operation_ids:
+                package_dict[package]['operation_ids'] = sorted(operation_ids)
+        self.package_dict = package_dict
+        utils.write_json_data_to_file(self.file_name, {
+            'version': MANIFEST_FORMAT_VERSION,
+            'packages': utils.SortedJsonSection(package_dict)})
@@ -45,6 +45,15 @@ class MetadataProcessor():
             return "/rest" + service_url
         return "/rest" + service_url[len(base_url):]
 
+    def decorate_path_with_security(self, path, operation_id, service_name, package_name, auth_navigator):
+        """
+        Adds the security requirements found in the authentication metadata to a
+        swagger or openapi operation
+        """
+        security_requirements = auth_navigator.get_security_requirements(operation_id, service_name, package_name)
+        if security_requirements:
+            path['security'] = security_requirements
+
     def convert_path_list_to_path_map(self, path_list):
         """
         The same path can have multiple methods.
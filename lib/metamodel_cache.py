@@ -0,0 +1,158 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from lib import utils
+from lib.dictionary_processing import objectTodict
+from lib.offline_metamodel import dict_to_metamodel_object
+
+# Bump whenever the layout of the cached entries changes, so stale
+# snapshots written by older versions are ignored instead of misread.
+SNAPSHOT_FORMAT_VERSION = '1'
+SNAPSHOT_FILE_SUFFIX = '.json.gz'
+
+
+class MetamodelSnapshotCache:
+    """
+    Content addressed on-disk store for metadata components.
+    Every entry is keyed by the scope of the run (metadata url and flags which
+    change what the server returns), the component id and the fingerprint the
+    server reports for that component. A component which changed on the server
+    gets a new fingerprint and therefore never hits a stale entry.
+    Snapshots are stored as the json dumps of --metamodel-components and loaded
+    the way offline runs load them, so a shared cache directory holds plain data.
+    """
+
+    def __init__(self, cache_dir, scope):
+        self.cache_dir = cache_dir
+        self.scope = scope
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    def get_key(self, namespace, component_id, fingerprint):
+        digest = hashlib.sha256()
+        for part in (SNAPSHOT_FORMAT_VERSION, self.scope, namespace, component_id, fingerprint):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get_file_name(self, key):
+        return os.path.join(self.cache_dir, key + SNAPSHOT_FILE_SUFFIX)
+
+    def get_rest_navigation_file_name(self, rest_navigation_url, components_fingerprint):
+        # Rest navigation is served by the same build as the metamodel, so its
+        # responses are only reused while no component fingerprint changed
+        key = self.get_key('rest_navigation', rest_navigation_url, components_fingerprint)
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def load(self, key):
+        file_name = self.get_file_name(key)
+        if not os.path.exists(file_name):
+            return None
+        try:
+            with gzip.open(file_name, 'rt', encoding='utf-8') as snapshot_file:
+                return dict_to_metamodel_object(json.load(snapshot_file))
+        except Exception as ex:
+            utils.eprint('Ignoring unreadable metamodel snapshot %s' % file_name)
+            utils.eprint(ex)
+            return None
+
+    def store(self, key, component_data):
+        # Write to a temporary file first, so concurrent runs sharing the cache
+        # directory never observe a partially written snapshot.
+        fd, temp_file_name = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw_file:
+                with gzip.GzipFile(fileobj=raw_file, mode='wb', mtime=0) as snapshot_file:
+                    snapshot_file.write(json.dumps(objectTodict(component_data),
+                                                   separators=utils.COMPACT_JSON_SEPARATORS).encode('utf-8'))
+            os.replace(temp_file_name, self.get_file_name(key))
+        except Exception as ex:
+            utils.eprint('Could not store metamodel snapshot for key %s' % key)
+            utils.eprint(ex)
+            if os.path.exists(temp_file_name):
+                os.remove(temp_file_name)
+
+
+class CachingComponentService:
+    """
+    Drop-in replacement for a metadata Component service (metamodel or
+    authentication). Fetched components are kept in memory for the rest of the
+    run and, if a snapshot cache is given, persisted on disk and reloaded on
+    the next run as long as the server reports the same fingerprint.
+    """
+
+    def __init__(self, component_svc, snapshot_cache=None, namespace='metamodel'):
+        self.component_svc = component_svc
+        self.snapshot_cache = snapshot_cache
+        self.namespace = namespace
+        self.components = None
+        self.component_data_dict = {}
+        self.fingerprint_dict = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.lock = threading.Lock()
+
+    def list(self):
+        if self.components is None:
+            self.components = self.component_svc.list()
+        return self.components
+
+    def fingerprint(self, component_id):
+        with self.lock:
+            fingerprint = self.fingerprint_dict.get(component_id)
+        if fingerprint is None:
+            fingerprint = self.component_svc.fingerprint(component_id)
+            with self.lock:
+                self.fingerprint_dict[component_id] = fingerprint
+        return fingerprint
+
+    def get_components_fingerprint(self):
+        """
+        Digest over the fingerprints of all components, changes whenever any
+        component changes on the server
+        """
+        digest = hashlib.sha256()
+        for component_id in sorted(self.list()):
+            digest.update(component_id.encode('utf-8'))
+            digest.update(b'\0')
+            digest.update(self.fingerprint(component_id).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, component_id):
+        with self.lock:
+            component_data = self.component_data_dict.get(component_id)
+        if component_data is not None:
+            return component_data
+
+        if self.snapshot_cache is None:
+            component_data = self.component_svc.get(component_id)
+        else:
+            component_data = self.__get_using_snapshot_cache(component_id)
+
+        with self.lock:
+            self.component_data_dict[component_id] = component_data
+        return component_data
+
+    def __get_using_snapshot_cache(self, component_id):
+        key = self.snapshot_cache.get_key(self.namespace,
+                                          component_id,
+                                          self.fingerprint(component_id))
+        component_data = self.snapshot_cache.load(key)
+        if component_data is not None:
+            with self.lock:
+                self.cache_hits += 1
+            return component_data
+
+        component_data = self.component_svc.get(component_id)
+        self.snapshot_cache.store(key, component_data)
+        with self.lock:
+            self.cache_misses += 1
+        return component_data
@@ -0,0 +1,152 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import threading
+
+from lib import utils
+from lib.rest_endpoint.rest_navigation_handler import RestNavigationHandler
+
+# Name of the rest navigation capture stored next to the dumped metamodel components
+REST_NAVIGATION_CAPTURE_FILE = 'rest_navigation.json'
+# Sub-directory holding the dumped authentication metadata components
+AUTHENTICATION_DIR = 'authentication'
+# Suffix of the file next to every dumped component holding its fingerprint
+FINGERPRINT_FILE_SUFFIX = '.fingerprint'
+
+# Metamodel and authentication metadata fields which are maps (keyed by an id
+# or a metadata name) rather than structures. Every other json object in a
+# dump is the attribute dictionary of a vAPI structure.
+MAP_FIELDS = frozenset([
+    'packages',
+    'services',
+    'structures',
+    'enumerations',
+    'operations',
+    'constants',
+    'metadata',
+    'elements'])
+
+
+class MetamodelObject(object):
+    """
+    Attribute access view over a structure dumped by
+    dictionary_processing.objectTodict, e.g. ServiceInfo or FieldInfo.
+    """
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __repr__(self):
+        return 'MetamodelObject(%s)' % ', '.join(sorted(self.__dict__.keys()))
+
+
+def dict_to_metamodel_object(value, field_name=None):
+    """
+    Rebuilds the object graph of a metamodel dump. Json objects found under one
+    of the MAP_FIELDS stay dictionaries, any other json object becomes a
+    MetamodelObject. Private attributes of the dumped vAPI structures are dropped.
+    """
+    if isinstance(value, list):
+        return [dict_to_metamodel_object(element) for element in value]
+    if not isinstance(value, dict):
+        return value
+    if field_name in MAP_FIELDS:
+        return {key: dict_to_metamodel_object(element) for key, element in value.items()}
+    fields = {}
+    for key, element in value.items():
+        if key.startswith('_'):
+            continue
+        fields[key] = dict_to_metamodel_object(element, key)
+    return MetamodelObject(**fields)
+
+
+def get_file_key(file_name):
+    file_stat = os.stat(file_name)
+    return [file_stat.st_mtime_ns, file_stat.st_size]
+
+
+def write_component_dump(metamodel_dir, component_id, component_dump):
+    """
+    Writes the dump of a component and, if it has one, its fingerprint into a
+    small file next to it, together with the modification time and size of the
+    dump it belongs to. OfflineComponentService.fingerprint reads that file
+    instead of the whole dump while the dump is unchanged.
+    """
+    file_name = os.path.join(metamodel_dir, component_id + '.json')
+    utils.write_json_data_to_file(file_name, component_dump)
+    if component_dump.get('fingerprint') is None:
+        return
+    with open(os.path.join(metamodel_dir, component_id + FINGERPRINT_FILE_SUFFIX), 'w') as fingerprint_file:
+        json.dump({'fingerprint': component_dump['fingerprint'], 'file_key': get_file_key(file_name)},
+                  fingerprint_file)
+
+
+class OfflineComponentService:
+    """
+    Serves the components dumped with --metamodel-components through the same
+    list/get/fingerprint interface as the metadata Component services.
+    """
+
+    def __init__(self, metamodel_dir):
+        if not os.path.isdir(metamodel_dir):
+            raise ValueError('Metamodel directory ' + metamodel_dir + ' does not exist')
+        self.metamodel_dir = metamodel_dir
+        # Maps component id to the modification time and size of its file and its fingerprint,
+        # so unchanged files are not read again
+        self.fingerprint_dict = {}
+        self.lock = threading.Lock()
+
+    def list(self):
+        components = []
+        for file_name in sorted(os.listdir(self.metamodel_dir)):
+            if file_name == REST_NAVIGATION_CAPTURE_FILE or not file_name.endswith('.json'):
+                continue
+            components.append(file_name[:-len('.json')])
+        return components
+
+    def get(self, component_id):
+        with open(os.path.join(self.metamodel_dir, component_id + '.json')) as component_file:
+            return dict_to_metamodel_object(json.load(component_file))
+
+    def fingerprint(self, component_id):
+        file_name = os.path.join(self.metamodel_dir, component_id + '.json')
+        file_key = get_file_key(file_name)
+        with self.lock:
+            cached_key, fingerprint = self.fingerprint_dict.get(component_id, (None, None))
+        if cached_key == file_key:
+            return fingerprint
+        fingerprint = self.__read_fingerprint_file(component_id, file_key)
+        if fingerprint is None:
+            # No fingerprint file, or one written for an earlier version of the dump
+            with open(file_name) as component_file:
+                fingerprint = json.load(component_file)['fingerprint']
+        with self.lock:
+            self.fingerprint_dict[component_id] = (file_key, fingerprint)
+        return fingerprint
+
+
+    def __read_fingerprint_file(self, component_id, file_key):
+        fingerprint_file_name = os.path.join(self.metamodel_dir, component_id + FINGERPRINT_FILE_SUFFIX)
+        if not os.path.exists(fingerprint_file_name):
+            return None
+        with open(fingerprint_file_name) as fingerprint_file:
+            fingerprint_data = json.load(fingerprint_file)
+        if fingerprint_data['file_key'] != file_key:
+            return None
+        return fingerprint_data['fingerprint']
+
+
+def load_rest_navigation_handler(metamodel_dir, rest_navigation_url=None):
+    """
+    Creates a RestNavigationHandler which answers from the rest navigation capture
+    stored in the metamodel directory. Without a capture, every service is treated
+    as missing from rest navigation.
+    """
+    capture_file = os.path.join(metamodel_dir, REST_NAVIGATION_CAPTURE_FILE)
+    if os.path.exists(capture_file):
+        return RestNavigationHandler.load(capture_file)
+    if rest_navigation_url is None:
+        raise ValueError('restNavigationUrl is required when ' + capture_file + ' does not exist')
+    return RestNavigationHandler(rest_navigation_url, {})
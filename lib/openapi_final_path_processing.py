@@ -3,12 +3,23 @@
 
 import os
 import re
-import collections
 from lib import utils
 from lib.path_processing import PathProcessing
 
+# Security schemes which operations may require, see utils.add_basic_auth and
+# AuthenticationDictNavigator.get_security_requirements
+SECURITY_SCHEMES = {
+    'session_id': {
+        'type': 'apiKey',
+        'in': 'header',
+        'name': 'vmware-api-session-id'},
+    'basic_auth': {
+        'type': 'http',
+        'scheme': 'basic'}}
+
 
 class OpenapiPathProcessing(PathProcessing):
+    schema_json_level = 2
 
     def __init__(self):
         pass
@@ -20,17 +31,27 @@ class OpenapiPathProcessing(PathProcessing):
             output_dir,
             output_filename,
             gen_unique_op_id,
-            prefix=''):
+            prefix='',
+            compact=False):
+        swagger_template = self.get_spec_template(path_dict, type_dict, output_filename)
+
+        if not os.path.exists(output_dir):
+            os.mkdir(output_dir)
+
+        file_name = output_dir + os.path.sep + self.get_output_file_name(output_filename, prefix)
+        utils.write_json_data_to_file(file_name, swagger_template, compact)
+        return file_name
+
+    def get_spec_template(self, path_dict, type_dict, output_filename):
+        """
+        Builds the openapi document of a package. Paths and components are not
+        copied, they are written in sorted order by utils.write_json_data_to_file.
+        The request bodies were renamed with the schemas by remove_com_vmware_from_dict.
+        """
         reqBody = {}
         description_map = utils.load_description()
         if 'requestBodies' in type_dict:
-            self.remove_com_vmware_from_dict(type_dict['requestBodies'])
-            reqBody = collections.OrderedDict(
-                sorted(type_dict['requestBodies'].items()))
-
-        file_prefix = ''
-        if prefix != '':
-            file_prefix = prefix + "_"
+            reqBody = type_dict['requestBodies']
 
         swagger_template = {
             'openapi': '3.0.0',
@@ -38,24 +59,26 @@ class OpenapiPathProcessing(PathProcessing):
                 'description': description_map.get(output_filename, ''),
                 'title': utils.remove_curly_braces(output_filename),
                 'version': '2.0.0'},
-            'paths': collections.OrderedDict(sorted(path_dict.items())),
+            'paths': utils.SortedJsonSection(path_dict),
             'components': {
-                'requestBodies': reqBody}}
+                'requestBodies': utils.SortedJsonSection(reqBody)}}
         if 'requestBodies' in type_dict:
             del type_dict['requestBodies']
-        swagger_template['components']['schemas'] = collections.OrderedDict(
-            sorted(type_dict.items()))
-
-        if not os.path.exists(output_dir):
-            os.mkdir(output_dir)
-
-        utils.write_json_data_to_file(
-            output_dir +
-            os.path.sep +
-            file_prefix +
-            utils.remove_curly_braces(output_filename) +
-            '.json',
-            swagger_template)
+        swagger_template['components']['schemas'] = utils.SortedJsonSection(type_dict)
+        security_scheme_names = self.get_security_scheme_names(path_dict)
+        if security_scheme_names:
+            # Defined once per document, for the schemes its operations refer to
+            swagger_template['components']['securitySchemes'] = {
+                scheme_name: SECURITY_SCHEMES[scheme_name] for scheme_name in sorted(security_scheme_names)}
+        return swagger_template
+
+    def get_security_scheme_names(self, path_dict):
+        security_scheme_names = set()
+        for path_operations in path_dict.values():
+            for operation in path_operations.values():
+                for security_requirement in operation.get('security', []):
+                    security_scheme_names.update(security_requirement)
+        return security_scheme_names
 
     def remove_query_params(self, path_dict):
         """
@@ -1,16 +1,126 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
+import os
 import re
 
+import six
+
 from lib import utils
+from lib.reference_index import PATH_OWNER_PREFIX
 
 
 class PathProcessing():
+    # Nesting level of the models in the written document
+    schema_json_level = 1
+
     def __init__(self):
         pass
 
-    def remove_com_vmware_from_dict(self, swagger_obj, depth=0, keys_list=[], add_camel_case=False):
+    def prune_unused_schemas(self, type_dict, reference_index, compact=False):
+        """
+        Removes the models which cannot be reached from the paths or the request
+        bodies of a document, e.g. the error wrappers no operation returns.
+        The removed models are forgotten by the reference index as well.
+        :return: the number of removed models and the bytes they took in the written document
+        """
+        reachable = reference_index.get_reachable()
+        pruned_count = 0
+        pruned_bytes = 0
+        for name in list(type_dict):
+            if name == 'requestBodies':
+                continue
+            reference = reference_index.get_model_reference(name)
+            if reference not in reachable:
+                pruned_bytes += utils.get_json_entry_size(name, type_dict.pop(name), compact,
+                                                          self.schema_json_level)
+                pruned_count += 1
+                reference_index.remove(reference)
+        return pruned_count, pruned_bytes
+
+    def get_output_file_name(self, output_filename, prefix=''):
+        """
+        Returns the name of the file process_output writes a document to, relative to the output directory
+        """
+        file_prefix = ''
+        if prefix != '':
+            file_prefix = prefix + "_"
+        return file_prefix + utils.remove_curly_braces(output_filename) + '.json'
+
+    def output_tag_shards(self, path_dict, type_dict, reference_index, output_dir, output_filename, prefix='',
+                          compact=False):
+        """
+        Writes a fragment of the document for every tag of its operations, with
+        the operations of the tag and the models they reach, and an index file
+        mapping the tags to the fragments. Must be called before process_output,
+        which takes the request bodies out of type_dict.
+        The models are looked up in the reference index, by path: a path with
+        operations of several tags brings the models of all of them.
+        :return: the index file name and the fragment file names
+        """
+        tag_path_dict = {}
+        for path, path_obj in six.iteritems(path_dict):
+            for http_method, operation in six.iteritems(path_obj):
+                tags = operation.get('tags') if isinstance(operation, dict) else None
+                tag = tags[0] if tags else ''
+                tag_path_dict.setdefault(tag, {}).setdefault(path, {})[http_method] = operation
+
+        if not os.path.exists(output_dir):
+            os.mkdir(output_dir)
+        file_prefix = prefix + '_' if prefix != '' else ''
+        base_name = output_dir + os.path.sep + file_prefix + utils.remove_curly_braces(output_filename)
+        shard_dict = {}
+        file_names = []
+        slugs = set()
+        for tag in sorted(tag_path_dict):
+            shard_path_dict = tag_path_dict[tag]
+            slug = re.sub(r'[^A-Za-z0-9_-]', '_', tag) or 'untagged'
+            # Tags which differ only in their special characters get numbered files
+            unique_slug = slug
+            suffix = 2
+            while unique_slug in slugs:
+                unique_slug = slug + '_' + str(suffix)
+                suffix += 1
+            slugs.add(unique_slug)
+            file_name = base_name + '.' + unique_slug + '.json'
+            shard_template = self.get_spec_template(
+                shard_path_dict, self.get_shard_type_dict(shard_path_dict, type_dict, reference_index),
+                output_filename)
+            utils.write_json_data_to_file(file_name, shard_template, compact)
+            file_names.append(file_name)
+            shard_dict[tag] = {
+                'file': os.path.basename(file_name),
+                'size': os.path.getsize(file_name),
+                'paths': len(shard_path_dict),
+                'operations': sum(len(path_obj) for path_obj in shard_path_dict.values())}
+
+        index_file_name = base_name + '.tags.json'
+        utils.write_json_data_to_file(index_file_name, {
+            'title': utils.remove_curly_braces(output_filename),
+            'tags': utils.SortedJsonSection(shard_dict)}, compact)
+        return [index_file_name] + file_names
+
+    def get_shard_type_dict(self, shard_path_dict, type_dict, reference_index):
+        references = set()
+        for path in shard_path_dict:
+            references.update(reference_index.get_references(PATH_OWNER_PREFIX + path))
+        references.update(reference_index.get_reachable(references))
+        shard_type_dict = {}
+        for reference in references:
+            model_name = reference_index.get_model_name(reference)
+            if model_name is None:
+                # e.g. a schema in the shared components file
+                continue
+            name, request_body = model_name
+            if request_body:
+                request_bodies = type_dict.get('requestBodies', {})
+                if name in request_bodies:
+                    shard_type_dict.setdefault('requestBodies', {})[name] = request_bodies[name]
+            elif name in type_dict:
+                shard_type_dict[name] = type_dict[name]
+        return shard_type_dict
+
+    def remove_com_vmware_from_dict(self, swagger_obj, depth=0, add_camel_case=False):
         """
         The method
         1. removes 'com.vmware.' from model names
@@ -19,83 +129,77 @@ class PathProcessing():
         This is done on both definitions and path
         'definitions' : where models are defined and may be referenced.
         'path' : where models are referenced.
+        The new names come from a ModelNameTable, so every distinct name is
+        rewritten once however often it is referenced. The model names of a
+        definitions dictionary and of its 'requestBodies' are renamed in the
+        same traversal.
         :param swagger_obj: should be path of definitions dictionary
         :param depth: depth of the dictionary. Defaults to 0
-        :param keys_list: List of updated model names
+        :param add_camel_case: camel cases the model names of /api specifications
         :return:
         """
+        self.rename_models(swagger_obj, ModelNameTable(add_camel_case), depth == 0)
+
+    def rename_models(self, swagger_obj, name_table, rename_keys=True):
+        if rename_keys and isinstance(swagger_obj, dict):
+            if isinstance(swagger_obj.get('requestBodies'), dict):
+                # Request bodies keep their names apart from the prefix, see OpenapiPathProcessing
+                self.__rename_keys(swagger_obj['requestBodies'], name_table.get_request_body_name)
+            self.__rename_keys(swagger_obj, name_table.get_model_name)
+        self.__rewrite_references(swagger_obj, name_table)
+
+    def __rename_keys(self, swagger_obj, get_name):
+        # Model ids are collected before renaming, the dictionary changes in the loop
+        renamed_keys = [key for key, item in swagger_obj.items()
+                        if isinstance(item, dict) and ModelNameTable.is_renamed(key)]
+        for old_key in reversed(renamed_keys):
+            swagger_obj[get_name(old_key)] = swagger_obj.pop(old_key)
+
+    def __rewrite_references(self, swagger_obj, name_table):
         if isinstance(swagger_obj, dict):
             if '$ref' in swagger_obj and 'required' in swagger_obj:
                 del swagger_obj['required']
             for key, item in swagger_obj.items():
                 if isinstance(item, str):
-                    if key in ('$ref', 'summary', 'description'):
-                        item = item.replace('com.vmware.', '').replace('ComVmware', '')
-                        if key == '$ref':
-                            item = item.replace('$', '_')
-                            if add_camel_case:
-                                item = utils.get_str_camel_case(item, "_")
-                        swagger_obj[key] = item
-                elif isinstance(item, list):
-                    for itm in item:
-                        self.remove_com_vmware_from_dict(
-                            itm, depth + 1, keys_list, add_camel_case)
-                elif isinstance(item, dict):
-                    if depth == 0 and isinstance(key, str) and (
-                            key.startswith('com.vmware.') or
-                            key.startswith('ComVmware') or '$' in key):
-                        keys_list.append(key)
-                    self.remove_com_vmware_from_dict(
-                        item, depth + 1, keys_list, add_camel_case)
+                    if key == '$ref':
+                        swagger_obj[key] = name_table.get_reference(item)
+                    elif key in ('summary', 'description'):
+                        swagger_obj[key] = ModelNameTable.remove_prefix(item)
+                elif isinstance(item, (dict, list)):
+                    self.__rewrite_references(item, name_table)
         elif isinstance(swagger_obj, list):
             for itm in swagger_obj:
-                self.remove_com_vmware_from_dict(itm, depth + 1, add_camel_case)
-        if depth == 0 and len(keys_list) > 0:
-            while keys_list:
-                old_key = keys_list.pop()
-                new_key = old_key.replace('com.vmware.', '').replace('ComVmware', '')
-                new_key = new_key.replace('$', '_')
-                if add_camel_case:
-                    new_key = utils.get_str_camel_case(new_key, "_")
-                try:
-                    swagger_obj[new_key] = swagger_obj.pop(old_key)
-                except KeyError:
-                    print(
-                        'Could not find the Swagger Element :  {}'.format(old_key))
-
-    def create_unique_op_ids(self, path_dict):
+                if isinstance(itm, (dict, list)):
+                    self.__rewrite_references(itm, name_table)
+
+    def create_unique_op_ids(self, path_dict, operation_id_registry=None, package=None):
         """
         Creates unique operation ids
         Takes the path dictionary as input parameter:
-        1. Iterates through all the http_operation array
+        1. Iterates through all the http_operation array, in sorted order
         2. For every operation gets the current operation id
         3. Calls method to get the camelized operation id
-        4. Checks for uniqueness
+        4. Claims it in the registry, which suffixes ids taken by other operations
         5. Updates the path dictionary with the unique operation id
 
         :param path_dict:
+        :param operation_id_registry: registry shared by all documents of the run,
+        ids are only unique within path_dict without one
+        :param package: package of path_dict, reported with the renamed ids
         """
-        op_id_list = [
-            'get',
-            'set',
-            'list',
-            'add',
-            'run',
-            'start',
-            'stop',
-            'restart',
-            'reset',
-            'cancel',
-            'create',
-            'update',
-            'delete']
-        for path, http_operation in path_dict.items():
-            for http_method, operation_dict in http_operation.items():
+        if operation_id_registry is None:
+            operation_id_registry = OperationIdRegistry()
+        for path in sorted(path_dict):
+            http_operation = path_dict[path]
+            for http_method in sorted(http_operation):
+                operation_dict = http_operation[http_method]
                 op_id_val = self.create_camelized_op_id(
                     path, http_method, operation_dict)
-                if op_id_val not in op_id_list:
-                    operation_dict['operationId'] = op_id_val
-                    op_id_list.append(op_id_val)
+                # Operations named by a bare generic verb keep their original id
+                if op_id_val in operation_id_registry.generic_operation_ids:
+                    continue
+                operation_dict['operationId'] = operation_id_registry.claim(
+                    op_id_val, package, path, http_method)
 
     def create_camelized_op_id(self, path, http_method, operations_dict):
         """
@@ -151,3 +255,99 @@ class PathProcessing():
         z = x.copy()   # start with x's keys and values
         z.update(y)    # modifies z with y's keys and values & returns None
         return z
+
+
+# Camelized ids which are too generic to be unique, the operations keep their original id
+GENERIC_OPERATION_IDS = (
+    'get',
+    'set',
+    'list',
+    'add',
+    'run',
+    'start',
+    'stop',
+    'restart',
+    'reset',
+    'cancel',
+    'create',
+    'update',
+    'delete')
+
+
+class OperationIdRegistry:
+    """
+    Operation ids of all the documents of a run. An id which is already taken
+    gets the smallest free numeric suffix, starting with 2, e.g. getVm2. Every
+    renamed id is recorded in renamed_operation_ids. The generic_operation_ids
+    are reserved and never handed out.
+    """
+
+    def __init__(self, reserved_operation_ids=(), generic_operation_ids=GENERIC_OPERATION_IDS):
+        self.generic_operation_ids = frozenset(generic_operation_ids)
+        # Ids of documents which are not generated again, see GenerationManifest
+        self.operation_ids = set(self.generic_operation_ids)
+        self.operation_ids.update(reserved_operation_ids)
+        # Next suffix to try per id, so repeated collisions do not rescan the taken suffixes
+        self.next_suffix_dict = {}
+        self.package_operation_ids = {}
+        self.renamed_operation_ids = []
+
+    def claim(self, operation_id, package=None, path=None, http_method=None):
+        unique_operation_id = operation_id
+        if operation_id in self.operation_ids:
+            suffix = self.next_suffix_dict.get(operation_id, 2)
+            while operation_id + str(suffix) in self.operation_ids:
+                suffix += 1
+            self.next_suffix_dict[operation_id] = suffix + 1
+            unique_operation_id = operation_id + str(suffix)
+            self.renamed_operation_ids.append({
+                'package': package,
+                'path': path,
+                'method': http_method,
+                'operationId': operation_id,
+                'renamedTo': unique_operation_id})
+        self.operation_ids.add(unique_operation_id)
+        if package is not None:
+            self.package_operation_ids.setdefault(package, []).append(unique_operation_id)
+        return unique_operation_id
+
+
+class ModelNameTable:
+    """
+    Maps the model names and references of the generated dictionaries to their
+    published form: without the 'com.vmware.' prefix, with '_' instead of '$'
+    and camel cased for /api specifications. Every name is computed once.
+    """
+
+    def __init__(self, add_camel_case=False):
+        self.add_camel_case = add_camel_case
+        self.model_name_dict = {}
+        self.request_body_name_dict = {}
+        self.reference_dict = {}
+
+    @staticmethod
+    def is_renamed(name):
+        return isinstance(name, str) and (
+            name.startswith('com.vmware.') or name.startswith('ComVmware') or '$' in name)
+
+    @staticmethod
+    def remove_prefix(text):
+        return text.replace('com.vmware.', '').replace('ComVmware', '')
+
+    def __get_name(self, name, name_dict, add_camel_case):
+        new_name = name_dict.get(name)
+        if new_name is None:
+            new_name = self.remove_prefix(name).replace('$', '_')
+            if add_camel_case:
+                new_name = utils.get_str_camel_case(new_name, "_")
+            name_dict[name] = new_name
+        return new_name
+
+    def get_model_name(self, name):
+        return self.__get_name(name, self.model_name_dict, self.add_camel_case)
+
+    def get_request_body_name(self, name):
+        return self.__get_name(name, self.request_body_name_dict, False)
+
+    def get_reference(self, reference):
+        return self.__get_name(reference, self.reference_dict, self.add_camel_case)
@@ -0,0 +1,106 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import contextlib
+import cProfile
+import threading
+import timeit
+
+from lib import utils
+
+
+class PhaseRecorder:
+    """
+    Collects wall time, call counts and transferred or written bytes for the
+    phases of a generation run. Phases may be nested, and every thread has its
+    own stack of open phases. Bytes counted while a phase is open, e.g. http
+    responses seen by response_hook, are attributed to the innermost phase open
+    in the thread that counted them.
+    """
+
+    def __init__(self):
+        self.start = timeit.default_timer()
+        self.phase_dict = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def get_open_phases(self):
+        """
+        Returns the stack of the phases open in the calling thread, innermost last
+        """
+        open_phases = getattr(self.local, 'open_phases', None)
+        if open_phases is None:
+            open_phases = self.local.open_phases = []
+        return open_phases
+
+    def get_thread_initializer(self):
+        """
+        Returns an initializer for the threads of a thread pool, which lets them
+        count their bytes towards the phases open in the calling thread
+        """
+        open_phases = list(self.get_open_phases())
+
+        def init_thread():
+            self.local.open_phases = list(open_phases)
+        return init_thread
+
+    @contextlib.contextmanager
+    def phase(self, name, calls=1):
+        open_phases = self.get_open_phases()
+        open_phases.append(name)
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            elapsed = timeit.default_timer() - start
+            open_phases.pop()
+            self.record(name, elapsed, calls)
+
+    def record(self, name, seconds=0.0, calls=1, bytes_count=0):
+        with self.lock:
+            phase = self.phase_dict.setdefault(name, {'seconds': 0.0, 'calls': 0, 'bytes': 0})
+            phase['seconds'] += seconds
+            phase['calls'] += calls
+            phase['bytes'] += bytes_count
+
+    def add_bytes(self, bytes_count, name=None):
+        if name is None:
+            open_phases = self.get_open_phases()
+            if not open_phases:
+                return
+            name = open_phases[-1]
+        with self.lock:
+            phase = self.phase_dict.setdefault(name, {'seconds': 0.0, 'calls': 0, 'bytes': 0})
+            phase['bytes'] += bytes_count
+
+    def response_hook(self, response, *args, **kwargs):
+        """
+        requests response hook, counts the size of every response body
+        """
+        self.add_bytes(len(response.content))
+        return response
+
+    def get_report(self):
+        with self.lock:
+            phases = {name: dict(phase) for name, phase in self.phase_dict.items()}
+        return {
+            'total_seconds': timeit.default_timer() - self.start,
+            'phases': phases}
+
+    def write_report(self, file_name):
+        utils.write_json_data_to_file(file_name, self.get_report())
+
+
+def start_profiler():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop_profiler(profiler, file_name):
+    """
+    Writes the statistics in pstats format. Only the thread which started the
+    profiler is profiled, not the threads fetching or generating for it.
+    """
+    profiler.disable()
+    profiler.dump_stats(file_name)
@@ -0,0 +1,153 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import six
+
+# Prefixes of the references to the models of a type dictionary
+SCHEMA_REF_PATHS = {'2': '#/definitions/', '3': '#/components/schemas/'}
+REQUEST_BODY_REF_PATH = '#/components/requestBodies/'
+# Owner of the references made by the operations of a path
+PATH_OWNER_PREFIX = '#/paths/'
+
+
+class ReferenceIndex:
+    """
+    Records every $ref of a document: the node holding it and its owner, the
+    path or the model the node belongs to. The index is built with one
+    traversal of the path and type dictionaries. Renames, merges and deletions
+    then update only the affected nodes, and reachability queries do not
+    traverse the dictionaries again.
+    """
+
+    def __init__(self, spec):
+        self.schema_ref_path = SCHEMA_REF_PATHS[spec]
+        # Maps every referenced $ref to the (owner, node) pairs referencing it
+        self.node_dict = {}
+        # Maps every owner to the $refs it holds
+        self.owner_dict = {}
+
+    def get_model_reference(self, name, request_body=False):
+        if request_body:
+            return REQUEST_BODY_REF_PATH + name
+        return self.schema_ref_path + name
+
+    def get_model_name(self, reference):
+        """
+        Returns the type dictionary key of a model reference and whether it is
+        a request body, or None for the references to other documents or sections.
+        """
+        if reference.startswith(self.schema_ref_path):
+            return reference[len(self.schema_ref_path):], False
+        if reference.startswith(REQUEST_BODY_REF_PATH):
+            return reference[len(REQUEST_BODY_REF_PATH):], True
+        return None
+
+    def add_path_dict(self, path_dict):
+        for path, path_obj in six.iteritems(path_dict):
+            self.__add_references(path_obj, PATH_OWNER_PREFIX + path)
+
+    def add_type_dict(self, type_dict):
+        for name, model in six.iteritems(type_dict):
+            if name == 'requestBodies':
+                for body_name, body in six.iteritems(model):
+                    self.__add_references(body, self.get_model_reference(body_name, True))
+            else:
+                self.__add_references(model, self.get_model_reference(name))
+
+    def __add_references(self, swagger_obj, owner):
+        self.owner_dict.setdefault(owner, set())
+        stack = [swagger_obj]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                reference = item.get('$ref')
+                if isinstance(reference, str):
+                    self.add_reference(reference, owner, item)
+                stack.extend(value for value in item.values() if isinstance(value, (dict, list)))
+            elif isinstance(item, list):
+                stack.extend(value for value in item if isinstance(value, (dict, list)))
+
+    def add_reference(self, reference, owner, node):
+        self.node_dict.setdefault(reference, []).append((owner, node))
+        self.owner_dict.setdefault(owner, set()).add(reference)
+
+    def get_referrers(self, reference):
+        """
+        Returns the owners holding a reference to reference
+        """
+        return {owner for owner, node in self.node_dict.get(reference, ())}
+
+    def get_references(self, owner):
+        return self.owner_dict.get(owner, set())
+
+    def is_referenced(self, reference):
+        return reference in self.node_dict
+
+    def get_unreferenced(self):
+        """
+        Returns the models which no path and no model references, not even themselves
+        """
+        return {owner for owner in self.owner_dict
+                if not owner.startswith(PATH_OWNER_PREFIX) and owner not in self.node_dict}
+
+    def get_reachable(self, roots=None):
+        """
+        Returns the references reachable from the roots, by default from the
+        paths and the request bodies
+        """
+        if roots is None:
+            roots = [owner for owner in self.owner_dict
+                     if owner.startswith(PATH_OWNER_PREFIX) or owner.startswith(REQUEST_BODY_REF_PATH)]
+        reachable = set()
+        stack = list(roots)
+        while stack:
+            for reference in self.owner_dict.get(stack.pop(), ()):
+                if reference not in reachable:
+                    reachable.add(reference)
+                    stack.append(reference)
+        return reachable
+
+    def rename(self, old_reference, new_reference):
+        """
+        Points the nodes referencing old_reference to new_reference. When a model
+        is renamed, the caller renames its type dictionary key.
+        """
+        if old_reference == new_reference:
+            return
+        nodes = self.node_dict.pop(old_reference, [])
+        for owner, node in nodes:
+            node['$ref'] = new_reference
+            owner_references = self.owner_dict[owner]
+            owner_references.discard(old_reference)
+            owner_references.add(new_reference)
+        if nodes:
+            self.node_dict.setdefault(new_reference, []).extend(nodes)
+        if old_reference in self.owner_dict:
+            references = self.owner_dict.pop(old_reference)
+            self.owner_dict.setdefault(new_reference, set()).update(references)
+            for reference in references:
+                self.node_dict[reference] = [
+                    (new_reference if owner == old_reference else owner, node)
+                    for owner, node in self.node_dict[reference]]
+
+    def remove(self, owner):
+        """
+        Forgets the references held by a deleted path or model. References to it
+        from other owners are kept, they are dangling until removed as well.
+        """
+        for reference in self.owner_dict.pop(owner, ()):
+            nodes = [(node_owner, node) for node_owner, node in self.node_dict[reference] if node_owner != owner]
+            if nodes:
+                self.node_dict[reference] = nodes
+            else:
+                del self.node_dict[reference]
+
+    def merge(self, reference_index):
+        """
+        Adds the references of another document, e.g. when /api and /rest
+        documents of a package are merged.
+        """
+        for reference, nodes in six.iteritems(reference_index.node_dict):
+            self.node_dict.setdefault(reference, []).extend(nodes)
+        for owner, references in six.iteritems(reference_index.owner_dict):
+            self.owner_dict.setdefault(owner, set()).update(references)
@@ -23,7 +23,8 @@ class RestMetamodel2Openapi(RestMetamodel2Spec):
             enum_dict,
             operation_id,
             error_map,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         documentation = operation_info.documentation
         params = operation_info.params
         errors = operation_info.errors
@@ -31,7 +32,8 @@ class RestMetamodel2Openapi(RestMetamodel2Spec):
         http_method = http_method.lower()
         par_array, url = self.handle_request_mapping(url, http_method, service_name,
                                                      operation_id, params, type_dict,
-                                                     structure_dict, enum_dict, show_unreleased_apis, rest_open_ph)
+                                                     structure_dict, enum_dict, show_unreleased_apis, rest_open_ph,
+                                                     type_resolution_memo)
         response_map = rest_open_rh.populate_response_map(
             output,
             errors,
@@ -41,7 +43,8 @@ class RestMetamodel2Openapi(RestMetamodel2Spec):
             enum_dict,
             service_name,
             operation_id,
-            show_unreleased_apis)
+            show_unreleased_apis,
+            type_resolution_memo)
 
         path_obj = utils.build_path(
             service_name,
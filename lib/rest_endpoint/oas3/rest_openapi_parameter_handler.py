@@ -14,13 +14,14 @@ class RestOpenapiParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Converts metamodel fieldinfo to swagger parameter.
         """
         parameter_obj = {}
         ref_path = "#/components/schemas/"
-        tpHandler = RestTypeHandler(show_unreleased_apis)
+        tpHandler = RestTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             input_parameter_obj.type,
             parameter_obj,
@@ -62,7 +63,8 @@ class RestOpenapiParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Creates a  json object wrapper around request body parameters. parameter names are used as keys and the
         parameters as values.
@@ -81,7 +83,7 @@ class RestOpenapiParaHandler():
         body_obj['properties'] = properties_obj
         required = []
         ref_path = "#/components/schemas/"
-        tpHandler = RestTypeHandler(show_unreleased_apis)
+        tpHandler = RestTypeHandler(show_unreleased_apis, type_resolution_memo)
         for param in body_param_list:
             parameter_obj = {}
             tpHandler.visit_type_category(
@@ -120,7 +122,8 @@ class RestOpenapiParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Flattens query parameters specs.
         1. Create a query parameter for every field in spec.
@@ -157,7 +160,7 @@ class RestOpenapiParaHandler():
         prop_array = []
         parameter_obj = {}
         ref_path = "#/components/schemas/"
-        tpHandler = RestTypeHandler(show_unreleased_apis)
+        tpHandler = RestTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             query_param_info.type,
             parameter_obj,
@@ -18,7 +18,8 @@ class RestOpenapiRespHandler():
             enum_svc,
             service_id,
             operation_id,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
 
         response_map = {}
         ref_path = "#/components/schemas/"
@@ -30,7 +31,7 @@ class RestOpenapiRespHandler():
             }
         }
         schema = {}
-        tpHandler = RestTypeHandler(show_unreleased_apis)
+        tpHandler = RestTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             output.type,
             schema,
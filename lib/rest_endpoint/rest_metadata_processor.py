@@ -28,7 +28,8 @@ class RestMetadataProcessor(MetadataProcessor):
             show_unreleased_apis,
             spec,
             auth_navigator=None,
-            deprecation_handler=None):
+            deprecation_handler=None,
+            type_resolution_memo=None):
 
         print('processing package ' + package_name + os.linesep)
         type_dict = {}
@@ -62,12 +63,8 @@ class RestMetadataProcessor(MetadataProcessor):
                             enum_dict,
                             operation_id,
                             http_error_map,
-                            show_unreleased_apis)
-
-                        if auth_navigator is not None:
-                            scheme_set = auth_navigator.find_schemes_set(operation_id, service_name, package_name)
-                            if scheme_set is not None and len(scheme_set) != 0:
-                                swagg.decorate_path_with_security(path, scheme_set)
+                            show_unreleased_apis,
+                            type_resolution_memo)
 
                     if spec == '3':
                         path = openapi.get_path(
@@ -80,8 +77,11 @@ class RestMetadataProcessor(MetadataProcessor):
                             enum_dict,
                             operation_id,
                             http_error_map,
-                            show_unreleased_apis)
+                            show_unreleased_apis,
+                            type_resolution_memo)
 
+                    if auth_navigator is not None:
+                        self.decorate_path_with_security(path, operation_id, service_name, package_name, auth_navigator)
                     if deprecation_handler is not None and service_end_point == "/deprecated":
                         deprecation_handler.add_deprecation_information(path, package_name, service_name)
                     path_list.append(path)
@@ -129,12 +129,8 @@ class RestMetadataProcessor(MetadataProcessor):
                         enum_dict,
                         operation_id,
                         http_error_map,
-                        show_unreleased_apis)
-
-                    if auth_navigator is not None:
-                        scheme_set = auth_navigator.find_schemes_set(operation_id, service_name, package_name)
-                        if scheme_set is not None and len(scheme_set) != 0:
-                            swagg.decorate_path_with_security(path, scheme_set)
+                        show_unreleased_apis,
+                        type_resolution_memo)
 
                 if spec == '3':
                     path = openapi.get_path(
@@ -147,8 +143,11 @@ class RestMetadataProcessor(MetadataProcessor):
                         enum_dict,
                         operation_id,
                         http_error_map,
-                        show_unreleased_apis)
+                        show_unreleased_apis,
+                        type_resolution_memo)
 
+                if auth_navigator is not None:
+                    self.decorate_path_with_security(path, operation_id, service_name, package_name, auth_navigator)
                 if deprecation_handler is not None and service_end_point == "/deprecated":
                     deprecation_handler.add_deprecation_information(path, package_name, service_name)
                 path_list.append(path)
@@ -156,6 +155,23 @@ class RestMetadataProcessor(MetadataProcessor):
         self.cleanup(path_dict=path_dict, type_dict=type_dict)
         return path_dict, type_dict
 
+    def get_rest_navigation_service_urls(self, service_urls, service_dict, service_url_dict, show_unreleased_apis):
+        """
+        Returns the service urls get_path_and_type_dicts looks up in rest navigation,
+        those of the services without @RequestMapping annotations
+        """
+        rest_navigation_service_urls = []
+        for service_url in service_urls:
+            service_name, _ = service_url_dict.get(service_url, None)
+            service_info = service_dict.get(service_name, None)
+            if service_info is None:
+                continue
+            if (not show_unreleased_apis) and utils.is_filtered(service_info.metadata):
+                continue
+            if not self.contains_rm_annotation(service_info):
+                rest_navigation_service_urls.append(service_url)
+        return rest_navigation_service_urls
+
     def contains_rm_annotation(self, service_info):
         for operation in service_info.operations.values():
             if 'RequestMapping' not in operation.metadata:
@@ -17,7 +17,8 @@ class RestMetamodel2Spec():
             enum_dict,
             operation_id,
             error_map,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         pass
 
     def handle_request_mapping(
@@ -31,7 +32,8 @@ class RestMetamodel2Spec():
             structure_svc,
             enum_svc,
             show_unreleased_apis,
-            spec):
+            spec,
+            type_resolution_memo=None):
         if method_type in ('post', 'put', 'patch'):
             return self.process_put_post_patch_request(
                 url,
@@ -42,7 +44,8 @@ class RestMetamodel2Spec():
                 structure_svc,
                 enum_svc,
                 show_unreleased_apis,
-                spec)
+                spec,
+                type_resolution_memo)
         if method_type == 'get':
             return self.process_get_request(
                 url,
@@ -51,7 +54,8 @@ class RestMetamodel2Spec():
                 structure_svc,
                 enum_svc,
                 show_unreleased_apis,
-                spec)
+                spec,
+                type_resolution_memo)
         if method_type == 'delete':
             return self.process_delete_request(
                 url,
@@ -60,7 +64,8 @@ class RestMetamodel2Spec():
                 structure_svc,
                 enum_svc,
                 show_unreleased_apis,
-                spec)
+                spec,
+                type_resolution_memo)
 
     def process_put_post_patch_request(
             self,
@@ -72,7 +77,8 @@ class RestMetamodel2Spec():
             structure_svc,
             enum_svc,
             show_unreleased_apis,
-            spec):
+            spec,
+            type_resolution_memo=None):
         """
         Handles http post/put/patch request.
         todo: handle query, formData and header parameters
@@ -83,7 +89,8 @@ class RestMetamodel2Spec():
         par_array = []
         for field_info in path_param_list:
             parx = spec.convert_field_info_to_swagger_parameter(
-                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             par_array.append(parx)
 
         # Body
@@ -97,7 +104,8 @@ class RestMetamodel2Spec():
                 type_dict,
                 structure_svc,
                 enum_svc,
-                show_unreleased_apis)
+                show_unreleased_apis,
+                type_resolution_memo)
             if parx is not None:
                 par_array.append(parx)
 
@@ -111,14 +119,16 @@ class RestMetamodel2Spec():
             structure_svc,
             enum_svc,
             show_unreleased_apis,
-            spec):
+            spec,
+            type_resolution_memo=None):
         param_array = []
         path_param_list, other_params_list, new_url = utils.extract_path_parameters(
             params, url)
 
         for field_info in path_param_list:
             parameter_obj = spec.convert_field_info_to_swagger_parameter(
-                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             param_array.append(parameter_obj)
 
         # process query parameters
@@ -127,7 +137,8 @@ class RestMetamodel2Spec():
             # handling of all the query parameters; filter as well as non
             # filter
             flattened_params = spec.flatten_query_param_spec(
-                field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             if flattened_params is not None:
                 param_array = param_array + flattened_params
         return param_array, new_url
@@ -140,17 +151,20 @@ class RestMetamodel2Spec():
             structure_svc,
             enum_svc,
             show_unreleased_apis,
-            spec):
+            spec,
+            type_resolution_memo=None):
         path_param_list, other_params, new_url = utils.extract_path_parameters(
             params, url)
         param_array = []
         for field_info in path_param_list:
             parx = spec.convert_field_info_to_swagger_parameter(
-                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                'path', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             param_array.append(parx)
         for field_info in other_params:
             parx = spec.convert_field_info_to_swagger_parameter(
-                'query', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis)
+                'query', field_info, type_dict, structure_svc, enum_svc, show_unreleased_apis,
+                type_resolution_memo)
             param_array.append(parx)
         return param_array, new_url
 
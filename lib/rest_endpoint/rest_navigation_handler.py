@@ -1,17 +1,137 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
+import json
+import os
+import threading
+from concurrent import futures
+
+import requests
+import six
+
 from lib import utils
 
 class RestNavigationHandler:
 
-    def __init__(self, rest_navigation_url):
+    def __init__(self, rest_navigation_url, service_operations_dict=None, session=None):
+        '''
+        service_operations_dict maps service paths (relative to rest_navigation_url) to the
+        ?~method=OPTIONS responses. If it is given, the handler works offline and never
+        contacts the rest navigation service. Otherwise session, the requests session the
+        handler sends its requests with, is required. Copies made for worker processes
+        have no session, they work offline with the responses obtained so far.
+        '''
         self.rest_navigation_url = rest_navigation_url
+        self.session = session
+        self.offline = service_operations_dict is not None
+        # Also the memo of the online handler: every service path is probed at most once
+        self.service_operations_dict = service_operations_dict if self.offline else {}
+        self.lock = threading.Lock()
+        self.service_path_locks = {}
 
     def get_service_operations(self, service_url):
-        if self.rest_navigation_url not in service_url:
-            return utils.get_json(self.rest_navigation_url + service_url + '?~method=OPTIONS', False)
-        return utils.get_json(service_url + '?~method=OPTIONS', False)
+        service_path = self.get_service_path(service_url)
+        if self.offline:
+            return self.service_operations_dict.get(service_path)
+        # Concurrent callers asking for the same service wait for the first request
+        # instead of issuing their own
+        with self.__get_service_path_lock(service_path):
+            if service_path in self.service_operations_dict:
+                return self.service_operations_dict[service_path]
+            service_operations_url = self.rest_navigation_url + service_path + '?~method=OPTIONS'
+            try:
+                service_operations = utils.request_json(service_operations_url, False, self.session)
+            except requests.RequestException as ex:
+                # No answer, possibly a transient error, the next caller issues the request again
+                utils.eprint('Cannot Load %s' % service_operations_url)
+                utils.eprint(ex)
+                return None
+            # Services the server does not know are remembered as None
+            self.service_operations_dict[service_path] = service_operations
+            return service_operations
+
+    def __getstate__(self):
+        # Locks cannot be copied into worker processes, every copy gets its own.
+        # Neither can the connections of the session, the services are prefetched
+        # by the parent process instead, see spec_generation.generate_package_specs.
+        state = self.__dict__.copy()
+        del state['lock']
+        del state['service_path_locks']
+        state['session'] = None
+        state['offline'] = True
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+        self.service_path_locks = {}
+
+    def __get_service_path_lock(self, service_path):
+        with self.lock:
+            return self.service_path_locks.setdefault(service_path, threading.Lock())
+
+    def prefetch(self, service_urls, max_workers=1, thread_initializer=None):
+        '''
+        Probes all given services up front, max_workers at a time, so later
+        get_service_operations calls are answered from memory
+        '''
+        if self.offline:
+            return
+        service_paths = sorted(set(self.get_service_path(service_url) for service_url in service_urls))
+        with futures.ThreadPoolExecutor(max_workers=max(1, max_workers), initializer=thread_initializer) as executor:
+            list(executor.map(self.get_service_operations, service_paths))
+
+    def get_service_path(self, service_url):
+        if service_url.startswith(self.rest_navigation_url):
+            return service_url[len(self.rest_navigation_url):]
+        return service_url
 
     def get_rest_navigation_url(self):
         return self.rest_navigation_url
+
+    def save(self, file_name):
+        '''
+        Saves every rest navigation response obtained so far, so it can be served by
+        a handler created through RestNavigationHandler.load
+        '''
+        with self.lock:
+            service_operations_dict = {service_path: service_operations for service_path, service_operations
+                                       in six.iteritems(self.service_operations_dict)
+                                       if service_operations is not None}
+        # Replaced atomically, as the file may be a cache shared by concurrent runs
+        temp_file_name = file_name + '.' + str(os.getpid()) + '.tmp'
+        utils.write_json_data_to_file(temp_file_name, {
+            'rest_navigation_url': self.rest_navigation_url,
+            'service_operations': service_operations_dict})
+        os.replace(temp_file_name, file_name)
+
+    def load_saved_responses(self, file_name):
+        '''
+        Seeds the memo with the responses saved in file_name by an earlier run against
+        the same rest navigation url. Returns the number of responses loaded.
+        '''
+        if not os.path.exists(file_name):
+            return 0
+        try:
+            with open(file_name) as capture_file:
+                capture = json.load(capture_file)
+        except Exception as ex:
+            utils.eprint('Ignoring unreadable rest navigation capture %s' % file_name)
+            utils.eprint(ex)
+            return 0
+        if capture.get('rest_navigation_url') != self.rest_navigation_url:
+            return 0
+        # Only responses are trusted: a null entry would turn into a not-found answer,
+        # which is never probed again
+        service_operations_dict = {service_path: service_operations for service_path, service_operations
+                                   in six.iteritems(capture['service_operations'])
+                                   if service_operations is not None}
+        with self.lock:
+            self.service_operations_dict.update(service_operations_dict)
+        return len(service_operations_dict)
+
+    @staticmethod
+    def load(file_name):
+        with open(file_name) as capture_file:
+            capture = json.load(capture_file)
+        return RestNavigationHandler(capture['rest_navigation_url'], capture['service_operations'])
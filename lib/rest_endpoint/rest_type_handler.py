@@ -7,8 +7,8 @@ from lib.type_handler_common import TypeHandlerCommon
 
 class RestTypeHandler(TypeHandlerCommon):
 
-    def __init__(self, show_unreleased_apis):
-        TypeHandlerCommon.__init__(self, show_unreleased_apis)
+    def __init__(self, show_unreleased_apis, type_resolution_memo=None):
+        TypeHandlerCommon.__init__(self, show_unreleased_apis, type_resolution_memo)
 
     def visit_generic(
             self,
@@ -1,7 +1,7 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
-from lib import utils, authentication_metadata_processing
+from lib import utils
 from lib.rest_endpoint.rest_metamodel2spec import RestMetamodel2Spec
 from .rest_swagger_parameter_handler import RestSwaggerParaHandler
 from .rest_swagger_response_handler import RestSwaggerRespHandler
@@ -23,7 +23,8 @@ class RestMetamodel2Swagger(RestMetamodel2Spec):
             enum_dict,
             operation_id,
             error_map,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         documentation = operation_info.documentation
         params = operation_info.params
         errors = operation_info.errors
@@ -31,7 +32,8 @@ class RestMetamodel2Swagger(RestMetamodel2Spec):
         http_method = http_method.lower()
         par_array, url = self.handle_request_mapping(url, http_method, service_name,
                                                      operation_id, params, type_dict,
-                                                     structure_dict, enum_dict, show_unreleased_apis, rest_swagg_ph)
+                                                     structure_dict, enum_dict, show_unreleased_apis, rest_swagg_ph,
+                                                     type_resolution_memo)
         response_map = rest_swagg_rh.populate_response_map(
             output,
             errors,
@@ -41,7 +43,8 @@ class RestMetamodel2Swagger(RestMetamodel2Spec):
             enum_dict,
             service_name,
             operation_id,
-            show_unreleased_apis)
+            show_unreleased_apis,
+            type_resolution_memo)
 
         path_obj = utils.build_path(
             service_name,
@@ -72,12 +75,3 @@ class RestMetamodel2Swagger(RestMetamodel2Spec):
         if path_obj['operationId'].endswith('$task'):
             path_obj['path'] = utils.add_query_param(
                 path_obj['path'], 'vmw-task=true')
-
-    def decorate_path_with_security(self, path_obj, scheme_set):
-        security_schemes = []
-        if authentication_metadata_processing.session_id_scheme in scheme_set:
-            security_schemes.append({"session_id": []})
-        if authentication_metadata_processing.basic_auth_scheme in scheme_set:
-            security_schemes.append({"basic_auth": []})
-        if security_schemes:
-            path_obj["security"] = security_schemes
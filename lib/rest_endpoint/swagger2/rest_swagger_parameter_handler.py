@@ -14,13 +14,14 @@ class RestSwaggerParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Converts metamodel fieldinfo to swagger parameter.
         """
         parameter_obj = {}
         ref_path = "#/definitions/"
-        tpHandler = RestTypeHandler(show_unreleased_apis)
+        tpHandler = RestTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             input_parameter_obj.type,
             parameter_obj,
@@ -56,7 +57,8 @@ class RestSwaggerParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Creates a  json object wrapper around request body parameters. parameter names are used as keys and the
         parameters as values.
@@ -75,7 +77,7 @@ class RestSwaggerParaHandler():
         body_obj['properties'] = properties_obj
         required = []
         ref_path = "#/definitions/"
-        tpHandler = RestTypeHandler(show_unreleased_apis)
+        tpHandler = RestTypeHandler(show_unreleased_apis, type_resolution_memo)
         for param in body_param_list:
             parameter_obj = {}
             tpHandler.visit_type_category(
@@ -112,7 +114,8 @@ class RestSwaggerParaHandler():
             type_dict,
             structure_svc,
             enum_svc,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
         """
         Flattens query parameters specs.
         1. Create a query parameter for every field in spec.
@@ -149,7 +152,7 @@ class RestSwaggerParaHandler():
         prop_array = []
         parameter_obj = {}
         ref_path = "#/definitions/"
-        tpHandler = RestTypeHandler(show_unreleased_apis)
+        tpHandler = RestTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             query_param_info.type,
             parameter_obj,
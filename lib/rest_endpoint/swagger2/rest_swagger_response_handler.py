@@ -18,13 +18,14 @@ class RestSwaggerRespHandler():
             enum_svc,
             service_id,
             operation_id,
-            show_unreleased_apis):
+            show_unreleased_apis,
+            type_resolution_memo=None):
 
         response_map = {}
         ref_path = "#/definitions/"
         success_response = {'description': output.documentation}
         schema = {}
-        tpHandler = RestTypeHandler(show_unreleased_apis)
+        tpHandler = RestTypeHandler(show_unreleased_apis, type_resolution_memo)
         tpHandler.visit_type_category(
             output.type,
             schema,
@@ -0,0 +1,134 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import json
+import os
+
+import six
+
+from lib import utils
+
+# Written next to the package files, which refer to it with external $refs
+SHARED_COMPONENTS_FILE = 'components.json'
+
+
+def get_schema_digest(schema):
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class SharedComponentsExtractor:
+    """
+    Moves the schemas which several documents define identically, e.g. the
+    vAPI standard errors, into one shared document and points the references
+    of the documents to it. A schema is only shared together with the schemas
+    it refers to, so that the references inside the shared document resolve
+    there.
+    """
+
+    def __init__(self, spec, compact=False, schema_json_level=1):
+        self.spec = spec
+        self.compact = compact
+        self.schema_json_level = schema_json_level
+        self.shared_type_dict = {}
+        # Bytes the moved schemas took in the documents
+        self.moved_bytes = 0
+        self.moved_count = 0
+
+    def extract(self, document_dict):
+        """
+        Moves the shared schemas out of the type dictionaries.
+        :param document_dict: maps the name of every document to its type dictionary and ReferenceIndex
+        """
+        shared_schema_dict = self.__find_shared_schemas(document_dict)
+        for output_name in sorted(shared_schema_dict):
+            type_dict, reference_index = document_dict[output_name]
+            names = sorted(shared_schema_dict[output_name])
+            for name in names:
+                schema = type_dict.pop(name)
+                self.shared_type_dict.setdefault(name, schema)
+                self.moved_bytes += utils.get_json_entry_size(name, schema, self.compact, self.schema_json_level)
+                self.moved_count += 1
+                # The references of the moved schema stay valid inside the shared document
+                reference_index.remove(reference_index.get_model_reference(name))
+            for name in names:
+                reference = reference_index.get_model_reference(name)
+                reference_index.rename(reference, SHARED_COMPONENTS_FILE + reference)
+
+    def __find_shared_schemas(self, document_dict):
+        # The documents defining every schema, grouped by digest
+        digest_dict = {}
+        for output_name in sorted(document_dict):
+            type_dict = document_dict[output_name][0]
+            for name, schema in six.iteritems(type_dict):
+                if name == 'requestBodies':
+                    continue
+                digest_dict.setdefault(name, {}).setdefault(get_schema_digest(schema), []).append(output_name)
+
+        # A schema defined differently by some documents is shared by the largest group
+        shared_document_dict = {}
+        for name, document_names_dict in six.iteritems(digest_dict):
+            digest = min(document_names_dict, key=lambda digest: (-len(document_names_dict[digest]), digest))
+            if len(document_names_dict[digest]) > 1:
+                shared_document_dict[name] = set(document_names_dict[digest])
+
+        # A schema whose references are not shared stays in its document, and
+        # so do the shared schemas referring to it
+        candidates = [(output_name, name) for name, output_names in six.iteritems(shared_document_dict)
+                      for output_name in output_names]
+        while candidates:
+            output_name, name = candidates.pop()
+            output_names = shared_document_dict.get(name)
+            if output_names is None or output_name not in output_names:
+                continue
+            reference_index = document_dict[output_name][1]
+            reference = reference_index.get_model_reference(name)
+            if len(output_names) > 1 and all(
+                    self.__is_shared(shared_document_dict, output_name, reference_index, referenced)
+                    for referenced in reference_index.get_references(reference)):
+                continue
+            output_names.discard(output_name)
+            for referrer in reference_index.get_referrers(reference):
+                referrer_name = reference_index.get_model_name(referrer)
+                if referrer_name is not None and not referrer_name[1]:
+                    candidates.append((output_name, referrer_name[0]))
+            if len(output_names) == 1:
+                candidates.append((next(iter(output_names)), name))
+            elif not output_names:
+                del shared_document_dict[name]
+
+        document_shared_schema_dict = {}
+        for name, output_names in six.iteritems(shared_document_dict):
+            for output_name in output_names:
+                document_shared_schema_dict.setdefault(output_name, set()).add(name)
+        return document_shared_schema_dict
+
+    def __is_shared(self, shared_document_dict, output_name, reference_index, reference):
+        model_name = reference_index.get_model_name(reference)
+        if model_name is None or model_name[1]:
+            return False
+        return output_name in shared_document_dict.get(model_name[0], ())
+
+    def get_spec_template(self):
+        info = {
+            'description': 'Schemas shared by the specification files',
+            'title': 'components',
+            'version': '2.0.0'}
+        if self.spec == '2':
+            return {
+                'swagger': '2.0',
+                'info': info,
+                'paths': {},
+                'definitions': utils.SortedJsonSection(self.shared_type_dict)}
+        return {
+            'openapi': '3.0.0',
+            'info': info,
+            'paths': {},
+            'components': {'schemas': utils.SortedJsonSection(self.shared_type_dict)}}
+
+    def write(self, output_dir):
+        if not os.path.exists(output_dir):
+            os.mkdir(output_dir)
+        file_name = os.path.join(output_dir, SHARED_COMPONENTS_FILE)
+        utils.write_json_data_to_file(file_name, self.get_spec_template(), self.compact)
+        return file_name
@@ -0,0 +1,162 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import timeit
+from concurrent import futures
+
+import six
+
+from lib.api_endpoint.api_metadata_processor import ApiMetadataProcessor
+from lib.rest_endpoint.rest_metadata_processor import RestMetadataProcessor
+from lib.type_handler_common import TypeResolutionMemo
+
+REST_PACKAGE = 'rest'
+API_PACKAGE = 'api'
+
+rest = RestMetadataProcessor()
+api = ApiMetadataProcessor()
+
+# Context of the worker processes, set once per process by init_worker
+worker_context = None
+
+
+class SpecGenerationContext:
+    """
+    Everything the metadata processors read while generating a package. Apart
+    from its thread-safe memo of the resolved types, the context is never
+    modified during generation, so it can be shared by threads or copied once
+    into every worker process.
+    """
+
+    def __init__(self,
+                 structure_dict,
+                 enum_dict,
+                 service_dict,
+                 service_url_dict,
+                 http_error_map,
+                 rest_navigation_handler,
+                 show_unreleased_apis,
+                 spec,
+                 auth_navigator=None,
+                 deprecation_handler=None,
+                 type_resolution_memo=None):
+        self.structure_dict = structure_dict
+        self.enum_dict = enum_dict
+        self.service_dict = service_dict
+        self.service_url_dict = service_url_dict
+        self.http_error_map = http_error_map
+        self.rest_navigation_handler = rest_navigation_handler
+        self.show_unreleased_apis = show_unreleased_apis
+        self.spec = spec
+        self.auth_navigator = auth_navigator
+        self.deprecation_handler = deprecation_handler
+        if type_resolution_memo is None:
+            type_resolution_memo = TypeResolutionMemo()
+        self.type_resolution_memo = type_resolution_memo
+
+    def generate_package(self, package_type, package, service_urls):
+        if package_type == REST_PACKAGE:
+            return rest.get_path_and_type_dicts(
+                package,
+                service_urls,
+                self.structure_dict,
+                self.enum_dict,
+                self.service_dict,
+                self.service_url_dict,
+                self.http_error_map,
+                self.rest_navigation_handler,
+                self.show_unreleased_apis,
+                self.spec,
+                self.auth_navigator,
+                self.deprecation_handler,
+                self.type_resolution_memo)
+        return api.get_path_and_type_dicts(
+            package,
+            service_urls,
+            self.structure_dict,
+            self.enum_dict,
+            self.service_dict,
+            self.service_url_dict,
+            self.http_error_map,
+            self.show_unreleased_apis,
+            self.spec,
+            self.auth_navigator,
+            self.type_resolution_memo)
+
+
+    def get_rest_navigation_service_urls(self, package_dict):
+        """
+        Returns the service urls the /rest packages in package_dict are generated from
+        which are looked up in rest navigation
+        """
+        service_urls = []
+        for package_service_urls in six.itervalues(package_dict):
+            service_urls += rest.get_rest_navigation_service_urls(
+                package_service_urls, self.service_dict, self.service_url_dict, self.show_unreleased_apis)
+        return service_urls
+
+
+def init_worker(context):
+    global worker_context
+    # The rest navigation handler of the copied context answers from the responses
+    # prefetched by the parent process, workers never contact the server
+    worker_context = context
+
+
+def generate_package_in_worker(package_type, package, service_urls):
+    return (package_type, package) + generate_timed_package(worker_context, package_type, package, service_urls)
+
+
+def generate_timed_package(context, package_type, package, service_urls):
+    start = timeit.default_timer()
+    package_spec = context.generate_package(package_type, package, service_urls)
+    return package_spec, timeit.default_timer() - start
+
+
+def generate_package_specs(context, package_dict, package_dict_api, process_workers=0, phase_recorder=None):
+    """
+    Generates the path and type dictionaries of every /rest package in package_dict
+    and every /api package in package_dict_api.
+    With process_workers, packages are generated by that many worker processes,
+    each holding its own copy of the context, and collected as they complete.
+    Their rest navigation requests are issued beforehand by this process, through
+    the session of the context, so they are recorded or replayed like any other.
+    Otherwise they are generated by a thread pool.
+    The time spent on every package is recorded as a phase of phase_recorder.
+    Returns the /rest and /api dictionaries, both keyed by package name.
+    """
+    packages = [(REST_PACKAGE, package, service_urls) for package, service_urls in six.iteritems(package_dict)]
+    packages += [(API_PACKAGE, package, service_urls) for package, service_urls in six.iteritems(package_dict_api)]
+
+    package_spec_dicts = {REST_PACKAGE: {}, API_PACKAGE: {}}
+    package_seconds_dict = {}
+    # Bytes fetched by the threads, e.g. rest navigation responses, count towards the open phases
+    thread_initializer = phase_recorder.get_thread_initializer() if phase_recorder is not None else None
+    if process_workers > 0:
+        context.rest_navigation_handler.prefetch(context.get_rest_navigation_service_urls(package_dict),
+                                                 thread_initializer=thread_initializer)
+        with futures.ProcessPoolExecutor(max_workers=process_workers,
+                                         initializer=init_worker,
+                                         initargs=(context,)) as executor:
+            future_list = [executor.submit(generate_package_in_worker, *package) for package in packages]
+            for future in futures.as_completed(future_list):
+                package_type, package, package_spec, seconds = future.result()
+                package_spec_dicts[package_type][package] = package_spec
+                package_seconds_dict[(package_type, package)] = seconds
+    else:
+        with futures.ThreadPoolExecutor(initializer=thread_initializer) as executor:
+            future_dict = {(package_type, package): executor.submit(
+                generate_timed_package, context, package_type, package, service_urls)
+                for package_type, package, service_urls in packages}
+            for (package_type, package), future in six.iteritems(future_dict):
+                package_spec_dicts[package_type][package], package_seconds_dict[(package_type, package)] = \
+                    future.result()
+
+    if phase_recorder is not None:
+        for (package_type, package), seconds in sorted(six.iteritems(package_seconds_dict)):
+            phase_recorder.record('package generation/' + package_type + '/' + package, seconds)
+
+    # Packages complete in any order, keep the order of the input dictionaries
+    rest_package_spec_dict = {package: package_spec_dicts[REST_PACKAGE][package] for package in package_dict}
+    api_package_spec_dict = {package: package_spec_dicts[API_PACKAGE][package] for package in package_dict_api}
+    return rest_package_spec_dict, api_package_spec_dict
@@ -0,0 +1,231 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+'''
+Serves the generated specification files over HTTP from memory. The files are
+regenerated in the background when the metamodel changes on the server, and
+the new set replaces the old one at once, so readers are never blocked and
+never see a mix of both.
+'''
+from __future__ import print_function
+
+import gzip
+import hashlib
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import six
+
+from lib import utils
+
+DEFAULT_REFRESH_INTERVAL = 300
+JSON_CONTENT_TYPE = 'application/json'
+
+
+def get_etag(body):
+    return '"' + hashlib.sha256(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    # If-None-Match compares the tags weakly, W/"x" matches "x"
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == '*' or tag == etag:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding):
+    for coding in accept_encoding.split(','):
+        parts = coding.split(';')
+        if parts[0].strip().lower() not in ('gzip', '*'):
+            continue
+        for parameter in parts[1:]:
+            name, _, value = parameter.partition('=')
+            if name.strip() == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+class SpecDocument:
+    """
+    A generated file, serialized as it would be written, and its gzip
+    compressed copy. Each has its own strong ETag, the sha256 of its bytes.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = get_etag(body)
+        # No time stamp in the header, the same document always compresses to the same bytes
+        self.gzip_body = gzip.compress(body, mtime=0)
+        self.gzip_etag = get_etag(self.gzip_body)
+
+    @staticmethod
+    def from_json(json_data, compact=False):
+        outfile = io.StringIO()
+        utils.write_json_data(outfile, json_data, compact)
+        return SpecDocument(outfile.getvalue().encode('utf-8'))
+
+
+class SpecSnapshot:
+    """
+    The documents of one generation, never changed once published
+    """
+
+    def __init__(self, document_dict, fingerprint):
+        # Maps the file names, e.g. vcenter.json and api.json, to their SpecDocument
+        self.document_dict = document_dict
+        # Fingerprint of the metamodel the documents were generated from
+        self.fingerprint = fingerprint
+        self.generated = time.time()
+
+
+class SpecServer:
+    """
+    Keeps a Generator, its metamodel and the documents generated from it in
+    memory and serves the documents. Every refresh_interval seconds the
+    generator is asked whether the metamodel changed, in which case the
+    documents are generated again while the previous ones are still served.
+    """
+
+    def __init__(self, generator, address=('127.0.0.1', 8000), refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.generator = generator
+        self.refresh_interval = refresh_interval
+        # Replaced as a whole, a request reads it once and serves from that snapshot
+        self.snapshot = None
+        self.stop_event = threading.Event()
+        self.refresh_thread = None
+        self.http_thread = None
+        self.http_server = ThreadingHTTPServer(address, SpecRequestHandler)
+        self.http_server.daemon_threads = True
+        self.http_server.spec_server = self
+
+    def get_address(self):
+        return self.http_server.server_address[:2]
+
+    def regenerate(self):
+        """
+        Generates all documents from the loaded metamodel and publishes them
+        """
+        metamodel = self.generator.get_metamodel()
+        result = self.generator.generate(metamodel=metamodel)
+        file_handler = self.generator.get_file_output_handler(result)
+        compact = self.generator.config.compact_output
+        document_dict = {file_name: SpecDocument.from_json(json_data, compact)
+                         for file_name, json_data in six.iteritems(file_handler.get_documents())}
+        self.snapshot = SpecSnapshot(document_dict, metamodel.fingerprint)
+        return self.snapshot
+
+    def refresh(self):
+        """
+        Regenerates the documents if the metamodel changed on the server
+        :return: whether the documents were regenerated
+        """
+        if not self.generator.refresh():
+            return False
+        self.regenerate()
+        return True
+
+    def __refresh_periodically(self):
+        while not self.stop_event.wait(self.refresh_interval):
+            try:
+                if self.refresh():
+                    print('Regenerated ' + str(len(self.snapshot.document_dict)) + ' documents for metamodel ' +
+                          self.snapshot.fingerprint)
+            except Exception as ex:
+                # The documents of the last successful generation are still served
+                utils.eprint('Regeneration failed')
+                utils.eprint(ex)
+
+    def get_document(self, file_name):
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        return snapshot.document_dict.get(file_name)
+
+    def __start_refreshing(self):
+        if self.snapshot is None:
+            self.regenerate()
+        self.refresh_thread = threading.Thread(target=self.__refresh_periodically, name='spec-refresh')
+        self.refresh_thread.daemon = True
+        self.refresh_thread.start()
+
+    def start(self):
+        """
+        Generates the documents, then serves them from a background thread
+        """
+        self.__start_refreshing()
+        self.http_thread = threading.Thread(target=self.http_server.serve_forever, name='spec-server')
+        self.http_thread.daemon = True
+        self.http_thread.start()
+
+    def serve_forever(self):
+        """
+        Generates the documents, then serves them until interrupted
+        """
+        self.__start_refreshing()
+        self.http_server.serve_forever()
+
+    def close(self):
+        self.stop_event.set()
+        if self.http_thread is not None:
+            self.http_server.shutdown()
+            self.http_thread.join()
+        self.http_server.server_close()
+        self.generator.close()
+
+
+class SpecRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET and HEAD requests for the documents, e.g. /vcenter.json or
+    /api.json. A request whose If-None-Match holds the ETag of the document
+    gets 304 Not Modified, and clients accepting gzip get the compressed copy.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.__send_document(True)
+
+    def do_HEAD(self):
+        self.__send_document(False)
+
+    def __send_document(self, send_body):
+        file_name = self.path.split('?', 1)[0].lstrip('/')
+        document = self.server.spec_server.get_document(file_name)
+        if document is None:
+            self.send_error(404)
+            return
+        body, etag, content_encoding = document.body, document.etag, None
+        if accepts_gzip(self.headers.get('Accept-Encoding', '')):
+            body, etag, content_encoding = document.gzip_body, document.gzip_etag, 'gzip'
+
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None and etag_matches(if_none_match, etag):
+            self.send_response(304)
+            self.__send_cache_headers(etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', JSON_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        if content_encoding is not None:
+            self.send_header('Content-Encoding', content_encoding)
+        self.__send_cache_headers(etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def __send_cache_headers(self, etag):
+        self.send_header('ETag', etag)
+        # Cached copies are revalidated, they change whenever the metamodel does
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
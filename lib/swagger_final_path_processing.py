@@ -3,7 +3,6 @@
 
 import os
 import re
-import collections
 from lib import utils
 from lib.path_processing import PathProcessing
 
@@ -19,12 +18,23 @@ class SwaggerPathProcessing(PathProcessing):
             output_dir,
             output_filename,
             gen_unique_op_id,
-            prefix=''):
-        description_map = utils.load_description()
+            prefix='',
+            compact=False):
+        swagger_template = self.get_spec_template(path_dict, type_dict, output_filename)
+
+        if not os.path.exists(output_dir):
+            os.mkdir(output_dir)
+
+        file_name = output_dir + os.path.sep + self.get_output_file_name(output_filename, prefix)
+        utils.write_json_data_to_file(file_name, swagger_template, compact)
+        return file_name
 
-        file_prefix = ''
-        if prefix != '':
-            file_prefix = prefix + "_"
+    def get_spec_template(self, path_dict, type_dict, output_filename):
+        """
+        Builds the swagger document of a package. Paths and definitions are not
+        copied, they are written in sorted order by utils.write_json_data_to_file.
+        """
+        description_map = utils.load_description()
 
         swagger_template = {
             'swagger': '2.0',
@@ -55,23 +65,9 @@ class SwaggerPathProcessing(PathProcessing):
             'schemes': [
                 'https',
                 'http'],
-            'paths': collections.OrderedDict(
-                sorted(
-                    path_dict.items())),
-            'definitions': collections.OrderedDict(
-                sorted(
-                    type_dict.items()))}
-
-        if not os.path.exists(output_dir):
-            os.mkdir(output_dir)
-
-        utils.write_json_data_to_file(
-            output_dir +
-            os.path.sep +
-            file_prefix +
-            utils.remove_curly_braces(output_filename) +
-            '.json',
-            swagger_template)
+            'paths': utils.SortedJsonSection(path_dict),
+            'definitions': utils.SortedJsonSection(type_dict)}
+        return swagger_template
 
     def remove_query_params(self, path_dict):
         """
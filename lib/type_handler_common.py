@@ -1,14 +1,56 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
+import copy
+import threading
+
 import six
 from lib import utils
 
 
+class TypeResolutionMemo:
+    """
+    Schemas of the structures and enumerations resolved so far, shared by the
+    type handlers of all packages generated from the same metamodel, so that a
+    type met by many packages is only walked once. The memo is owned by whoever
+    owns the metamodel and must not be used with other structure and enumeration
+    dictionaries.
+    """
+
+    def __init__(self):
+        # Maps (handler class, ref_path, show_unreleased_apis, resource_type, type_name) to
+        # the schema of the type, or None if it is not available, and the types it references
+        self.resolved_type_dict = {}
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.resolved_type_dict.get(key)
+
+    def put(self, key, schema, referenced_types):
+        # The schemas in a type_dict are modified by later processing steps,
+        # so the memo keeps its own copy
+        with self.lock:
+            self.resolved_type_dict[key] = (copy.deepcopy(schema), tuple(referenced_types))
+
+
 class TypeHandlerCommon():
 
-    def __init__(self, show_unreleased_apis):
+    def __init__(self, show_unreleased_apis, type_resolution_memo=None):
         self.show_unreleased_apis = show_unreleased_apis
+        # Without a memo every type is resolved again
+        self.type_resolution_memo = type_resolution_memo
+        # Types referenced by each type being resolved, innermost last
+        self.referenced_types_stack = []
 
     def visit_type_category(
             self,
@@ -213,29 +255,76 @@ class TypeHandlerCommon():
             structure_svc,
             enum_svc,
             ref_path):
-        if type_name in type_dict or utils.is_type_builtin(type_name):
+        self.resolve_type(resource_type, type_name, type_name, type_dict, structure_svc, enum_svc, ref_path)
+
+    def resolve_type(
+            self,
+            resource_type,
+            type_name,
+            type_dict_key,
+            type_dict,
+            structure_svc,
+            enum_svc,
+            ref_path):
+        """
+        Adds the schema of a structure or enumeration to type_dict under type_dict_key,
+        together with the schemas of all types it references.
+        """
+        if self.referenced_types_stack and self.referenced_types_stack[-1] is not None:
+            self.referenced_types_stack[-1].append((resource_type, type_name))
+        if type_dict_key in type_dict or utils.is_type_builtin(type_name):
             return
-        if resource_type == 'com.vmware.vapi.structure':
-            structure_info = self.get_structure_info(type_name, structure_svc)
-            if structure_info is not None:
-                # Mark it as visited to handle recursive definitions. (Type A
-                # referring to Type A in one of the fields).
-                type_dict[type_name] = {}
-                self.process_structure_info(
-                    type_name,
-                    structure_info,
+
+        memo = self.type_resolution_memo
+        memo_key = (type(self), ref_path, self.show_unreleased_apis, resource_type, type_name)
+        resolved_type = memo.get(memo_key) if memo is not None else None
+        if resolved_type is not None:
+            schema, referenced_types = resolved_type
+            if schema is None:
+                return
+            type_dict[type_dict_key] = copy.deepcopy(schema)
+            # The referenced types are resolved through the memo as well, unless
+            # this run did not resolve them yet
+            self.referenced_types_stack.append(None)
+            for referenced_resource_type, referenced_type_name in referenced_types:
+                self.check_type(
+                    referenced_resource_type,
+                    referenced_type_name,
                     type_dict,
                     structure_svc,
                     enum_svc,
                     ref_path)
-        else:
-            enum_info = self.get_enum_info(type_name, enum_svc)
-            if enum_info is not None:
-                # Mark it as visited to handle recursive definitions. (Type A
-                # referring to Type A in one of the fields).
-                type_dict[type_name] = {}
-                self.process_enum_info(
-                    type_name, enum_info, type_dict)
+            self.referenced_types_stack.pop()
+            return
+
+        referenced_types = []
+        self.referenced_types_stack.append(referenced_types)
+        try:
+            if resource_type == 'com.vmware.vapi.structure':
+                structure_info = self.get_structure_info(type_name, structure_svc)
+                if structure_info is not None:
+                    # Mark it as visited to handle recursive definitions. (Type A
+                    # referring to Type A in one of the fields).
+                    type_dict[type_dict_key] = {}
+                    self.process_structure_info(
+                        type_dict_key,
+                        structure_info,
+                        type_dict,
+                        structure_svc,
+                        enum_svc,
+                        ref_path)
+            else:
+                enum_info = self.get_enum_info(type_name, enum_svc)
+                if enum_info is not None:
+                    # Mark it as visited to handle recursive definitions. (Type A
+                    # referring to Type A in one of the fields).
+                    type_dict[type_dict_key] = {}
+                    self.process_enum_info(
+                        type_dict_key, enum_info, type_dict)
+        finally:
+            self.referenced_types_stack.pop()
+        if memo is not None:
+            memo.put(memo_key, type_dict.get(type_dict_key), referenced_types)
 
     def visit_user_defined(
             self,
@@ -1,42 +1,162 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
+import functools
 import requests
 import json
 import sys
 import six
 import re
+from requests.adapters import HTTPAdapter
 from six.moves import http_client
+from urllib3.util.retry import Retry
 
 TAG_SEPARATOR = '/'
 CAMELCASE_SEPARATOR_LIST = [".", "_"]
 
+# Defaults of the sessions created by create_http_session
+HTTP_POOL_SIZE = 10
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_TIMEOUT = 60
+# Transient server errors which are worth retrying
+HTTP_RETRY_STATUS_CODES = (502, 503, 504)
+
 
 def eprint(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
 
 
-def get_json(url, verify=True):
-    try:
-        req = requests.get(url, verify=verify)
-    except Exception as ex:
-        eprint('Cannot Load %s - %s' % (url, req.content))
-        eprint(ex)
-        return None
+def create_http_session(pool_size=HTTP_POOL_SIZE,
+                        retries=HTTP_RETRIES,
+                        backoff_factor=HTTP_BACKOFF_FACTOR):
+    """
+    Creates a requests session which keeps up to pool_size connections per host
+    alive and retries failed idempotent requests with exponential backoff.
+    """
+    retry = Retry(total=retries,
+                  backoff_factor=backoff_factor,
+                  status_forcelist=HTTP_RETRY_STATUS_CODES,
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def request_json(url, verify, session):
+    """
+    Loads the json document at url, unwrapping the value of vAPI responses.
+    Returns None if the server answered that the document does not exist (4xx).
+    Raises requests.RequestException if no answer could be obtained, i.e. on
+    connection errors, timeouts and server errors, which may be transient.
+    """
+    # A missing session is a programming error, not a failed request
+    if session is None:
+        raise ValueError('No http session to load ' + url + ' with')
+    req = session.get(url, verify=verify, timeout=HTTP_TIMEOUT)
+    if req.status_code >= 500:
+        req.raise_for_status()
     if not req.ok:
         eprint('Cannot Load %s - %s' % (url, req.content))
         return None
-    if 'value' in req.json():
-        return req.json()['value']
-    return req.json()
+    json_data = req.json()
+    if 'value' in json_data:
+        return json_data['value']
+    return json_data
+
+
+def get_json(url, verify, session):
+    try:
+        return request_json(url, verify, session)
+    except requests.RequestException as ex:
+        eprint('Cannot Load %s' % url)
+        eprint(ex)
+        return None
 
 
-def write_json_data_to_file(file_name, json_data):
+JSON_INDENT = 4
+COMPACT_JSON_SEPARATORS = (',', ':')
+
+
+class SortedJsonSection:
+    """
+    Marks a dictionary which write_json_data_to_file writes in sorted key order,
+    one entry at a time, instead of copying it into a sorted dictionary first.
+    """
+
+    def __init__(self, json_dict):
+        self.json_dict = json_dict
+
+
+def write_json_data_to_file(file_name, json_data, compact=False):
     """
     Utility method used to write json file.
+    The enclosing objects are written incrementally, so that only one entry of a
+    SortedJsonSection is serialized in memory at a time. Unless compact is set,
+    the output is the same as the one of json.dump with an indent of 4.
     """
     with open(file_name, 'w+') as outfile:
-        json.dump(json_data, outfile, indent=4)
+        write_json_data(outfile, json_data, compact)
+
+
+def write_json_data(outfile, json_data, compact=False, level=0):
+    if isinstance(json_data, SortedJsonSection):
+        items = ((key, json_data.json_dict[key]) for key in sorted(json_data.json_dict))
+        is_empty = len(json_data.json_dict) == 0
+    elif isinstance(json_data, dict):
+        items = six.iteritems(json_data)
+        is_empty = len(json_data) == 0
+    else:
+        outfile.write(dumps_json_value(json_data, compact, level))
+        return
+    if is_empty:
+        outfile.write('{}')
+        return
+
+    if compact:
+        item_separator, key_separator, newline = ',', ':', ''
+    else:
+        item_separator, key_separator, newline = ',', ': ', '\n'
+    outfile.write('{')
+    item_prefix = newline
+    for key, value in items:
+        outfile.write(item_prefix)
+        if not compact:
+            outfile.write(' ' * (JSON_INDENT * (level + 1)))
+        # Like json.dump, keys which are not strings, e.g. http status codes, are written as strings
+        if not isinstance(key, str):
+            key = json.dumps(key)
+        outfile.write(json.dumps(key) + key_separator)
+        write_json_data(outfile, value, compact, level + 1)
+        item_prefix = item_separator + newline
+    outfile.write(newline)
+    if not compact:
+        outfile.write(' ' * (JSON_INDENT * level))
+    outfile.write('}')
+
+
+def get_json_entry_size(key, value, compact=False, level=0):
+    """
+    Returns the number of bytes write_json_data writes for an entry, including
+    its separator, of an object nested at level.
+    """
+    if compact:
+        size = len(',:')
+    else:
+        size = JSON_INDENT * (level + 1) + len(',\n: ')
+    if not isinstance(key, str):
+        key = json.dumps(key)
+    return size + len(json.dumps(key)) + len(dumps_json_value(value, compact, level + 1).encode('utf-8'))
+
+
+def dumps_json_value(value, compact=False, level=0):
+    if compact:
+        return json.dumps(value, separators=COMPACT_JSON_SEPARATORS)
+    # Nested values continue at the indentation of the enclosing object. Line breaks
+    # only occur between json tokens, as the ones inside strings are escaped.
+    return json.dumps(value, indent=JSON_INDENT).replace('\n', '\n' + ' ' * (JSON_INDENT * level))
 
 
 def load_description():
@@ -54,9 +174,15 @@ def load_description():
     return desc
 
 
+@functools.lru_cache(maxsize=None)
+def get_delimiter_regex(delimiters):
+    return re.compile('|'.join(re.escape(delimiter) for delimiter in delimiters))
+
+
+# The same type names are camel cased for every reference to them
+@functools.lru_cache(maxsize=None)
 def get_str_camel_case(string, *delimiters):
-    delimiter_regex = '\\' + '|\\'.join(delimiters)
-    words = [word[:1].upper() + word[1:] for word in re.split(delimiter_regex, string)]
+    words = [word[:1].upper() + word[1:] for word in get_delimiter_regex(delimiters).split(string)]
     return ''.join(words)
 
 
@@ -354,3 +480,10 @@ class HttpErrorMap:
                     self.error_api_map[structure] = int(code)
             except KeyError:
                 print(structure + " :: is does not have an Error Code")
+
+    def __getstate__(self):
+        # The error maps are complete after __init__. The component service holds
+        # the server connection, which cannot be copied into worker processes.
+        state = self.__dict__.copy()
+        state['component_svc'] = None
+        return state
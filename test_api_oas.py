@@ -595,5 +595,19 @@ class TestApiMetamodel2Openapi(unittest.TestCase):
         self.api_meta2openapi.post_process_path(path_obj)
         self.assertEqual(path_obj, path_obj_expected)
 
+    def test_get_path(self):
+        # the content type the request mapping consumes is passed on to handle_request_mapping
+        method_info = mock.Mock()
+        method_info.elements = {'consumes': mock.Mock(string_value='FORM_URLENCODED')}
+        operation_info = mock.Mock()
+        operation_info.metadata = {'POST': method_info}
+        with mock.patch.object(ApiMetamodel2Openapi, 'handle_request_mapping', return_value=([], '/mock')) \
+                as handle_request_mapping_mock, \
+                mock.patch.object(ApiOpenapiRespHandler, 'populate_response_map', return_value={}):
+            path = self.api_meta2openapi.get_path(operation_info, 'POST', '/mock', 'com.vmware.package.mock',
+                                                  {}, {}, {}, 'create', None, False)
+        self.assertEqual('/mock', path['path'])
+        self.assertEqual('FORM_URLENCODED', handle_request_mapping_mock.call_args[0][5])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
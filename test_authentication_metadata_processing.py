@@ -5,6 +5,7 @@ import unittest
 
 from lib.authentication_metadata_processing import AuthenticationComponent, AuthenticationDictNavigator
 from lib.authentication_metadata_processing import AuthenticationComponentBuilder
+from lib import authentication_metadata_processing
 from unittest import mock
 
 class TestAuthenticationComponent(unittest.TestCase):
@@ -102,5 +103,71 @@ class TestAuthenticationComponent(unittest.TestCase):
         # 5. Non-existing package
         self.assertEqual(None, navigator.find_schemes_set("update", "com.vmware.sample", "cis"))
 
+        # 6. Nested service missing from the metadata, the enclosing service applies
+        self.assertEqual({"oauth", "token"}, navigator.find_schemes_set("get", "com.vmware.cis.session.item", "cis"))
+
+    def test_get_authentication_dict(self):
+        # Both components define the com.vmware.cis package, their services are merged
+        other_service_info_mock = mock.Mock()
+        other_service_info_mock.schemes = [self.session_id_auth_info_mock]
+        other_service_info_mock.operations = {}
+        other_package_info_mock = mock.Mock()
+        other_package_info_mock.services = {"com.vmware.cis.tasks": other_service_info_mock}
+        other_package_info_mock.schemes = []
+        component_data_dict = {"com.vmware.cis": self.package_info_mock, "com.vmware.other": other_package_info_mock}
+        auth_component_svc_mock = mock.Mock()
+        auth_component_svc_mock.list.return_value = sorted(component_data_dict.keys())
+
+        def get_component_data(component_id):
+            component_data_mock = mock.Mock()
+            component_data_mock.info.packages = {"com.vmware.cis": component_data_dict[component_id]}
+            return component_data_mock
+        auth_component_svc_mock.get.side_effect = get_component_data
+
+        auth_dict = authentication_metadata_processing.get_authentication_dict(auth_component_svc_mock, max_workers=4)
+        self.assertEqual(["com.vmware.cis"], list(auth_dict.keys()))
+        self.assertEqual(["com.vmware.cis.session", "com.vmware.cis.tasks"],
+                         sorted(auth_dict["com.vmware.cis"].get_subcomponents_dict().keys()))
+        self.assertEqual(2, auth_component_svc_mock.get.call_count)
+
+    def test_get_security_requirements(self):
+        package_component = AuthenticationComponent()
+        for service_name in ("com.vmware.cis.session", "com.vmware.cis.tasks"):
+            service_component = AuthenticationComponent()
+            service_component.add_schemes([authentication_metadata_processing.basic_auth_scheme,
+                                           authentication_metadata_processing.session_id_scheme])
+            package_component.add_subcomponent(service_component, service_name)
+        unsupported_service_component = AuthenticationComponent()
+        unsupported_service_component.add_schemes(["oauth"])
+        package_component.add_subcomponent(unsupported_service_component, "com.vmware.cis.oauth")
+        navigator = AuthenticationDictNavigator({"com.vmware.cis": package_component})
+
+        session_requirements = navigator.get_security_requirements("create", "com.vmware.cis.session", "cis")
+        tasks_requirements = navigator.get_security_requirements("list", "com.vmware.cis.tasks", "cis")
+        self.assertEqual([{"session_id": []}, {"basic_auth": []}], session_requirements)
+        self.assertEqual(session_requirements, tasks_requirements)
+        self.assertIsNot(session_requirements, tasks_requirements)
+        # both services have the same scheme set, it is resolved once
+        self.assertEqual(1, len(navigator.security_scheme_names_dict))
+        self.assertEqual(None, navigator.get_security_requirements("get", "com.vmware.cis.oauth", "cis"))
+        self.assertEqual(None, navigator.get_security_requirements("get", "com.vmware.sample", "cis"))
+
+    def test_authentication_dict_navigator_empty_schemes(self):
+        package_component = AuthenticationComponentBuilder.build_package_level_component(self.package_info_mock)
+        # a second service, whose list operation and the service itself have no schemes
+        service_component = AuthenticationComponent()
+        service_component.add_subcomponent(AuthenticationComponent(), "list")
+        package_component.add_subcomponent(service_component, "com.vmware.cis.tasks")
+        navigator = AuthenticationDictNavigator({"com.vmware.cis": package_component})
+
+        # an empty scheme set means no authentication, the package schemes do not apply
+        self.assertEqual(set(), navigator.find_schemes_set("list", "com.vmware.cis.tasks", "cis"))
+        self.assertEqual(set(), navigator.find_schemes_set("get", "com.vmware.cis.tasks", "cis"))
+        self.assertEqual(None, navigator.get_security_requirements("list", "com.vmware.cis.tasks", "cis"))
+        self.assertEqual({"session_id", "token"}, navigator.find_schemes_set("create", "com.vmware.cis.session", "cis"))
+        # every subtree is searched, not only the first one
+        self.assertIs(service_component.get_subcomponents_dict()["list"],
+                      package_component.recursive_search_for_component("list"))
+
 if __name__ == '__main__':
     unittest.main()
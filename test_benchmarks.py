@@ -0,0 +1,42 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks import run_benchmark
+from benchmarks.synthetic_metamodel import SyntheticMetamodelGenerator, SyntheticMetamodelOptions
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.metamodel_dir = os.path.join(self.work_dir, 'metamodel')
+        options = SyntheticMetamodelOptions(packages=2, services_per_package=4, structures_per_package=6)
+        self.metamodel_operations = SyntheticMetamodelGenerator(options).write(self.metamodel_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_run_generation(self):
+        self.assertEqual(40, self.metamodel_operations)
+        for spec in ('2', '3'):
+            output_dir = os.path.join(self.work_dir, 'output' + spec)
+            result = run_benchmark.run_isolated_generation(self.metamodel_dir, output_dir, spec)
+            self.assertEqual(2, result['packages'])
+            # every synthetic operation is exposed under /api or /rest
+            self.assertEqual(self.metamodel_operations, result['operations'])
+            self.assertGreater(result['peak_rss_kb'], 0)
+            with open(os.path.join(output_dir, 'bench0.json')) as package_file:
+                package_spec = json.load(package_file)
+            self.assertIn('/api/bench0/service0/{id}', package_spec['paths'])
+            self.assertIn('/rest/bench0/service1/{id}', package_spec['paths'])
+            self.assertIn('/rest/com/vmware/bench0/service2/id:{id}', package_spec['paths'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from lib import compressed_output
+from lib.file_output_handler import FileOutputHandler
+
+
+class TestCompressedOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_compress_files(self):
+        file_names = []
+        for name in ('vcenter', 'cis'):
+            file_name = os.path.join(self.output_dir, name + '.json')
+            with open(file_name, 'w') as json_file:
+                json.dump({'paths': {'/api/' + name + str(i): {} for i in range(1000)}}, json_file)
+            file_names.append(file_name)
+        artifact_dict = compressed_output.compress_files(file_names, ('gzip', 'xz'), 2)
+
+        with open(file_names[0], 'rb') as json_file:
+            content = json_file.read()
+        artifact = artifact_dict['vcenter.json']
+        self.assertEqual(len(content), artifact['size'])
+        self.assertEqual(hashlib.sha256(content).hexdigest(), artifact['sha256'])
+        for compression, open_file in (('gzip', gzip.open), ('xz', lzma.open)):
+            compressed_file_name = os.path.join(self.output_dir, artifact[compression]['file'])
+            with open_file(compressed_file_name) as compressed_file:
+                self.assertEqual(content, compressed_file.read())
+            with open(compressed_file_name, 'rb') as compressed_file:
+                compressed_content = compressed_file.read()
+            self.assertEqual(len(compressed_content), artifact[compression]['size'])
+            self.assertLess(artifact[compression]['size'], artifact['size'])
+            self.assertEqual(hashlib.sha256(compressed_content).hexdigest(), artifact[compression]['sha256'])
+        self.assertEqual(['cis.json', 'cis.json.gz', 'cis.json.xz', 'vcenter.json', 'vcenter.json.gz', 'vcenter.json.xz'],
+                         sorted(os.listdir(self.output_dir)))
+
+        # compressing the same file again gives the same bytes
+        self.assertEqual(artifact_dict, compressed_output.compress_files(file_names, ('gzip', 'xz')))
+
+    def test_compress_file_failure(self):
+        # the input file is missing
+        file_name = os.path.join(self.output_dir, 'vcenter.json')
+        self.assertRaises(IOError, compressed_output.compress_file, file_name, ('gzip', 'xz'))
+        self.assertEqual([], os.listdir(self.output_dir))
+
+        # a compressor fails while writing
+        with open(file_name, 'w') as json_file:
+            json.dump({'paths': {}}, json_file)
+        failing_compressor = mock.Mock()
+        failing_compressor.write.side_effect = IOError('No space left on device')
+        with mock.patch.object(compressed_output, 'open_compressor', return_value=failing_compressor):
+            self.assertRaises(IOError, compressed_output.compress_file, file_name, ('gzip', 'xz'))
+        self.assertEqual(['vcenter.json'], os.listdir(self.output_dir))
+
+        # closing one of the compressors fails, the other one is closed and both files are removed
+        failing_compressor = mock.Mock()
+        failing_compressor.close.side_effect = IOError('No space left on device')
+        compressor = mock.Mock()
+        with mock.patch.object(compressed_output, 'open_compressor', side_effect=[compressor, failing_compressor]):
+            self.assertRaises(IOError, compressed_output.compress_file, file_name, ('gzip', 'xz'))
+        compressor.close.assert_called_once_with()
+        self.assertEqual(['vcenter.json'], os.listdir(self.output_dir))
+
+    def test_api_json_artifacts(self):
+        path_dict = {'/api/vcenter/vm': {'get': {'operationId': 'list', 'responses': {}}}}
+        file_handler = FileOutputHandler({}, {'vcenter': (path_dict, {})}, self.output_dir, False, '3',
+                                         compressions=('gzip',))
+        file_handler.output_files()
+        with open(os.path.join(self.output_dir, 'api.json')) as api_json_file:
+            api_json = json.load(api_json_file)
+        self.assertEqual(['vcenter'], api_json['files'])
+        self.assertEqual(['vcenter.json'], list(api_json['artifacts'].keys()))
+        self.assertEqual('vcenter.json.gz', api_json['artifacts']['vcenter.json']['gzip']['file'])
+
+        # the files of the unchanged packages of an incremental run keep their entries
+        file_handler = FileOutputHandler({}, {'cis': (dict(path_dict), {})}, self.output_dir, False, '3',
+                                         unchanged_packages={'vcenter'}, compressions=('gzip',))
+        file_handler.output_files()
+        with open(os.path.join(self.output_dir, 'api.json')) as api_json_file:
+            self.assertEqual(['cis.json', 'vcenter.json'], sorted(json.load(api_json_file)['artifacts'].keys()))
+
+
+if __name__ == '__main__':
+    unittest.main()
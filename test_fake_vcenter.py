@@ -0,0 +1,133 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+from benchmarks import fake_vcenter
+from benchmarks.fake_vcenter import FakeVcenterServer
+from benchmarks.synthetic_metamodel import SyntheticMetamodelGenerator, SyntheticMetamodelOptions
+from lib import utils
+from lib.generator import Generator, GeneratorConfig
+from lib.rest_endpoint.rest_navigation_handler import RestNavigationHandler
+
+# Online generation talks to the fake server through the vAPI client
+try:
+    import vmware.vapi
+    VAPI_CLIENT_INSTALLED = True
+except ImportError:
+    VAPI_CLIENT_INSTALLED = False
+
+
+class TestFakeVcenter(unittest.TestCase):
+
+    def setUp(self):
+        self.metamodel_dir = tempfile.mkdtemp()
+        SyntheticMetamodelGenerator(SyntheticMetamodelOptions(packages=1, services_per_package=4)).write(
+            self.metamodel_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.metamodel_dir)
+
+    def invoke(self, server, operation_id, component_id=None):
+        response = requests.post(server.get_metadata_url(), json={
+            'jsonrpc': '2.0',
+            'method': 'invoke',
+            'id': '1',
+            'params': {
+                'serviceId': fake_vcenter.METAMODEL_COMPONENT_SERVICE,
+                'operationId': operation_id,
+                'ctx': {},
+                'input': {'STRUCTURE': {'operation-input': {'component_id': component_id}}}}})
+        self.assertEqual(200, response.status_code)
+        return response.json()['result']
+
+    def test_to_data_value(self):
+        data_value = fake_vcenter.to_data_value({'service': {
+            'name': 'service',
+            '_internal': 1,
+            'metadata': {'GET': {'elements': {}}},
+            'params': [{'name': 'id'}]}}, 'prefix.', 'services')
+        self.assertEqual([{'STRUCTURE': {'map-entry': {
+            'key': 'service',
+            'value': {'STRUCTURE': {'prefix.service_info': {
+                'name': 'service',
+                'metadata': [{'STRUCTURE': {'map-entry': {
+                    'key': 'GET',
+                    'value': {'STRUCTURE': {'prefix.element_map': {'elements': []}}}}}}],
+                'params': [{'STRUCTURE': {'prefix.field_info': {'name': 'id'}}}]}}}}}}], data_value)
+
+    def test_metamodel_component_service(self):
+        with FakeVcenterServer(self.metamodel_dir) as server:
+            self.assertEqual({'output': ['com.vmware.bench0', 'com.vmware.vapi']}, self.invoke(server, 'list'))
+            self.assertEqual({'output': '0-com.vmware.bench0'},
+                             self.invoke(server, 'fingerprint', 'com.vmware.bench0'))
+            component_data = self.invoke(server, 'get', 'com.vmware.bench0')['output']['STRUCTURE']
+            self.assertEqual(['info', 'fingerprint'],
+                             list(component_data['com.vmware.vapi.metadata.metamodel.component_data'].keys()))
+            self.assertEqual({'error': fake_vcenter.get_error_value('not_found')},
+                             self.invoke(server, 'get', 'com.vmware.missing'))
+
+    def test_rest_navigation(self):
+        with FakeVcenterServer(self.metamodel_dir) as server:
+            rest_navigation_handler = RestNavigationHandler(server.get_rest_navigation_url(),
+                                                            session=utils.create_http_session())
+            service_operations = rest_navigation_handler.get_service_operations(
+                server.get_rest_navigation_url() + '/com/vmware/bench0/service2')
+            # the recorded links point to the fake server
+            self.assertEqual(server.get_rest_navigation_url() + '/com/vmware/bench0/service2',
+                             service_operations[0]['links'][0]['href'])
+            self.assertEqual(None, rest_navigation_handler.get_service_operations('/com/vmware/bench0/service0'))
+
+    def test_rest_navigation_not_found(self):
+        with FakeVcenterServer(self.metamodel_dir) as server:
+            rest_navigation_handler = RestNavigationHandler(server.get_rest_navigation_url(),
+                                                            session=utils.create_http_session())
+            # a service the server answers 404 for is probed once
+            for _ in range(3):
+                self.assertEqual(None, rest_navigation_handler.get_service_operations('/com/vmware/bench0/service0'))
+            self.assertEqual(1, server.request_count)
+
+    def test_error_injection(self):
+        with FakeVcenterServer(self.metamodel_dir, latency=0.01, jitter=0.01, error_rate=1, seed=1) as server:
+            response = requests.get(server.get_rest_navigation_url() + '/com/vmware/bench0/service2?~method=OPTIONS')
+            self.assertEqual(503, response.status_code)
+            # the session retries, until it gives up
+            self.assertEqual(None, utils.get_json(
+                server.get_rest_navigation_url() + '/com/vmware/bench0/service2?~method=OPTIONS', True,
+                utils.create_http_session()))
+            self.assertGreater(server.injected_error_count, 2)
+            self.assertEqual(server.request_count, server.injected_error_count)
+
+    @unittest.skipUnless(VAPI_CLIENT_INSTALLED, 'the vAPI client is not installed')
+    def test_generate(self):
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        with FakeVcenterServer(self.metamodel_dir) as server:
+            file_handler = Generator(GeneratorConfig(metadata_url=server.get_metadata_url(),
+                                                     rest_navigation_url=server.get_rest_navigation_url(),
+                                                     output_dir=os.path.join(output_dir, 'online'),
+                                                     spec='2')).run()
+        self.assertEqual({'bench0'}, set(file_handler.output_file_dict))
+
+        # the server generates the same specifications as the metamodel directory it serves
+        Generator(GeneratorConfig(offline_metamodel_dir=self.metamodel_dir,
+                                  output_dir=os.path.join(output_dir, 'offline'),
+                                  spec='2')).run()
+        for file_name in file_handler.output_file_dict.values():
+            with open(file_name) as package_file:
+                package_spec = json.load(package_file)
+            with open(os.path.join(output_dir, 'offline', os.path.basename(file_name))) as package_file:
+                offline_package_spec = json.load(package_file)
+            self.assertTrue(package_spec['paths'])
+            self.assertEqual(offline_package_spec['paths'], package_spec['paths'])
+            self.assertEqual(offline_package_spec['definitions'], package_spec['definitions'])
+
+
+if __name__ == '__main__':
+    unittest.main()
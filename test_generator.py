@@ -0,0 +1,128 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent import futures
+from unittest import mock
+
+from benchmarks.synthetic_metamodel import SyntheticMetamodelGenerator, SyntheticMetamodelOptions
+from lib.generator import Generator, GeneratorConfig
+
+
+class TestGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.metamodel_dir = os.path.join(self.work_dir, 'metamodel')
+        self.output_dir = os.path.join(self.work_dir, 'output')
+        options = SyntheticMetamodelOptions(packages=2, services_per_package=4, structures_per_package=6)
+        SyntheticMetamodelGenerator(options).write(self.metamodel_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def get_generator(self, **options):
+        return Generator(GeneratorConfig(offline_metamodel_dir=self.metamodel_dir,
+                                         output_dir=self.output_dir,
+                                         **options))
+
+    def test_validate(self):
+        self.assertRaises(ValueError, GeneratorConfig().validate)
+        self.assertRaises(ValueError, GeneratorConfig(offline_metamodel_dir='metamodel', fetch_workers=0).validate)
+        self.assertRaises(ValueError, GeneratorConfig(offline_metamodel_dir='metamodel',
+                                                      compressions=('zip',)).validate)
+        self.assertRaises(ValueError, GeneratorConfig(offline_metamodel_dir='metamodel',
+                                                      shared_components=True, incremental=True).validate)
+        config = GeneratorConfig(metadata_url='https://vcip/api/', rest_navigation_url='https://vcip/rest/')
+        config.validate()
+        self.assertEqual(('https://vcip/api', 'https://vcip/rest', os.getcwd()),
+                         (config.metadata_url, config.rest_navigation_url, config.output_dir))
+
+    def test_generate(self):
+        generator = self.get_generator()
+        result = generator.generate()
+        self.assertEqual({'bench0', 'bench1'}, result.get_packages())
+        path_dict, type_dict = result.api_package_spec_dict['bench0']
+        self.assertIn('/api/bench0/service0/{id}', path_dict)
+        self.assertTrue(type_dict)
+        self.assertFalse(os.path.exists(self.output_dir))
+
+        # the metamodel is loaded once and shared by the generations
+        metamodel = generator.get_metamodel()
+        self.assertIs(metamodel, result.metamodel)
+        other_result = generator.generate(packages={'bench1'})
+        self.assertIs(metamodel, other_result.metamodel)
+        self.assertEqual({'bench1'}, other_result.get_packages())
+        # every generation returns its own dictionaries
+        self.assertIsNot(result.api_package_spec_dict['bench1'][0], other_result.api_package_spec_dict['bench1'][0])
+        self.assertEqual(result.api_package_spec_dict['bench1'][0], other_result.api_package_spec_dict['bench1'][0])
+
+    def test_refresh(self):
+        generator = self.get_generator()
+        metamodel = generator.get_metamodel()
+        self.assertFalse(generator.refresh())
+        self.assertIs(metamodel, generator.get_metamodel())
+
+        # a changed component gets a new fingerprint
+        component_file_name = os.path.join(self.metamodel_dir, 'com.vmware.bench0.json')
+        with open(component_file_name) as component_file:
+            component = json.load(component_file)
+        component['fingerprint'] += '-changed'
+        with open(component_file_name, 'w') as component_file:
+            json.dump(component, component_file)
+        self.assertNotEqual(metamodel.fingerprint, generator.get_source_fingerprint())
+        self.assertTrue(generator.refresh())
+        self.assertIsNot(metamodel, generator.get_metamodel())
+        self.assertEqual(generator.get_source_fingerprint(), generator.get_metamodel().fingerprint)
+
+        # concurrent refreshes load a changed metamodel once
+        component['fingerprint'] += '-again'
+        with open(component_file_name, 'w') as component_file:
+            json.dump(component, component_file)
+        with mock.patch.object(generator, 'load_metamodel', wraps=generator.load_metamodel) as load_metamodel_mock:
+            with futures.ThreadPoolExecutor(max_workers=4) as executor:
+                refreshed = list(executor.map(lambda _: generator.refresh(), range(4)))
+        self.assertEqual([False, False, False, True], sorted(refreshed))
+        self.assertEqual(1, load_metamodel_mock.call_count)
+
+    def test_run(self):
+        file_handler = self.get_generator(spec='2').run()
+        self.assertEqual({'bench0', 'bench1'}, set(file_handler.output_file_dict))
+        with open(os.path.join(self.output_dir, 'bench0.json')) as package_file:
+            package_spec = json.load(package_file)
+        self.assertEqual('2.0', package_spec['swagger'])
+        self.assertIn('/rest/bench0/service1/{id}', package_spec['paths'])
+
+        # the generators hold no shared state, the options of one do not leak into the other
+        output_dir = os.path.join(self.work_dir, 'output3')
+        Generator(GeneratorConfig(offline_metamodel_dir=self.metamodel_dir, output_dir=output_dir)).run()
+        with open(os.path.join(output_dir, 'bench0.json')) as package_file:
+            self.assertEqual('3.0.0', json.load(package_file)['openapi'])
+
+    def test_close(self):
+        # a failed run closes the generator and writes the phase timings as well
+        profile_report = os.path.join(self.work_dir, 'profile.json')
+        generator = self.get_generator(profile_report=profile_report)
+        with mock.patch.object(generator, 'generate', side_effect=IOError('No space left on device')):
+            self.assertRaises(IOError, generator.run)
+        self.assertEqual(None, generator.http_session)
+        self.assertTrue(os.path.exists(profile_report))
+
+        with self.get_generator() as generator:
+            generator.generate()
+            self.assertNotEqual(None, generator.http_session)
+            metadata_session = mock.Mock()
+            generator.metadata_session = metadata_session
+        self.assertEqual(None, generator.http_session)
+        metadata_session.close.assert_called_once_with()
+        # a closed generator cannot be used again
+        self.assertFalse(generator.connected)
+        self.assertRaises(ValueError, generator.generate)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+from benchmarks.fake_vcenter import FakeVcenterServer, METAMODEL_COMPONENT_SERVICE
+from benchmarks.synthetic_metamodel import SyntheticMetamodelGenerator, SyntheticMetamodelOptions
+from lib import http_archive
+from lib import utils
+
+
+def new_jsonrpc_request(request_id, operation_id, component_id=None, show_unreleased_apis=False):
+    app_ctx = {'opId': request_id}
+    if show_unreleased_apis:
+        app_ctx['$showUnreleasedAPIs'] = 'True'
+    return {
+        'jsonrpc': '2.0',
+        'method': 'invoke',
+        'id': request_id,
+        'params': {
+            'serviceId': METAMODEL_COMPONENT_SERVICE,
+            'operationId': operation_id,
+            'ctx': {'appCtx': app_ctx},
+            'input': {'STRUCTURE': {'operation-input': {'component_id': component_id}}}}}
+
+
+class TestHttpArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.metamodel_dir = os.path.join(self.work_dir, 'metamodel')
+        SyntheticMetamodelGenerator(SyntheticMetamodelOptions(packages=1, services_per_package=4)).write(
+            self.metamodel_dir)
+        self.archive_file = os.path.join(self.work_dir, 'capture.zip')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_get_request_key(self):
+        # JSON-RPC ids and operation ids differ between runs
+        self.assertEqual(
+            http_archive.get_request_key('POST', 'https://vcip/api', json.dumps(new_jsonrpc_request('1', 'list'))),
+            http_archive.get_request_key('POST', 'https://vcip/api', json.dumps(new_jsonrpc_request('2', 'list'))))
+        self.assertNotEqual(
+            http_archive.get_request_key('POST', 'https://vcip/api', json.dumps(new_jsonrpc_request('1', 'list'))),
+            http_archive.get_request_key('POST', 'https://vcip/api', json.dumps(new_jsonrpc_request('1', 'get'))))
+        # the rest of the context selects the response
+        self.assertNotEqual(
+            http_archive.get_request_key('POST', 'https://vcip/api', json.dumps(new_jsonrpc_request('1', 'list'))),
+            http_archive.get_request_key('POST', 'https://vcip/api',
+                                         json.dumps(new_jsonrpc_request('1', 'list', show_unreleased_apis=True))))
+        self.assertEqual('GET https://vcip/rest', http_archive.get_request_key('GET', 'https://vcip/rest', None))
+
+    def test_record_and_replay(self):
+        with FakeVcenterServer(self.metamodel_dir) as server:
+            rest_url = server.get_rest_navigation_url() + '/com/vmware/bench0/service2?~method=OPTIONS'
+            writer = http_archive.HttpArchiveWriter(
+                self.archive_file, server.get_metadata_url(), server.get_rest_navigation_url())
+            session = utils.create_http_session()
+            writer.mount(session)
+            recorded_rest_response = session.get(rest_url)
+            recorded_rpc_response = session.post(server.get_metadata_url(),
+                                                 json=new_jsonrpc_request('1', 'get', 'com.vmware.bench0'))
+            session.get(rest_url)
+            self.assertEqual(2, writer.close())
+            self.assertFalse(os.path.exists(self.archive_file + '.' + str(os.getpid()) + '.tmp'))
+
+        # the server is gone, every response comes from the archive
+        reader = http_archive.HttpArchiveReader(self.archive_file)
+        self.assertEqual(server.get_metadata_url(), reader.get_metadata_url())
+        session = utils.create_http_session()
+        reader.mount(session)
+        rest_response = session.get(rest_url)
+        self.assertEqual(200, rest_response.status_code)
+        self.assertEqual(recorded_rest_response.content, rest_response.content)
+        self.assertEqual(recorded_rest_response.json(), rest_response.json())
+        rpc_response = session.post(server.get_metadata_url(),
+                                    json=new_jsonrpc_request('2', 'get', 'com.vmware.bench0'))
+        # the response answers the replayed request
+        self.assertEqual('2', rpc_response.json()['id'])
+        self.assertEqual(recorded_rpc_response.json()['result'], rpc_response.json()['result'])
+        self.assertRaises(requests.ConnectionError, session.post, server.get_metadata_url(),
+                          json=new_jsonrpc_request('3', 'list'))
+        reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from lib import incremental_generation
+from lib.incremental_generation import GenerationManifest, ServiceFingerprints
+from lib.offline_metamodel import dict_to_metamodel_object
+from lib.rest_endpoint.rest_navigation_handler import RestNavigationHandler
+
+
+def new_user_defined_type(resource_id):
+    return {'category': 'USER_DEFINED',
+            'user_defined_type': {'resource_type': 'com.vmware.vapi.structure', 'resource_id': resource_id}}
+
+
+def new_structure(name, field_type):
+    return dict_to_metamodel_object({
+        'name': name,
+        'documentation': name,
+        'metadata': {},
+        'enumerations': {},
+        'fields': [{'name': 'field', 'documentation': '', 'metadata': {}, 'type': field_type}]})
+
+
+class TestIncrementalGeneration(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.service_dict = {
+            'com.vmware.package.mock': dict_to_metamodel_object({
+                'name': 'com.vmware.package.mock',
+                'documentation': 'mock service',
+                'metadata': {},
+                'operations': {
+                    'get': {
+                        'name': 'get',
+                        'params': [],
+                        'errors': [],
+                        'output': {'type': new_user_defined_type('com.vmware.package.mock.info')},
+                        'metadata': {}}}})}
+        # mock.info references mock.nested, which references mock.info again
+        self.structure_dict = {
+            'com.vmware.package.mock.info': new_structure(
+                'com.vmware.package.mock.info', new_user_defined_type('com.vmware.package.mock.nested')),
+            'com.vmware.package.mock.nested': new_structure(
+                'com.vmware.package.mock.nested', new_user_defined_type('com.vmware.package.mock.info')),
+            'com.vmware.package.other': new_structure(
+                'com.vmware.package.other', {'category': 'BUILTIN', 'builtin_type': 'STRING'})}
+        self.service_urls_map = {'/com/vmware/package/mock': ('com.vmware.package.mock', '/rest')}
+        self.package_dict = {'package': ['/com/vmware/package/mock']}
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def get_service_fingerprint(self):
+        return ServiceFingerprints(self.structure_dict, {}, self.service_dict).get_service_fingerprint(
+            'com.vmware.package.mock')
+
+    def get_package_fingerprints(self, rest_navigation_handler):
+        return incremental_generation.get_package_fingerprints(
+            self.package_dict,
+            {},
+            self.service_urls_map,
+            ServiceFingerprints(self.structure_dict, {}, self.service_dict),
+            rest_navigation_handler,
+            {},
+            None,
+            {'spec': '3'})
+
+    def test_service_fingerprints(self):
+        fingerprint = self.get_service_fingerprint()
+        self.assertEqual(fingerprint, self.get_service_fingerprint())
+
+        # case 1: changes of unreferenced structures do not matter
+        self.structure_dict['com.vmware.package.other'].documentation = 'changed'
+        self.assertEqual(fingerprint, self.get_service_fingerprint())
+
+        # case 2: changes of indirectly referenced structures do
+        self.structure_dict['com.vmware.package.mock.nested'].documentation = 'changed'
+        self.assertNotEqual(fingerprint, self.get_service_fingerprint())
+
+    def test_get_package_fingerprints(self):
+        service_operations = [{'service': 'com.vmware.package.mock', 'name': 'get', 'links': []}]
+        rest_navigation_handler = RestNavigationHandler(
+            'https://vcip/rest', {'/com/vmware/package/mock': service_operations})
+        fingerprint_dict = self.get_package_fingerprints(rest_navigation_handler)
+        self.assertEqual(['package'], list(fingerprint_dict.keys()))
+
+        # /rest packages follow the rest navigation responses
+        service_operations.append({'service': 'com.vmware.package.mock', 'name': 'list', 'links': []})
+        self.assertNotEqual(fingerprint_dict, self.get_package_fingerprints(rest_navigation_handler))
+
+    def test_generation_manifest(self):
+        fingerprint_dict = {'package': 'fingerprint-1', 'other': 'fingerprint-1'}
+        manifest = GenerationManifest(self.output_dir)
+        self.assertEqual(set(), manifest.get_unchanged_packages(fingerprint_dict))
+
+        package_file = os.path.join(self.output_dir, 'package.json')
+        with open(package_file, 'w') as json_file:
+            json_file.write('{}')
+        manifest.save(fingerprint_dict, {'package': package_file}, {'package': ['getPackage', 'listPackage']})
+
+        # case 1: unchanged packages, the one which was never written is generated again
+        manifest = GenerationManifest(self.output_dir)
+        self.assertEqual({'package'}, manifest.get_unchanged_packages(fingerprint_dict))
+        # their operation ids stay taken
+        self.assertEqual({'getPackage', 'listPackage'}, manifest.get_operation_ids({'package', 'other'}))
+
+        # case 2: changed package
+        self.assertEqual(set(), manifest.get_unchanged_packages({'package': 'fingerprint-2'}))
+
+        # case 3: deleted package file
+        os.remove(package_file)
+        self.assertEqual(set(), manifest.get_unchanged_packages(fingerprint_dict))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,108 +14,230 @@ from lib.type_handler_common import TypeHandlerCommon
 
 class TestInputs(unittest.TestCase):
 
-    def test_get_input_params(self):
+    def test_get_generator_config_options(self):
         # case 1.1: SSL is secure
-        test_args = ['vmsgen', '-vc', 'v_url']
-        ssl_verify_expected = True
-        with mock.patch('sys.argv', test_args):
-            _, _, _, ssl_verify_actual, _, _, _, _, _, _, _, _, = connection.get_input_params()
-        self.assertEqual(ssl_verify_expected, ssl_verify_actual)
+        config = connection.get_generator_config(['-vc', 'v_url'])
+        self.assertEqual(True, config.verify)
 
         # case 1.2: SSL is insecure
-        test_args = ['vmsgen', '-vc', 'v_url', '-k']
-        ssl_verify_expected = False
-        with mock.patch('sys.argv', test_args):
-            _, _, _, ssl_verify_actual, _, _, _, _, _, _, _, _, = connection.get_input_params()
-        self.assertEqual(ssl_verify_expected, ssl_verify_actual)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(False, config.verify)
 
         # case 2.1: tag separator option (default)
-        test_args = ['vmsgen', '-vc', 'v_url', '-k']
-        tag_separator_expected = '/'
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, _, _, _, tag_separator_actual, _, _, _, = connection.get_input_params()
-        self.assertEqual(tag_separator_expected, tag_separator_actual)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual('/', config.tag_separator)
 
         # case 2.2: tag separator option
-        expected = '_'
-        test_args = ['vmsgen', '-vc', 'v_url', '-s', expected]
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, _, _, _, tag_separator_actual, _, _, _, = connection.get_input_params()
-        self.assertEqual(expected, tag_separator_actual)
+        config = connection.get_generator_config(['-vc', 'v_url', '-s', '_'])
+        self.assertEqual('_', config.tag_separator)
 
         # case 3.1: operation id option is FALSE
-        test_args = ['vmsgen', '-vc', 'v_url', '-k']
-        generate_op_id_expected = False
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, _, _, generate_op_id_actual, _, _, _, _, = connection.get_input_params()
-        self.assertEqual(generate_op_id_expected, generate_op_id_actual)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(False, config.unique_operation_ids)
 
         # case 3.1: operation id option is TRUE
-        test_args = ['vmsgen', '-vc', 'v_url', '-k', '-uo']
-        generate_op_id_expected = True
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, _, _, generate_op_id_actual, _, _, _, _, = connection.get_input_params()
-        self.assertEqual(generate_op_id_expected, generate_op_id_actual)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-uo'])
+        self.assertEqual(True, config.unique_operation_ids)
 
         # case 4.1: generate metamodel option is FALSE
-        test_args = ['vmsgen', '-vc', 'v_url', '-k']
-        generate_metamodel_expected = False
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, generate_metamodel_actual, _, _, _, _, _, _, = connection.get_input_params()
-        self.assertEqual(generate_metamodel_expected, generate_metamodel_actual)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(False, config.generate_metamodel)
 
         # case 4.1: generate metamodel option is TRUE
-        test_args = ['vmsgen', '-vc', 'v_url', '-k', '-c']
-        generate_metamodel_expected = True
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, generate_metamodel_actual, _, _, _, _, _, _, = connection.get_input_params()
-        self.assertEqual(generate_metamodel_expected, generate_metamodel_actual)
-        
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-c'])
+        self.assertEqual(True, config.generate_metamodel)
+
         # case 5.1: swagger specification is default i.e openAPI 3.0
-        test_args = ['vmsgen', '-vc', 'v_url', '-k']
-        swagger_specification_expected = '3'
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, _, swagger_specification_actual, _, _, _, _, _, = connection.get_input_params()
-        self.assertEqual(swagger_specification_expected, swagger_specification_actual)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual('3', config.spec)
 
         # case 5.2: swagger specification is swagger 2.0
-        test_args = ['vmsgen', '-vc', 'v_url', '-k', '-oas' , '2']
-        swagger_specification_expected = '2'
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, _, swagger_specification_actual, _, _, _, _, _, = connection.get_input_params()
-        self.assertEqual(swagger_specification_expected, swagger_specification_actual)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-oas', '2'])
+        self.assertEqual('2', config.spec)
 
         # case 6.1: deprecated option is TRUE
-        test_args = ['vmsgen', '-vc', 'v_url', '-k', '--deprecate-slash-rest']
-        deprecated_expected = True
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, _, _, _, _, deprecated_actual, _, _, = connection.get_input_params()
-        self.assertEqual(deprecated_expected, deprecated_actual)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '--deprecate-slash-rest'])
+        self.assertEqual(True, config.deprecate_rest)
 
         # case 6.2: deprecated option is FALSE
-        test_args = ['vmsgen', '-vc', 'v_url', '-k']
-        deprecated_expected = False
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, _, _, _, _, deprecated_actual, _, _, = connection.get_input_params()
-        self.assertEqual(deprecated_expected, deprecated_actual)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(False, config.deprecate_rest)
 
         # case 7: fetch security
-        test_args = ['vmsgen', '-vc',  'v_url', '-k', '-fam']
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, _, _, _, _, _, fetch_security, _, = connection.get_input_params()
-        self.assertEqual(True, fetch_security)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-fam'])
+        self.assertEqual(True, config.fetch_auth_metadata)
 
         # case 8: auto rest services
-        test_args = ['vmsgen', '-vc',  'v_url', '-k', '-ars', 'com.vmware.vcenter.ovf.import_flag',
-                     'com.vmware.content.library.item.storage']
-        with mock.patch('sys.argv', test_args):
-            _, _, _, _, _, _, _, _, _, _, _, auto_rest_services = connection.get_input_params()
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-ars', 'com.vmware.vcenter.ovf.import_flag',
+                                                  'com.vmware.content.library.item.storage'])
         self.assertEqual(['com.vmware.vcenter.ovf.import_flag', 'com.vmware.content.library.item.storage'],
-                         auto_rest_services)
+                         config.auto_rest_services)
+
+        # case 9.1: metamodel snapshot cache is disabled by default
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(None, config.cache_dir)
+
+        # case 9.2: metamodel snapshot cache directory
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '--cache-dir', 'snapshots'])
+        self.assertEqual('snapshots', config.cache_dir)
+
+        # case 10.1: offline generation does not require vCenter urls
+        config = connection.get_generator_config(['-off', 'metamodel'])
+        self.assertEqual((None, None, 'metamodel'),
+                         (config.metadata_url, config.rest_navigation_url, config.offline_metamodel_dir))
+
+        # case 10.2: online generation still requires vCenter urls
+        self.assertRaises(ValueError, connection.get_generator_config, ['-k'])
+
+        # case 11.1: metadata fetch concurrency (default)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(8, config.fetch_workers)
+
+        # case 11.2: metadata fetch concurrency
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-fw', '2'])
+        self.assertEqual(2, config.fetch_workers)
+
+        # case 12.1: packages are generated by threads by default
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(0, config.process_workers)
+
+        # case 12.2: packages are generated by worker processes
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-pw', '4'])
+        self.assertEqual(4, config.process_workers)
+
+        # case 13.1: indented output (default)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(False, config.compact_output)
+
+        # case 13.2: compact output
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-co'])
+        self.assertEqual(True, config.compact_output)
+
+        # case 14.1: every package is generated (default)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(False, config.incremental)
+
+        # case 14.2: incremental generation
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-inc'])
+        self.assertEqual(True, config.incremental)
+
+        # case 15.1: no profiling (default)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual((None, None), (config.profile_report, config.cprofile_output))
+
+        # case 15.2: phase report and cProfile statistics
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-pr', 'phases.json', '-cp', 'vmsgen.pstats'])
+        self.assertEqual(('phases.json', 'vmsgen.pstats'), (config.profile_report, config.cprofile_output))
+
+        # case 16.1: recording the responses
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-rec', 'capture.zip'])
+        self.assertEqual(('capture.zip', None), (config.record_archive, config.replay_archive))
+
+        # case 16.2: replaying the responses does not require vCenter urls
+        config = connection.get_generator_config(['-rep', 'capture.zip'])
+        self.assertEqual((None, None, 'capture.zip'), (config.metadata_url, config.record_archive, config.replay_archive))
+
+        # case 16.3: recording and replaying at once
+        self.assertRaises(ValueError, connection.get_generator_config, ['-rec', 'capture.zip', '-rep', 'capture.zip'])
+
+        # case 17.1: every schema is kept (default)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(False, config.prune_unused_schemas)
+
+        # case 17.2: unused schemas are pruned
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-pus'])
+        self.assertEqual(True, config.prune_unused_schemas)
+
+        # case 18.1: every specification file defines all its schemas (default)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(False, config.shared_components)
+
+        # case 18.2: shared schemas are written to components.json
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-sc'])
+        self.assertEqual(True, config.shared_components)
+
+        # case 18.3: with incremental generation
+        self.assertRaises(ValueError, connection.get_generator_config, ['-vc', 'v_url', '-k', '-sc', '-inc'])
+
+        # case 19.1: no compressed copies (default)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual((), config.compressions)
+
+        # case 19.2: gzip unless other formats are given
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-z'])
+        self.assertEqual(('gzip',), config.compressions)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-z', 'gzip,xz'])
+        self.assertEqual(('gzip', 'xz'), config.compressions)
+
+        # case 19.3: unsupported format
+        self.assertRaises(ValueError, connection.get_generator_config, ['-vc', 'v_url', '-k', '-z', 'bzip2'])
+
+        # case 20.1: whole specification files only (default)
+        config = connection.get_generator_config(['-vc', 'v_url', '-k'])
+        self.assertEqual(False, config.shard_by_tag)
+
+        # case 20.2: fragments per tag
+        config = connection.get_generator_config(['-vc', 'v_url', '-k', '-sbt'])
+        self.assertEqual(True, config.shard_by_tag)
+
+    def test_get_generator_config(self):
+        # case 1: the arguments are read from sys.argv by default
+        with mock.patch('sys.argv', ['vmsgen', '-vc', 'v_url', '-k']):
+            config = connection.get_generator_config()
+        self.assertEqual(('https://v_url/api', False), (config.metadata_url, config.verify))
+        config = connection.get_generator_config(['-vc', 'v_url', '-oas', '2', '-z', 'gzip,xz'])
+        self.assertEqual(('https://v_url/api', 'https://v_url/rest', '2', ('gzip', 'xz')),
+                         (config.metadata_url, config.rest_navigation_url, config.spec, config.compressions))
+
+        # case 2: the configuration is validated
+        self.assertRaises(ValueError, connection.get_generator_config, ['-vc', 'v_url', '-fw', '0'])
+
+        # case 3.1: the files are written (default)
+        config = connection.get_generator_config(['-vc', 'v_url'])
+        self.assertEqual((None, 300), (config.serve, config.refresh_interval))
+
+        # case 3.2: the files are served
+        config = connection.get_generator_config(['-vc', 'v_url', '-srv', '-ri', '60'])
+        self.assertEqual((('127.0.0.1', 8000), 60), (config.get_serve_address(), config.refresh_interval))
+        config = connection.get_generator_config(['-vc', 'v_url', '--serve', '0.0.0.0:8080'])
+        self.assertEqual(('0.0.0.0', 8080), config.get_serve_address())
+
+        # case 3.3: the served files are not written, so they are neither compressed nor incremental
+        for serve_args in (['-srv', 'localhost'], ['-srv', '-z'], ['-srv', '-inc'], ['-srv', '-sbt'],
+                           ['-srv', '-ri', '0']):
+            self.assertRaises(ValueError, connection.get_generator_config, ['-vc', 'v_url'] + serve_args)
 
 
 class TestDictionaryProcessing(unittest.TestCase):
 
+    def test_populate_dicts(self):
+        # The same structure is defined by both components; the component listed last wins,
+        # no matter which fetch completes first
+        def new_component_data_mock(structure_info):
+            package_info_mock = mock.Mock()
+            package_info_mock.enumerations = {}
+            package_info_mock.services = {}
+            package_info_mock.structures = {'com.vmware.package.mock': structure_info}
+            component_data_mock = mock.Mock()
+            component_data_mock.info.packages = {'com.vmware.package': package_info_mock}
+            return component_data_mock
+
+        first_structure_info = mock.Mock()
+        first_structure_info.enumerations = {}
+        second_structure_info = mock.Mock()
+        second_structure_info.enumerations = {}
+        components = {'com.vmware.first': new_component_data_mock(first_structure_info),
+                      'com.vmware.second': new_component_data_mock(second_structure_info)}
+        component_svc_mock = mock.Mock()
+        component_svc_mock.list.return_value = ['com.vmware.first', 'com.vmware.second']
+        component_svc_mock.get.side_effect = lambda component: components[component]
+
+        for max_workers in (1, 2):
+            structure_dict = {}
+            dict_processing.populate_dicts(component_svc_mock, {}, structure_dict, {}, {},
+                                           'https://vcip/rest', False, max_workers)
+            self.assertIs(second_structure_info, structure_dict['com.vmware.package.mock'])
+
     def test_get_service_url_from_service_id(self):
         base_url = "https://vcip/rest"
         service_id = "com.vmware.vcenter.ovf.import_flag"
@@ -950,6 +1072,36 @@ class TestPathProcessing(unittest.TestCase):
         self.path_process.remove_com_vmware_from_dict(type_dict)
         self.assertEqual(type_dict, type_dict_expected)
 
+        '''
+        case 3 (camel cased type dict processing)
+            case 3.1 : model names and references are camel cased
+            case 3.2 : request bodies are renamed in the same pass, without camel casing
+        '''
+        type_dict = {
+            'ComVmwareMockCheck$list': {
+                'type': 'object',
+                'properties': {'items': {'$ref': '#/components/schemas/ComVmwareMockCheck$list'}}
+            },
+            'requestBodies': {
+                'com.vmware.mock_check$create': {  # 3.2
+                    'content': {'application/json': {'schema': {'$ref': '#/components/schemas/ComVmwareMockCheck$list'}}}
+                }
+            }
+        }
+        type_dict_expected = {
+            'MockCheckList': {  # 3.1
+                'type': 'object',
+                'properties': {'items': {'$ref': '#/components/schemas/MockCheckList'}}
+            },
+            'requestBodies': {
+                'mock_check_create': {
+                    'content': {'application/json': {'schema': {'$ref': '#/components/schemas/MockCheckList'}}}
+                }
+            }
+        }
+        self.path_process.remove_com_vmware_from_dict(type_dict, 0, True)
+        self.assertEqual(type_dict, type_dict_expected)
+
     def test_create_camelized_op_id(self):
         # Note: create_unique_op_ids(path_dict) test cases are handled in test cases provided for create_camelized_op_id
         # case 1: without query parameter: removes com/vmware/ and replaces '/' & '-' with '_' 
@@ -1002,6 +1154,23 @@ class TestPathProcessing(unittest.TestCase):
         }
         self.assertEqual(path_dict, path_dict_expected)
 
+        # operations named by a bare generic verb keep their original id
+        path_dict = {
+            'com/vmware/{id}':{
+                'get': {
+                    'operationId' : 'get'
+                }
+            },
+            'com/vmware/{name}':{
+                'get': {
+                    'operationId' : 'get'
+                }
+            }
+        }
+        self.path_process.create_unique_op_ids(path_dict)
+        self.assertEqual('get', path_dict['com/vmware/{id}']['get']['operationId'])
+        self.assertEqual('get', path_dict['com/vmware/{name}']['get']['operationId'])
+
     def test_merge_dictionaries(self):
         # generic test for updating a dictionary by adding keys from second dict
         dict_one = {
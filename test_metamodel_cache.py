@@ -0,0 +1,94 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from lib.dictionary_processing import objectTodict
+from lib.metamodel_cache import CachingComponentService, MetamodelSnapshotCache
+from lib.offline_metamodel import MetamodelObject
+
+
+class TestCachingComponentService(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.component_data = {'info': {'packages': {'com.vmware.vcenter': {'name': 'com.vmware.vcenter'}}}}
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def new_component_svc_mock(self, fingerprint):
+        component_svc_mock = mock.Mock()
+        component_svc_mock.list.return_value = ['com.vmware.vcenter']
+        component_svc_mock.fingerprint.return_value = fingerprint
+        component_svc_mock.get.return_value = self.component_data
+        return component_svc_mock
+
+    def test_get_without_snapshot_cache(self):
+        component_svc_mock = self.new_component_svc_mock('fp-1')
+        component_svc = CachingComponentService(component_svc_mock)
+
+        # repeated lookups of the same component are served from memory
+        self.assertEqual(self.component_data, component_svc.get('com.vmware.vcenter'))
+        self.assertEqual(self.component_data, component_svc.get('com.vmware.vcenter'))
+        self.assertEqual(1, component_svc_mock.get.call_count)
+        component_svc_mock.fingerprint.assert_not_called()
+
+    def test_get_with_snapshot_cache(self):
+        # case 1: the first run fetches the component and stores a snapshot
+        component_svc_mock = self.new_component_svc_mock('fp-1')
+        snapshot_cache = MetamodelSnapshotCache(self.cache_dir, 'https://vcip/api')
+        component_svc = CachingComponentService(component_svc_mock, snapshot_cache)
+        self.assertEqual(self.component_data, component_svc.get('com.vmware.vcenter'))
+        self.assertEqual((0, 1), (component_svc.cache_hits, component_svc.cache_misses))
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+        # case 2: a run with an unchanged fingerprint never calls get, the snapshot
+        # is loaded as plain data like an offline metamodel dump
+        component_svc_mock = self.new_component_svc_mock('fp-1')
+        component_svc = CachingComponentService(component_svc_mock, snapshot_cache)
+        component_data = component_svc.get('com.vmware.vcenter')
+        self.assertIsInstance(component_data, MetamodelObject)
+        self.assertEqual(self.component_data, objectTodict(component_data))
+        self.assertEqual((1, 0), (component_svc.cache_hits, component_svc.cache_misses))
+        component_svc_mock.get.assert_not_called()
+
+        # case 3: a changed fingerprint invalidates the snapshot
+        component_svc_mock = self.new_component_svc_mock('fp-2')
+        component_svc = CachingComponentService(component_svc_mock, snapshot_cache)
+        component_svc.get('com.vmware.vcenter')
+        self.assertEqual((0, 1), (component_svc.cache_hits, component_svc.cache_misses))
+
+        # case 4: snapshots are not shared between different metadata urls
+        component_svc_mock = self.new_component_svc_mock('fp-1')
+        snapshot_cache = MetamodelSnapshotCache(self.cache_dir, 'https://other-vcip/api')
+        component_svc = CachingComponentService(component_svc_mock, snapshot_cache)
+        component_svc.get('com.vmware.vcenter')
+        self.assertEqual((0, 1), (component_svc.cache_hits, component_svc.cache_misses))
+
+    def test_get_components_fingerprint(self):
+        fingerprint = CachingComponentService(self.new_component_svc_mock('fp-1')).get_components_fingerprint()
+        self.assertEqual(fingerprint,
+                         CachingComponentService(self.new_component_svc_mock('fp-1')).get_components_fingerprint())
+        self.assertNotEqual(fingerprint,
+                            CachingComponentService(self.new_component_svc_mock('fp-2')).get_components_fingerprint())
+
+        # the rest navigation responses follow the fingerprints of the components
+        snapshot_cache = MetamodelSnapshotCache(self.cache_dir, 'https://vcip/api')
+        self.assertNotEqual(snapshot_cache.get_rest_navigation_file_name('https://vcip/rest', fingerprint),
+                            snapshot_cache.get_rest_navigation_file_name('https://vcip/rest', 'other'))
+
+    def test_unreadable_snapshot(self):
+        snapshot_cache = MetamodelSnapshotCache(self.cache_dir, 'https://vcip/api')
+        key = snapshot_cache.get_key('metamodel', 'com.vmware.vcenter', 'fp-1')
+        with open(snapshot_cache.get_file_name(key), 'w') as snapshot_file:
+            snapshot_file.write('not a snapshot')
+        self.assertEqual(None, snapshot_cache.load(key))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from lib import dictionary_processing as dict_processing
+from lib import offline_metamodel
+from lib import utils
+from lib.offline_metamodel import OfflineComponentService
+from lib.rest_endpoint.rest_navigation_handler import RestNavigationHandler
+
+
+class TestOfflineMetamodel(unittest.TestCase):
+
+    # Shape of a component dumped by objectTodict, including the private
+    # attributes of the vAPI structures
+    component_dump = {
+        'info': {
+            'name': 'com.vmware.package',
+            'documentation': 'mock component',
+            'metadata': {},
+            'packages': {
+                'com.vmware.package': {
+                    'name': 'com.vmware.package',
+                    'documentation': '',
+                    'metadata': {},
+                    'enumerations': {},
+                    'structures': {},
+                    'services': {
+                        'com.vmware.package.mock': {
+                            'name': 'com.vmware.package.mock',
+                            'documentation': 'mock service',
+                            'constants': {},
+                            'enumerations': {},
+                            'structures': {
+                                'com.vmware.package.mock.info': {
+                                    'name': 'com.vmware.package.mock.info',
+                                    'enumerations': {},
+                                    'fields': [{
+                                        'name': 'id',
+                                        'documentation': 'mock field',
+                                        'metadata': {},
+                                        'type': {
+                                            'category': 'BUILTIN',
+                                            'builtin_type': 'STRING',
+                                            'user_defined_type': None,
+                                            'generic_instantiation': None,
+                                            '_struct_value': None}}],
+                                    'metadata': {},
+                                    '_struct_value': None}},
+                            'metadata': {},
+                            'operations': {
+                                'get': {
+                                    'name': 'get',
+                                    'params': [],
+                                    'errors': [],
+                                    'metadata': {
+                                        'GET': {
+                                            'elements': {
+                                                'path': {
+                                                    'type': 'STRING',
+                                                    'string_value': '/package/mock',
+                                                    'list_value': None}}}}}}}}}}},
+        'fingerprint': 'mock-fingerprint',
+        '_struct_value': None}
+
+    def setUp(self):
+        self.metamodel_dir = tempfile.mkdtemp()
+        utils.write_json_data_to_file(os.path.join(self.metamodel_dir, 'com.vmware.package.json'),
+                                      self.component_dump)
+
+    def tearDown(self):
+        shutil.rmtree(self.metamodel_dir)
+
+    def test_offline_component_service(self):
+        RestNavigationHandler('https://vcip/rest').save(
+            os.path.join(self.metamodel_dir, offline_metamodel.REST_NAVIGATION_CAPTURE_FILE))
+        component_svc = OfflineComponentService(self.metamodel_dir)
+
+        # the rest navigation capture is not a component
+        self.assertEqual(['com.vmware.package'], component_svc.list())
+        self.assertEqual('mock-fingerprint', component_svc.fingerprint('com.vmware.package'))
+
+        component_data = component_svc.get('com.vmware.package')
+        service_info = component_data.info.packages['com.vmware.package'].services['com.vmware.package.mock']
+        self.assertEqual('mock service', service_info.documentation)
+        self.assertEqual('/package/mock',
+                         service_info.operations['get'].metadata['GET'].elements['path'].string_value)
+        field_info = service_info.structures['com.vmware.package.mock.info'].fields[0]
+        self.assertEqual('BUILTIN', field_info.type.category)
+        self.assertFalse(hasattr(field_info.type, '_struct_value'))
+
+        # a rehydrated component dumps to the same json, apart from the private attributes
+        self.assertEqual(
+            json.loads(json.dumps(component_data, default=lambda obj: obj.__dict__))['info'],
+            dict_processing.objectTodict(component_data)['info'])
+
+    def test_fingerprint(self):
+        component_svc = OfflineComponentService(self.metamodel_dir)
+        component_file_name = os.path.join(self.metamodel_dir, 'com.vmware.package.json')
+        self.assertEqual('mock-fingerprint', component_svc.fingerprint('com.vmware.package'))
+
+        # the file is not read again while it is unchanged
+        with mock.patch('json.load') as json_load_mock:
+            self.assertEqual('mock-fingerprint', component_svc.fingerprint('com.vmware.package'))
+        json_load_mock.assert_not_called()
+
+        # a rewritten file is read again
+        component_dump = dict(self.component_dump, fingerprint='changed-fingerprint')
+        utils.write_json_data_to_file(component_file_name, component_dump)
+        file_stat = os.stat(component_file_name)
+        os.utime(component_file_name, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1000000000))
+        self.assertEqual('changed-fingerprint', component_svc.fingerprint('com.vmware.package'))
+
+    def test_fingerprint_file(self):
+        offline_metamodel.write_component_dump(self.metamodel_dir, 'com.vmware.package', self.component_dump)
+        component_svc = OfflineComponentService(self.metamodel_dir)
+        # the fingerprint file is not a component
+        self.assertEqual(['com.vmware.package'], component_svc.list())
+
+        # only the fingerprint file is read, not the dump
+        with mock.patch('json.load', wraps=json.load) as json_load_mock:
+            self.assertEqual('mock-fingerprint', component_svc.fingerprint('com.vmware.package'))
+        self.assertEqual(1, json_load_mock.call_count)
+        self.assertTrue(json_load_mock.call_args[0][0].name.endswith(offline_metamodel.FINGERPRINT_FILE_SUFFIX))
+
+        # the fingerprint file of an earlier version of the dump is ignored
+        component_file_name = os.path.join(self.metamodel_dir, 'com.vmware.package.json')
+        utils.write_json_data_to_file(component_file_name, dict(self.component_dump, fingerprint='changed-fingerprint'))
+        file_stat = os.stat(component_file_name)
+        os.utime(component_file_name, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1000000000))
+        self.assertEqual('changed-fingerprint', OfflineComponentService(self.metamodel_dir).fingerprint(
+            'com.vmware.package'))
+
+    def test_populate_dicts(self):
+        enumeration_dict = {}
+        structure_dict = {}
+        service_dict = {}
+        service_urls_map = {}
+        dict_processing.populate_dicts(OfflineComponentService(self.metamodel_dir),
+                                       enumeration_dict,
+                                       structure_dict,
+                                       service_dict,
+                                       service_urls_map,
+                                       'https://vcip/rest',
+                                       False)
+        self.assertEqual(['com.vmware.package.mock'], list(service_dict.keys()))
+        self.assertEqual(['com.vmware.package.mock.info'], list(structure_dict.keys()))
+        self.assertEqual({'https://vcip/rest/com/vmware/package/mock': 'com.vmware.package.mock'}, service_urls_map)
+
+    def test_rest_navigation_capture(self):
+        capture_file = os.path.join(self.metamodel_dir, offline_metamodel.REST_NAVIGATION_CAPTURE_FILE)
+        service_operations = [{'service': 'com.vmware.package.mock', 'name': 'get', 'links': []}]
+        rest_navigation_handler = RestNavigationHandler('https://vcip/rest')
+        rest_navigation_handler.service_operations_dict['/com/vmware/package/mock'] = service_operations
+        rest_navigation_handler.save(capture_file)
+
+        offline_handler = offline_metamodel.load_rest_navigation_handler(self.metamodel_dir)
+        self.assertEqual('https://vcip/rest', offline_handler.get_rest_navigation_url())
+        # absolute and relative service urls resolve to the same capture entry
+        self.assertEqual(service_operations,
+                         offline_handler.get_service_operations('https://vcip/rest/com/vmware/package/mock'))
+        self.assertEqual(service_operations, offline_handler.get_service_operations('/com/vmware/package/mock'))
+        # services which were never captured are not in rest navigation
+        self.assertEqual(None, offline_handler.get_service_operations('/com/vmware/package/other'))
+
+    def test_load_rest_navigation_handler_without_capture(self):
+        self.assertRaises(ValueError, offline_metamodel.load_rest_navigation_handler, self.metamodel_dir)
+        offline_handler = offline_metamodel.load_rest_navigation_handler(self.metamodel_dir, 'https://vcip/rest')
+        self.assertEqual(None, offline_handler.get_service_operations('/com/vmware/package/mock'))
+
+
+if __name__ == '__main__':
+    unittest.main()
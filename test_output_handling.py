@@ -1,9 +1,124 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
+import copy
+import json
+import os
+import shutil
+import tempfile
 import unittest
 
-from lib.file_output_handler import SpecificationDictsMerger
+from lib.file_output_handler import FileOutputHandler, SpecificationDictsMerger
+from lib.reference_index import ReferenceIndex
+
+
+class TestFileOutputHandler(unittest.TestCase):
+
+    def test_unique_operation_ids(self):
+        rest_package_spec_dict = {
+            'vm': ({'/rest/vcenter/vm/{vm}': {'get': {'operationId': 'get'}}}, {}),
+            'host': ({'/rest/vcenter/vm': {'get': {'operationId': 'get'}}}, {})}
+        api_package_spec_dict = {
+            'vm': ({'/api/vcenter/vm/{vm}': {'get': {'operationId': 'get'}},
+                    '/api/vcenter/vm': {'get': {'operationId': 'get'}}}, {})}
+        file_handler = FileOutputHandler(rest_package_spec_dict, api_package_spec_dict, 'output', True, '3',
+                                         reserved_operation_ids={'getApiVcenterVm2'})
+        # packages, paths and methods are visited in sorted order, ids collide across packages
+        self.assertEqual('getRestVcenterVm', rest_package_spec_dict['host'][0]['/rest/vcenter/vm']['get']['operationId'])
+        self.assertEqual('getRestVcenterVm2',
+                         rest_package_spec_dict['vm'][0]['/rest/vcenter/vm/{vm}']['get']['operationId'])
+        self.assertEqual('getApiVcenterVm', api_package_spec_dict['vm'][0]['/api/vcenter/vm']['get']['operationId'])
+        # the reserved id is skipped
+        self.assertEqual('getApiVcenterVm3', api_package_spec_dict['vm'][0]['/api/vcenter/vm/{vm}']['get']['operationId'])
+        self.assertEqual([{'package': 'vm', 'path': '/rest/vcenter/vm/{vm}', 'method': 'get',
+                           'operationId': 'getRestVcenterVm', 'renamedTo': 'getRestVcenterVm2'},
+                          {'package': 'vm', 'path': '/api/vcenter/vm/{vm}', 'method': 'get',
+                           'operationId': 'getApiVcenterVm', 'renamedTo': 'getApiVcenterVm3'}],
+                         file_handler.get_renamed_operation_ids())
+        self.assertEqual({'host': ['getRestVcenterVm'],
+                          'vm': ['getRestVcenterVm2', 'getApiVcenterVm', 'getApiVcenterVm3']},
+                         file_handler.get_package_operation_ids())
+
+    def test_generic_operation_ids(self):
+        rest_package_spec_dict = {
+            'vm': ({'/{vm}': {'get': {'operationId': 'get'}},
+                    '/vm': {'get': {'operationId': 'get'}}}, {})}
+        file_handler = FileOutputHandler(rest_package_spec_dict, {}, 'output', True, '3')
+        # the operation named by a bare generic verb keeps its original id, which is never handed out
+        self.assertEqual('get', rest_package_spec_dict['vm'][0]['/{vm}']['get']['operationId'])
+        self.assertEqual('getVm', rest_package_spec_dict['vm'][0]['/vm']['get']['operationId'])
+        self.assertEqual([], file_handler.get_renamed_operation_ids())
+
+    def test_prune_unused_schemas(self):
+        path_dict = {'/api/vcenter/vm': {'get': {
+            'operationId': 'list',
+            'responses': {200: {'content': {'application/json': {
+                'schema': {'$ref': '#/components/schemas/com.vmware.vcenter.VM_list'}}}}}}}}
+        type_dict = {
+            'com.vmware.vcenter.VM_list': {'type': 'array', 'items': {'$ref': '#/components/schemas/com.vmware.vcenter.VM_summary'}},
+            'com.vmware.vcenter.VM_summary': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+            'com.vmware.vcenter.VM_filter_spec': {'type': 'object', 'properties': {
+                'names': {'type': 'array', 'items': {'type': 'string'}}}}}
+        output_dir = tempfile.mkdtemp()
+        try:
+            for compact in (False, True):
+                file_sizes = []
+                for prune_unused_schemas in (False, True):
+                    file_handler = FileOutputHandler({'vcenter': (copy.deepcopy(path_dict), copy.deepcopy(type_dict))}, {},
+                                                     output_dir, False, '3', compact=compact,
+                                                     prune_unused_schemas=prune_unused_schemas)
+                    file_handler.output_files()
+                    file_sizes.append(os.path.getsize(file_handler.output_file_dict['vcenter']))
+                # the filter spec is not used by any operation
+                pruned_count, pruned_bytes = file_handler.pruned_schema_dict['vcenter']
+                self.assertEqual(1, pruned_count)
+                self.assertEqual(file_sizes[0] - file_sizes[1], pruned_bytes)
+        finally:
+            shutil.rmtree(output_dir)
+
+    def test_shard_by_tag(self):
+        path_dict = {
+            '/api/vcenter/vm': {
+                'get': {'tags': ['vm'], 'operationId': 'list', 'responses': {200: {'content': {'application/json': {
+                    'schema': {'$ref': '#/components/schemas/VcenterVMList'}}}}}},
+                'post': {'tags': ['vm'], 'operationId': 'create', 'responses': {},
+                         'requestBody': {'$ref': '#/components/requestBodies/VcenterVMCreate'}}},
+            '/api/vcenter/host': {
+                'get': {'tags': ['host'], 'operationId': 'list', 'responses': {}}}}
+        type_dict = {
+            'VcenterVMList': {'type': 'array', 'items': {'$ref': '#/components/schemas/VcenterVMSummary'}},
+            'VcenterVMSummary': {'type': 'object'},
+            'VcenterVMCreateSpec': {'type': 'object'},
+            'VcenterHostInfo': {'type': 'object'},
+            'requestBodies': {'VcenterVMCreate': {'content': {'application/json': {
+                'schema': {'$ref': '#/components/schemas/VcenterVMCreateSpec'}}}}}}
+        output_dir = tempfile.mkdtemp()
+        try:
+            file_handler = FileOutputHandler({}, {'vcenter': (path_dict, type_dict)}, output_dir, False, '3',
+                                             shard_by_tag=True)
+            file_handler.output_files()
+            self.assertEqual(['vcenter.tags.json', 'vcenter.host.json', 'vcenter.vm.json'],
+                             [os.path.basename(file_name) for file_name in file_handler.shard_file_dict['vcenter']])
+            with open(os.path.join(output_dir, 'vcenter.tags.json')) as index_file:
+                index = json.load(index_file)
+            self.assertEqual({'file': 'vcenter.vm.json', 'size': os.path.getsize(os.path.join(output_dir, 'vcenter.vm.json')),
+                              'paths': 1, 'operations': 2}, index['tags']['vm'])
+            with open(os.path.join(output_dir, 'vcenter.vm.json')) as shard_file:
+                shard = json.load(shard_file)
+            # the fragment holds the models its operations reach, transitively
+            self.assertEqual(['/api/vcenter/vm'], list(shard['paths'].keys()))
+            self.assertEqual(['VcenterVMCreateSpec', 'VcenterVMList', 'VcenterVMSummary'],
+                             sorted(shard['components']['schemas'].keys()))
+            self.assertEqual(['VcenterVMCreate'], list(shard['components']['requestBodies'].keys()))
+            with open(os.path.join(output_dir, 'vcenter.host.json')) as shard_file:
+                self.assertEqual({}, json.load(shard_file)['components']['schemas'])
+            # the whole file is written as well
+            with open(os.path.join(output_dir, 'vcenter.json')) as package_file:
+                self.assertEqual(4, len(json.load(package_file)['components']['schemas']))
+            with open(os.path.join(output_dir, 'api.json')) as api_json_file:
+                self.assertEqual({'vcenter': 'vcenter.tags.json'}, json.load(api_json_file)['shards'])
+        finally:
+            shutil.rmtree(output_dir)
 
 
 class TestSpecificationDictsMerger(unittest.TestCase):
@@ -200,6 +315,36 @@ class TestSpecificationDictsMerger(unittest.TestCase):
             .get("$ref")
         self.assertEqual(api_def_type, "#/definitions/com.vmware.vcenter.ovf.import_flag.list_resp")
 
+    def test_merge_request_bodies(self):
+        rest_type_dict = {'requestBodies': {'vcenter.vm_create': {}}, 'vcenter.vm': {}}
+        api_type_dict = {'requestBodies': {'VcenterVmCreate': {}}, 'VcenterVm': {}}
+        merger = SpecificationDictsMerger({'vcenter': ({}, rest_type_dict)},
+                                          {'vcenter': ({}, api_type_dict)})
+        merged_type_dict = merger.merge_api_rest_dicts()['vcenter'][1]
+        # the /rest request bodies are not replaced by the /api ones
+        self.assertEqual(['VcenterVmCreate', 'vcenter.vm_create'], sorted(merged_type_dict['requestBodies']))
+        self.assertEqual(['VcenterVm', 'requestBodies', 'vcenter.vm'], sorted(merged_type_dict))
+
+    def test_merge_reference_indexes(self):
+        rest_path_dict = {'/rest/vcenter/vm': {'post': {'requestBody': {'$ref': '#/components/requestBodies/vcenter.vm_create'}}}}
+        rest_type_dict = {'requestBodies': {'vcenter.vm_create': {}}}
+        api_path_dict = {'/api/vcenter/vm': {'post': {'requestBody': {'$ref': '#/components/requestBodies/VcenterVmCreate'}}}}
+        api_type_dict = {'requestBodies': {'VcenterVmCreate': {}}}
+        rest_reference_index = ReferenceIndex('3')
+        rest_reference_index.add_path_dict(rest_path_dict)
+        api_reference_index = ReferenceIndex('3')
+        api_reference_index.add_path_dict(api_path_dict)
+        merger = SpecificationDictsMerger({'vcenter': (rest_path_dict, rest_type_dict)},
+                                          {'vcenter': (api_path_dict, api_type_dict)},
+                                          {'vcenter': rest_reference_index},
+                                          {'vcenter': api_reference_index})
+        merger.merge_api_rest_dicts()
+        # the index of the merged document holds the references of both documents
+        self.assertTrue(merger.rest_reference_index_dict['vcenter'].is_referenced(
+            '#/components/requestBodies/VcenterVmCreate'))
+        self.assertTrue(merger.rest_reference_index_dict['vcenter'].is_referenced(
+            '#/components/requestBodies/vcenter.vm_create'))
+
 
 if __name__ == '__main__':
     unittest.main()
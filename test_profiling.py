@@ -0,0 +1,94 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent import futures
+from unittest import mock
+
+from lib import profiling
+from lib.profiling import PhaseRecorder
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_phase_recorder(self):
+        phase_recorder = PhaseRecorder()
+        response_mock = mock.Mock()
+        response_mock.content = b'{"value": []}'
+
+        with phase_recorder.phase('metamodel fetch'):
+            phase_recorder.response_hook(response_mock)
+            # bytes go to the innermost open phase
+            with phase_recorder.phase('rest navigation', 3):
+                phase_recorder.response_hook(response_mock)
+                phase_recorder.response_hook(response_mock)
+        with phase_recorder.phase('metamodel fetch'):
+            pass
+        # responses outside of any phase are not counted
+        phase_recorder.response_hook(response_mock)
+        phase_recorder.record('file write', 0.5, 2, 100)
+
+        report = phase_recorder.get_report()
+        self.assertEqual(['file write', 'metamodel fetch', 'rest navigation'], sorted(report['phases'].keys()))
+        self.assertEqual((2, 13), (report['phases']['metamodel fetch']['calls'],
+                                   report['phases']['metamodel fetch']['bytes']))
+        self.assertEqual((3, 26), (report['phases']['rest navigation']['calls'],
+                                   report['phases']['rest navigation']['bytes']))
+        self.assertEqual({'seconds': 0.5, 'calls': 2, 'bytes': 100}, report['phases']['file write'])
+        self.assertGreaterEqual(report['phases']['metamodel fetch']['seconds'],
+                                report['phases']['rest navigation']['seconds'])
+
+        report_file = os.path.join(self.output_dir, 'phases.json')
+        phase_recorder.write_report(report_file)
+        with open(report_file) as json_file:
+            self.assertEqual(report['phases'], json.load(json_file)['phases'])
+
+    def test_phase_recorder_threads(self):
+        phase_recorder = PhaseRecorder()
+        response_mock = mock.Mock()
+        response_mock.content = b'{"value": []}'
+
+        def fetch_authentication_metadata():
+            with phase_recorder.phase('authentication metadata fetch'):
+                phase_recorder.response_hook(response_mock)
+                # threads of a pool count towards the phases open where the pool was created
+                with futures.ThreadPoolExecutor(initializer=phase_recorder.get_thread_initializer()) as executor:
+                    executor.submit(phase_recorder.response_hook, response_mock).result()
+
+        # phases open concurrently in other threads do not change the phase of this one
+        with phase_recorder.phase('metamodel fetch'):
+            thread = threading.Thread(target=fetch_authentication_metadata)
+            thread.start()
+            thread.join()
+            phase_recorder.response_hook(response_mock)
+        # threads without open phases are not counted
+        with futures.ThreadPoolExecutor() as executor:
+            executor.submit(phase_recorder.response_hook, response_mock).result()
+
+        report = phase_recorder.get_report()
+        self.assertEqual(13, report['phases']['metamodel fetch']['bytes'])
+        self.assertEqual(26, report['phases']['authentication metadata fetch']['bytes'])
+        self.assertEqual([], phase_recorder.get_open_phases())
+
+    def test_profiler(self):
+        stats_file = os.path.join(self.output_dir, 'vmsgen.pstats')
+        profiler = profiling.start_profiler()
+        sorted(range(10))
+        profiling.stop_profiler(profiler, stats_file)
+        self.assertGreater(pstats.Stats(stats_file).total_calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import unittest
+
+from lib.reference_index import ReferenceIndex
+
+
+class TestReferenceIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.path_dict = {
+            '/api/vcenter/vm': {
+                'post': {
+                    'requestBody': {'$ref': '#/components/requestBodies/VcenterVmCreate'},
+                    'responses': {200: {'content': {'application/json': {
+                        'schema': {'$ref': '#/components/schemas/VcenterVmInfo'}}}}}}}}
+        self.type_dict = {
+            'VcenterVmInfo': {
+                'type': 'object',
+                'properties': {
+                    'disks': {'type': 'array', 'items': {'$ref': '#/components/schemas/VcenterVmDisk'}},
+                    'spec': {'$ref': '#/components/schemas/VcenterVmCreateSpec'}}},
+            'VcenterVmDisk': {'type': 'object'},
+            'VcenterVmCreateSpec': {'type': 'object'},
+            'VcenterVmUnused': {'type': 'object', 'properties': {
+                'disk': {'$ref': '#/components/schemas/VcenterVmDisk'}}},
+            'requestBodies': {
+                'VcenterVmCreate': {'content': {'application/json': {
+                    'schema': {'$ref': '#/components/schemas/VcenterVmCreateSpec'}}}}}}
+        self.reference_index = ReferenceIndex('3')
+        self.reference_index.add_path_dict(self.path_dict)
+        self.reference_index.add_type_dict(self.type_dict)
+
+    def test_queries(self):
+        reference_index = self.reference_index
+        self.assertEqual({'#/components/schemas/VcenterVmInfo', '#/components/schemas/VcenterVmUnused'},
+                         reference_index.get_referrers('#/components/schemas/VcenterVmDisk'))
+        self.assertEqual({'#/components/schemas/VcenterVmUnused'}, reference_index.get_unreferenced())
+        self.assertEqual({'#/components/requestBodies/VcenterVmCreate',
+                          '#/components/schemas/VcenterVmCreateSpec',
+                          '#/components/schemas/VcenterVmInfo',
+                          '#/components/schemas/VcenterVmDisk'}, reference_index.get_reachable())
+        self.assertEqual(('VcenterVmCreate', True),
+                         reference_index.get_model_name('#/components/requestBodies/VcenterVmCreate'))
+        self.assertEqual(None, reference_index.get_model_name('components.json#/components/schemas/Other'))
+
+    def test_rename(self):
+        reference_index = self.reference_index
+        reference_index.rename('#/components/schemas/VcenterVmDisk', '#/components/schemas/VcenterVmDiskInfo')
+        self.assertEqual('#/components/schemas/VcenterVmDiskInfo',
+                         self.type_dict['VcenterVmInfo']['properties']['disks']['items']['$ref'])
+        self.assertEqual('#/components/schemas/VcenterVmDiskInfo',
+                         self.type_dict['VcenterVmUnused']['properties']['disk']['$ref'])
+        self.assertFalse(reference_index.is_referenced('#/components/schemas/VcenterVmDisk'))
+
+        # a renamed model keeps its references
+        reference_index.rename('#/components/schemas/VcenterVmInfo', '#/components/schemas/VcenterVmDetails')
+        self.assertEqual('#/components/schemas/VcenterVmDetails',
+                         self.path_dict['/api/vcenter/vm']['post']['responses'][200]['content']
+                         ['application/json']['schema']['$ref'])
+        self.assertIn('#/components/schemas/VcenterVmDetails',
+                      reference_index.get_referrers('#/components/schemas/VcenterVmDiskInfo'))
+
+    def test_remove_and_merge(self):
+        reference_index = self.reference_index
+        reference_index.remove('#/components/schemas/VcenterVmUnused')
+        self.assertEqual({'#/components/schemas/VcenterVmInfo'},
+                         reference_index.get_referrers('#/components/schemas/VcenterVmDisk'))
+
+        other_reference_index = ReferenceIndex('3')
+        other_reference_index.add_path_dict({'/rest/vcenter/vm': {'get': {
+            'responses': {200: {'$ref': '#/components/schemas/vcenter.vm_list'}}}}})
+        reference_index.merge(other_reference_index)
+        self.assertEqual({'#/paths//rest/vcenter/vm'},
+                         reference_index.get_referrers('#/components/schemas/vcenter.vm_list'))
+        self.assertIn('#/components/schemas/vcenter.vm_list', reference_index.get_reachable())
+
+
+if __name__ == '__main__':
+    unittest.main()
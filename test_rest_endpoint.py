@@ -1,13 +1,20 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
+import json
+import os
+import shutil
+import tempfile
 import unittest
+import requests
 from unittest import mock 
 from lib.rest_endpoint.rest_type_handler import RestTypeHandler
 from lib.rest_endpoint.rest_metadata_processor import RestMetadataProcessor
 from lib.rest_endpoint.rest_metamodel2spec import RestMetamodel2Spec
+from lib.rest_endpoint.rest_navigation_handler import RestNavigationHandler
 from lib.rest_endpoint.swagger2.rest_swagger_parameter_handler import RestSwaggerParaHandler
 from lib.rest_endpoint.oas3.rest_openapi_parameter_handler import RestOpenapiParaHandler
+from lib.type_handler_common import TypeResolutionMemo
 
 class TestRestTypeHandler(unittest.TestCase):
     # Showing unreleased apis (disabled filtering)
@@ -178,6 +185,66 @@ class TestRestTypeHandler(unittest.TestCase):
         self.assertEqual(new_prop_expected, new_prop)
 
 
+class TestTypeResolutionMemo(unittest.TestCase):
+
+    def new_structure_info(self, name, field_type):
+        field_info_mock = mock.Mock()
+        field_info_mock.name = 'field'
+        field_info_mock.documentation = name + ' field'
+        field_info_mock.metadata = {}
+        field_info_mock.type = field_type
+        structure_info_mock = mock.Mock()
+        structure_info_mock.fields = [field_info_mock]
+        structure_info_mock.metadata = {}
+        return structure_info_mock
+
+    def test_check_type(self):
+        user_defined_type_mock = mock.Mock()
+        user_defined_type_mock.category = 'USER_DEFINED'
+        user_defined_type_mock.user_defined_type.resource_type = 'com.vmware.vapi.structure'
+        user_defined_type_mock.user_defined_type.resource_id = 'com.vmware.package.nested'
+        builtin_type_mock = mock.Mock()
+        builtin_type_mock.category = 'BUILTIN'
+        builtin_type_mock.builtin_type = 'STRING'
+        structure_dict = {
+            'com.vmware.package.mock': self.new_structure_info('mock', user_defined_type_mock),
+            'com.vmware.package.nested': self.new_structure_info('nested', builtin_type_mock)}
+        structure_svc = mock.Mock()
+        structure_svc.get.side_effect = structure_dict.get
+        enum_dict = {}
+        memo = TypeResolutionMemo()
+
+        # case 1: the first package resolves the type and the types it references
+        first_type_dict = {}
+        RestTypeHandler(True, memo).check_type('com.vmware.vapi.structure', 'com.vmware.package.mock',
+                                               first_type_dict, structure_svc, enum_dict, '#/definitions/')
+        self.assertEqual(['com.vmware.package.mock', 'com.vmware.package.nested'], sorted(first_type_dict.keys()))
+        self.assertEqual(2, structure_svc.get.call_count)
+
+        # case 2: other packages get the same schemas from the memo, even if the
+        # first package modified its copies
+        first_type_dict['com.vmware.package.nested']['description'] = 'modified'
+        second_type_dict = {}
+        RestTypeHandler(True, memo).check_type('com.vmware.vapi.structure', 'com.vmware.package.mock',
+                                               second_type_dict, structure_svc, enum_dict, '#/definitions/')
+        self.assertEqual(2, structure_svc.get.call_count)
+        del first_type_dict['com.vmware.package.nested']['description']
+        self.assertEqual(first_type_dict, second_type_dict)
+
+        # case 3: schemas for a different specification version are resolved again
+        RestTypeHandler(True, memo).check_type('com.vmware.vapi.structure', 'com.vmware.package.mock',
+                                               {}, structure_svc, enum_dict, '#/components/schemas/')
+        self.assertEqual(4, structure_svc.get.call_count)
+
+        # case 4: handlers without a memo, or with the memo of another metamodel, resolve the type again
+        RestTypeHandler(True).check_type('com.vmware.vapi.structure', 'com.vmware.package.mock',
+                                         {}, structure_svc, enum_dict, '#/definitions/')
+        self.assertEqual(6, structure_svc.get.call_count)
+        RestTypeHandler(True, TypeResolutionMemo()).check_type('com.vmware.vapi.structure', 'com.vmware.package.mock',
+                                                               {}, structure_svc, enum_dict, '#/definitions/')
+        self.assertEqual(8, structure_svc.get.call_count)
+
+
 class TestRestUrlProcessing(unittest.TestCase):
     
     rest_url_process = RestMetadataProcessor()
@@ -470,5 +537,84 @@ class TestRestMetamodel2Spec(unittest.TestCase):
         self.assertEqual(self.new_url_expected, new_url_actual)
 
 
+class TestRestNavigationHandler(unittest.TestCase):
+
+    service_operations = [{'service': 'com.vmware.package.mock', 'name': 'get', 'links': []}]
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    @mock.patch('lib.utils.request_json')
+    def test_get_service_operations(self, request_json_mock):
+        request_json_mock.return_value = self.service_operations
+        rest_navigation_handler = RestNavigationHandler('https://vcip/rest')
+
+        # every service is probed once, whether it is addressed by absolute or relative url
+        self.assertEqual(self.service_operations,
+                         rest_navigation_handler.get_service_operations('https://vcip/rest/com/vmware/package/mock'))
+        self.assertEqual(self.service_operations,
+                         rest_navigation_handler.get_service_operations('/com/vmware/package/mock'))
+        request_json_mock.assert_called_once_with('https://vcip/rest/com/vmware/package/mock?~method=OPTIONS', False, None)
+
+        # services the server does not know are remembered as well
+        request_json_mock.reset_mock()
+        request_json_mock.return_value = None
+        self.assertEqual(None, rest_navigation_handler.get_service_operations('/com/vmware/package/missing'))
+        self.assertEqual(None, rest_navigation_handler.get_service_operations('/com/vmware/package/missing'))
+        self.assertEqual(1, request_json_mock.call_count)
+
+        # requests without an answer are not remembered, the next caller issues the request again
+        request_json_mock.reset_mock()
+        request_json_mock.side_effect = requests.ConnectionError('connection refused')
+        self.assertEqual(None, rest_navigation_handler.get_service_operations('/com/vmware/package/other'))
+        request_json_mock.side_effect = None
+        request_json_mock.return_value = self.service_operations
+        self.assertEqual(self.service_operations,
+                         rest_navigation_handler.get_service_operations('/com/vmware/package/other'))
+        self.assertEqual(2, request_json_mock.call_count)
+
+    def test_get_service_operations_without_session(self):
+        # an online handler needs a session, the missing one is not reported as a failed request
+        rest_navigation_handler = RestNavigationHandler('https://vcip/rest')
+        self.assertRaises(ValueError, rest_navigation_handler.get_service_operations, '/com/vmware/package/mock')
+
+    @mock.patch('lib.utils.request_json')
+    def test_prefetch(self, request_json_mock):
+        request_json_mock.return_value = self.service_operations
+        rest_navigation_handler = RestNavigationHandler('https://vcip/rest')
+        service_urls = ['https://vcip/rest/com/vmware/package/mock-' + str(i) for i in range(10)]
+        rest_navigation_handler.prefetch(service_urls + ['/com/vmware/package/mock-0'], 4)
+        self.assertEqual(10, request_json_mock.call_count)
+
+        for service_url in service_urls:
+            self.assertEqual(self.service_operations, rest_navigation_handler.get_service_operations(service_url))
+        self.assertEqual(10, request_json_mock.call_count)
+
+    @mock.patch('lib.utils.request_json')
+    def test_load_saved_responses(self, request_json_mock):
+        file_name = os.path.join(self.temp_dir, 'rest_navigation.json')
+        rest_navigation_handler = RestNavigationHandler('https://vcip/rest')
+        self.assertEqual(0, rest_navigation_handler.load_saved_responses(file_name))
+
+        rest_navigation_handler.service_operations_dict['/com/vmware/package/mock'] = self.service_operations
+        rest_navigation_handler.service_operations_dict['/com/vmware/package/failed'] = None
+        rest_navigation_handler.save(file_name)
+        # not-found answers are not saved
+        with open(file_name) as capture_file:
+            self.assertEqual(['/com/vmware/package/mock'], list(json.load(capture_file)['service_operations']))
+
+        # responses captured from another rest navigation url are not reused
+        self.assertEqual(0, RestNavigationHandler('https://other/rest').load_saved_responses(file_name))
+
+        rest_navigation_handler = RestNavigationHandler('https://vcip/rest')
+        self.assertEqual(1, rest_navigation_handler.load_saved_responses(file_name))
+        self.assertEqual(self.service_operations,
+                         rest_navigation_handler.get_service_operations('/com/vmware/package/mock'))
+        request_json_mock.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,67 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from lib.reference_index import ReferenceIndex
+from lib.shared_components import SHARED_COMPONENTS_FILE, SharedComponentsExtractor
+
+
+def new_document(type_dict):
+    path_dict = {'/api/' + name: {'get': {'responses': {200: {'$ref': '#/components/schemas/' + name}}}}
+                 for name in type_dict}
+    reference_index = ReferenceIndex('3')
+    reference_index.add_path_dict(path_dict)
+    reference_index.add_type_dict(type_dict)
+    return path_dict, type_dict, reference_index
+
+
+class TestSharedComponents(unittest.TestCase):
+
+    def test_extract(self):
+        error = {'type': 'object', 'properties': {'messages': {'$ref': '#/components/schemas/Message'}}}
+        message = {'type': 'string'}
+        vm_path_dict, vm_type_dict, vm_reference_index = new_document({
+            'Error': dict(error), 'Message': dict(message), 'Info': {'type': 'object'}})
+        host_path_dict, host_type_dict, host_reference_index = new_document({
+            'Error': dict(error), 'Message': dict(message), 'Info': {'type': 'string'}})
+        # Error refers to a different Message, it cannot be shared either
+        cluster_path_dict, cluster_type_dict, cluster_reference_index = new_document({
+            'Error': dict(error), 'Message': {'type': 'integer'}, 'Info': {'type': 'string'}})
+
+        extractor = SharedComponentsExtractor('3')
+        extractor.extract({
+            'vm': (vm_type_dict, vm_reference_index),
+            'host': (host_type_dict, host_reference_index),
+            'cluster': (cluster_type_dict, cluster_reference_index)})
+        self.assertEqual({'Error': error, 'Message': message, 'Info': {'type': 'string'}},
+                         extractor.shared_type_dict)
+        self.assertEqual(['Info'], list(vm_type_dict.keys()))
+        self.assertEqual([], list(host_type_dict.keys()))
+        self.assertEqual(['Error', 'Message'], sorted(cluster_type_dict.keys()))
+        self.assertEqual(6, extractor.moved_count)
+        # the references of the documents point to the shared schemas
+        self.assertEqual(SHARED_COMPONENTS_FILE + '#/components/schemas/Error',
+                         vm_path_dict['/api/Error']['get']['responses'][200]['$ref'])
+        self.assertEqual('#/components/schemas/Info', vm_path_dict['/api/Info']['get']['responses'][200]['$ref'])
+        self.assertEqual(SHARED_COMPONENTS_FILE + '#/components/schemas/Info',
+                         cluster_path_dict['/api/Info']['get']['responses'][200]['$ref'])
+        self.assertEqual('#/components/schemas/Message', cluster_type_dict['Error']['properties']['messages']['$ref'])
+        self.assertTrue(vm_reference_index.is_referenced(SHARED_COMPONENTS_FILE + '#/components/schemas/Message'))
+
+        output_dir = tempfile.mkdtemp()
+        try:
+            with open(extractor.write(output_dir)) as components_file:
+                components = json.load(components_file)
+            self.assertEqual(['Error', 'Info', 'Message'], sorted(components['components']['schemas'].keys()))
+            self.assertTrue(os.path.exists(os.path.join(output_dir, SHARED_COMPONENTS_FILE)))
+        finally:
+            shutil.rmtree(output_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.fake_vcenter import FakeVcenterServer
+from benchmarks.synthetic_metamodel import REST_NAVIGATION_URL, SyntheticMetamodelGenerator, SyntheticMetamodelOptions
+from lib import dictionary_processing as dict_processing
+from lib import http_archive
+from lib import spec_generation
+from lib import authentication_metadata_processing
+from lib import utils
+from lib.authentication_metadata_processing import AuthenticationComponent, AuthenticationDictNavigator
+from lib.generator import Generator, GeneratorConfig
+from lib.openapi_final_path_processing import OpenapiPathProcessing
+from lib.offline_metamodel import REST_NAVIGATION_CAPTURE_FILE, dict_to_metamodel_object
+from lib.profiling import PhaseRecorder
+from lib.rest_endpoint.rest_navigation_handler import RestNavigationHandler
+from lib.spec_generation import SpecGenerationContext
+
+
+def new_operation(path):
+    return {
+        'name': 'get',
+        'documentation': 'mock operation',
+        'params': [],
+        'errors': [],
+        'output': {'documentation': '', 'type': {'category': 'BUILTIN', 'builtin_type': 'VOID'}},
+        'metadata': {'GET': {'elements': {'path': {'type': 'STRING', 'string_value': path}}}}}
+
+
+class TestSpecGeneration(unittest.TestCase):
+
+    def setUp(self):
+        service_dict = {}
+        service_urls_map = {}
+        for package in ('mock', 'other'):
+            service = 'com.vmware.' + package + '.service'
+            service_dict[service] = dict_to_metamodel_object({
+                'name': service,
+                'documentation': package + ' service',
+                'metadata': {},
+                'operations': {'get': new_operation('/' + package + '/service')}})
+            service_urls_map['https://vcip/rest/com/vmware/' + package + '/service'] = service
+        rest_navigation_handler = RestNavigationHandler('https://vcip/rest', {})
+        self.package_dict_api, self.package_dict, _, _ = dict_processing.add_service_urls_using_metamodel(
+            service_urls_map, service_dict, rest_navigation_handler, [])
+        self.context = SpecGenerationContext({}, {}, service_dict, service_urls_map, None,
+                                             rest_navigation_handler, False, '2')
+
+    def test_generate_package_specs(self):
+        rest_package_spec_dict, api_package_spec_dict = spec_generation.generate_package_specs(
+            self.context, self.package_dict, self.package_dict_api)
+        self.assertEqual({}, rest_package_spec_dict)
+        self.assertEqual(['mock', 'other'], sorted(api_package_spec_dict.keys()))
+        path_dict, _ = api_package_spec_dict['mock']
+        self.assertEqual(['/api/mock/service'], list(path_dict.keys()))
+
+        # worker processes produce the same specifications, in the same package order
+        phase_recorder = PhaseRecorder()
+        process_rest_package_spec_dict, process_api_package_spec_dict = spec_generation.generate_package_specs(
+            self.context, self.package_dict, self.package_dict_api, 2, phase_recorder)
+        self.assertEqual(rest_package_spec_dict, process_rest_package_spec_dict)
+        self.assertEqual(api_package_spec_dict, process_api_package_spec_dict)
+        self.assertEqual(list(api_package_spec_dict.keys()), list(process_api_package_spec_dict.keys()))
+        # the time spent on every package is reported
+        self.assertEqual(['package generation/api/mock', 'package generation/api/other'],
+                         sorted(phase_recorder.get_report()['phases'].keys()))
+
+    def test_security_decoration(self):
+        package_component = AuthenticationComponent()
+        service_component = AuthenticationComponent()
+        operation_component = AuthenticationComponent()
+        operation_component.add_schemes([authentication_metadata_processing.session_id_scheme])
+        service_component.add_subcomponent(operation_component, 'get')
+        package_component.add_subcomponent(service_component, 'com.vmware.mock.service')
+        self.context.auth_navigator = AuthenticationDictNavigator({'com.vmware.mock': package_component})
+        self.context.spec = '3'
+
+        _, api_package_spec_dict = spec_generation.generate_package_specs(
+            self.context, self.package_dict, self.package_dict_api)
+        path_dict, type_dict = api_package_spec_dict['mock']
+        self.assertEqual([{'session_id': []}], path_dict['/api/mock/service']['get']['security'])
+        spec_template = OpenapiPathProcessing().get_spec_template(path_dict, type_dict, 'mock')
+        self.assertEqual(['session_id'], list(spec_template['components']['securitySchemes'].keys()))
+        path_dict, type_dict = api_package_spec_dict['other']
+        self.assertNotIn('security', path_dict['/api/other/service']['get'])
+        spec_template = OpenapiPathProcessing().get_spec_template(path_dict, type_dict, 'other')
+        self.assertNotIn('securitySchemes', spec_template['components'])
+
+    def test_pickle_context(self):
+        component_svc_mock = mock.Mock()
+        component_svc_mock.get.return_value = dict_to_metamodel_object({
+            'info': {'packages': {'com.vmware.vapi.std.errors': {'structures': {}}}}})
+        self.context.http_error_map = utils.HttpErrorMap(component_svc_mock)
+        self.context.rest_navigation_handler.service_operations_dict['/com/vmware/mock'] = []
+
+        # the connection to the server and the locks stay in the parent process
+        context = pickle.loads(pickle.dumps(self.context))
+        self.assertEqual(None, context.http_error_map.component_svc)
+        self.assertEqual(self.context.http_error_map.error_rest_map, context.http_error_map.error_rest_map)
+        self.assertEqual([], context.rest_navigation_handler.get_service_operations('/com/vmware/mock'))
+
+    def test_init_worker(self):
+        self.context.rest_navigation_handler = RestNavigationHandler('https://vcip/rest',
+                                                                     session=utils.create_http_session())
+        self.context.rest_navigation_handler.service_operations_dict['/com/vmware/mock'] = []
+        self.addCleanup(setattr, spec_generation, 'worker_context', None)
+
+        # the session is not copied, the worker answers from the prefetched responses only
+        context = pickle.loads(pickle.dumps(self.context))
+        spec_generation.init_worker(context)
+        self.assertIs(context, spec_generation.worker_context)
+        self.assertEqual(None, context.rest_navigation_handler.session)
+        self.assertEqual([], context.rest_navigation_handler.get_service_operations('/com/vmware/mock'))
+        self.assertEqual(None, context.rest_navigation_handler.get_service_operations('/com/vmware/other'))
+
+    def test_record_and_replay_with_process_workers(self):
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        metamodel_dir = os.path.join(work_dir, 'metamodel')
+        SyntheticMetamodelGenerator(SyntheticMetamodelOptions(packages=2, services_per_package=4)).write(
+            metamodel_dir)
+        archive_file = os.path.join(work_dir, 'capture.zip')
+
+        with FakeVcenterServer(metamodel_dir) as server:
+            rest_navigation_url = server.get_rest_navigation_url()
+            # the metamodel is loaded offline, with the service urls of the server
+            capture_file = os.path.join(metamodel_dir, REST_NAVIGATION_CAPTURE_FILE)
+            with open(capture_file) as capture:
+                capture_json = capture.read()
+            with open(capture_file, 'w') as capture:
+                capture.write(capture_json.replace(REST_NAVIGATION_URL, rest_navigation_url))
+            with Generator(GeneratorConfig(offline_metamodel_dir=metamodel_dir)) as generator:
+                metamodel = generator.get_metamodel()
+                context = metamodel.get_generation_context(generator.config)
+            package_specs = spec_generation.generate_package_specs(
+                context, metamodel.package_dict, metamodel.package_dict_api)
+            self.assertTrue(package_specs[0])
+
+            # the rest navigation requests of the worker processes are recorded
+            session = utils.create_http_session()
+            archive_writer = http_archive.HttpArchiveWriter(archive_file, server.get_metadata_url(),
+                                                            rest_navigation_url)
+            archive_writer.mount(session)
+            context.rest_navigation_handler = RestNavigationHandler(rest_navigation_url, session=session)
+            self.assertEqual(package_specs, spec_generation.generate_package_specs(
+                context, metamodel.package_dict, metamodel.package_dict_api, 2))
+            self.assertEqual(server.request_count, archive_writer.close())
+
+        # the server is gone, the archive answers all of them
+        session = utils.create_http_session()
+        http_archive.HttpArchiveReader(archive_file).mount(session)
+        context.rest_navigation_handler = RestNavigationHandler(rest_navigation_url, session=session)
+        self.assertEqual(package_specs, spec_generation.generate_package_specs(
+            context, metamodel.package_dict, metamodel.package_dict_api, 2))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+# Copyright 2020 VMware, Inc.
+# SPDX-License-Identifier: MIT
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+from benchmarks.synthetic_metamodel import SyntheticMetamodelGenerator, SyntheticMetamodelOptions
+from lib import spec_server
+from lib.generator import Generator, GeneratorConfig
+from lib.spec_server import SpecServer
+
+
+class TestSpecServer(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.metamodel_dir = os.path.join(self.work_dir, 'metamodel')
+        options = SyntheticMetamodelOptions(packages=2, services_per_package=4, structures_per_package=6)
+        SyntheticMetamodelGenerator(options).write(self.metamodel_dir)
+        self.server = SpecServer(self.get_generator(), ('127.0.0.1', 0), refresh_interval=3600)
+        self.server.start()
+        self.url = 'http://%s:%d/' % self.server.get_address()
+
+    def tearDown(self):
+        self.server.close()
+        shutil.rmtree(self.work_dir)
+
+    def get_generator(self, output_dir=None):
+        return Generator(GeneratorConfig(offline_metamodel_dir=self.metamodel_dir,
+                                         output_dir=output_dir,
+                                         shared_components=True))
+
+    def get(self, file_name, **headers):
+        # requests asks for gzip unless told otherwise
+        headers.setdefault('Accept-Encoding', 'identity')
+        return requests.get(self.url + file_name, headers=headers)
+
+    def test_documents(self):
+        # the served documents are the files vmsgen writes
+        output_dir = os.path.join(self.work_dir, 'output')
+        self.get_generator(output_dir).run()
+        for file_name in ('bench0.json', 'bench1.json', 'components.json'):
+            response = self.get(file_name)
+            self.assertEqual(200, response.status_code)
+            self.assertEqual('application/json', response.headers['Content-Type'])
+            with open(os.path.join(output_dir, file_name), 'rb') as spec_file:
+                self.assertEqual(spec_file.read(), response.content)
+        self.assertEqual({'files': ['bench0', 'bench1']}, self.get('api.json').json())
+        self.assertEqual(404, self.get('bench2.json').status_code)
+
+        response = requests.head(self.url + 'bench0.json', headers={'Accept-Encoding': 'identity'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b'', response.content)
+        self.assertEqual(self.get('bench0.json').headers['ETag'], response.headers['ETag'])
+
+    def test_conditional_get(self):
+        response = self.get('bench0.json')
+        etag = response.headers['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertEqual('no-cache', response.headers['Cache-Control'])
+
+        response = self.get('bench0.json', **{'If-None-Match': etag})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.content)
+        self.assertEqual(etag, response.headers['ETag'])
+        self.assertEqual(304, self.get('bench0.json', **{'If-None-Match': '"other", W/' + etag}).status_code)
+        self.assertEqual(200, self.get('bench0.json', **{'If-None-Match': '"other"'}).status_code)
+        # the ETag of a document differs from the ones of the other documents
+        self.assertEqual(200, self.get('bench1.json', **{'If-None-Match': etag}).status_code)
+
+    def test_gzip(self):
+        response = self.get('bench0.json')
+        gzip_response = self.get('bench0.json', **{'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual('gzip', gzip_response.headers['Content-Encoding'])
+        self.assertEqual(response.content, gzip_response.content)
+        self.assertNotEqual(response.headers['ETag'], gzip_response.headers['ETag'])
+        self.assertEqual(304, self.get('bench0.json', **{'Accept-Encoding': 'gzip',
+                                                        'If-None-Match': gzip_response.headers['ETag']}).status_code)
+        self.assertNotIn('Content-Encoding', self.get('bench0.json', **{'Accept-Encoding': 'gzip;q=0'}).headers)
+
+        document = self.server.get_document('bench0.json')
+        self.assertEqual(document.body, gzip.decompress(document.gzip_body))
+
+    def test_refresh(self):
+        snapshot = self.server.snapshot
+        etag = self.get('bench0.json').headers['ETag']
+        self.assertFalse(self.server.refresh())
+        self.assertIs(snapshot, self.server.snapshot)
+
+        # a changed component is generated again, the unchanged documents keep their ETags
+        component_file_name = os.path.join(self.metamodel_dir, 'com.vmware.bench0.json')
+        with open(component_file_name) as component_file:
+            component = json.load(component_file)
+        component['fingerprint'] += '-changed'
+        with open(component_file_name, 'w') as component_file:
+            json.dump(component, component_file)
+        self.assertTrue(self.server.refresh())
+        self.assertIsNot(snapshot, self.server.snapshot)
+        self.assertNotEqual(snapshot.fingerprint, self.server.snapshot.fingerprint)
+        self.assertEqual(304, self.get('bench0.json', **{'If-None-Match': etag}).status_code)
+
+    def test_header_parsing(self):
+        self.assertTrue(spec_server.etag_matches('*', '"a"'))
+        self.assertTrue(spec_server.etag_matches('"b", W/"a"', '"a"'))
+        self.assertFalse(spec_server.etag_matches('"b"', '"a"'))
+        self.assertTrue(spec_server.accepts_gzip('br, gzip;q=0.5'))
+        self.assertTrue(spec_server.accepts_gzip('*'))
+        self.assertFalse(spec_server.accepts_gzip('gzip;q=0'))
+        self.assertFalse(spec_server.accepts_gzip('identity'))
+
+
+if __name__ == '__main__':
+    unittest.main()
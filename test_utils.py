@@ -1,7 +1,15 @@
 # Copyright 2020 VMware, Inc.
 # SPDX-License-Identifier: MIT
 
+import collections
+import json
+import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
+
+import requests
 
 from lib import utils
 
@@ -58,6 +66,87 @@ class TestUtils(unittest.TestCase):
         utils.recursive_ref_update(sample_dict, old, updated)
         self.assertEqual(sample_dict.get('get').get('parameters')[1].get('description'), updated)
 
+    def test_create_http_session(self):
+        session = utils.create_http_session(pool_size=4, retries=2)
+        adapter = session.get_adapter('https://vcip/rest')
+        self.assertEqual(4, adapter._pool_maxsize)
+        self.assertEqual(2, adapter.max_retries.total)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+
+    def test_get_json(self):
+        response_mock = mock.Mock()
+        response_mock.ok = True
+        response_mock.status_code = 200
+        response_mock.json.return_value = {'value': ['mock']}
+        session_mock = mock.Mock()
+        session_mock.get.return_value = response_mock
+
+        # case 1: the value wrapper of vAPI responses is removed
+        self.assertEqual(['mock'], utils.get_json('https://vcip/rest/mock', False, session_mock))
+        session_mock.get.assert_called_once_with(
+            'https://vcip/rest/mock', verify=False, timeout=utils.HTTP_TIMEOUT)
+
+        # case 2: error responses
+        response_mock.ok = False
+        response_mock.status_code = 404
+        self.assertEqual(None, utils.get_json('https://vcip/rest/mock', True, session_mock))
+        response_mock.status_code = 503
+        response_mock.raise_for_status.side_effect = requests.HTTPError('503 Server Error')
+        self.assertEqual(None, utils.get_json('https://vcip/rest/mock', True, session_mock))
+
+        # case 3: connection failures
+        session_mock.get.side_effect = requests.ConnectionError('connection refused')
+        self.assertEqual(None, utils.get_json('https://vcip/rest/mock', True, session_mock))
+
+        # case 4: programming errors are not taken for failed requests
+        self.assertRaises(ValueError, utils.get_json, 'https://vcip/rest/mock', True, None)
+        session_mock.get.side_effect = TypeError('unexpected keyword argument')
+        self.assertRaises(TypeError, utils.get_json, 'https://vcip/rest/mock', True, session_mock)
+
+    def test_request_json(self):
+        response_mock = mock.Mock()
+        response_mock.ok = False
+        response_mock.status_code = 404
+        session_mock = mock.Mock()
+        session_mock.get.return_value = response_mock
+
+        # case 1: a definitive answer that the document does not exist
+        self.assertEqual(None, utils.request_json('https://vcip/rest/mock', False, session_mock))
+
+        # case 2: server errors and connection failures, which may be transient, are raised
+        response_mock.status_code = 503
+        response_mock.raise_for_status.side_effect = requests.HTTPError('503 Server Error')
+        self.assertRaises(requests.HTTPError, utils.request_json, 'https://vcip/rest/mock', False, session_mock)
+        session_mock.get.side_effect = requests.ConnectionError('connection refused')
+        self.assertRaises(requests.ConnectionError, utils.request_json, 'https://vcip/rest/mock', False,
+                          session_mock)
+
+    def test_write_json_data_to_file(self):
+        paths = {'/vcenter/vm': {'get': {'summary': 'line 1\nline 2', 'parameters': []}},
+                 '/vcenter/host': {'get': {'responses': {200: {'description': 'OK'}}}},
+                 '/vcenter/cluster': {'get': {'tags': ['vcenter/cluster']}}}
+        json_data = {'info': {'title': 'vcenter'},
+                     'paths': utils.SortedJsonSection(paths),
+                     'components': {'schemas': utils.SortedJsonSection({})}}
+        expected_json_data = {'info': {'title': 'vcenter'},
+                              'paths': collections.OrderedDict(sorted(paths.items())),
+                              'components': {'schemas': {}}}
+        output_dir = tempfile.mkdtemp()
+        try:
+            file_name = os.path.join(output_dir, 'vcenter.json')
+
+            # case 1: same output as json.dump with indentation
+            utils.write_json_data_to_file(file_name, json_data)
+            with open(file_name) as json_file:
+                self.assertEqual(json.dumps(expected_json_data, indent=4), json_file.read())
+
+            # case 2: compact output
+            utils.write_json_data_to_file(file_name, json_data, True)
+            with open(file_name) as json_file:
+                self.assertEqual(json.dumps(expected_json_data, separators=(',', ':')), json_file.read())
+        finally:
+            shutil.rmtree(output_dir)
+
     def test_get_str_camel_case(self):
         string = "vapi.std_localizable_message"
         expected = "VapiStdLocalizableMessage"